@@ -0,0 +1,30 @@
+"""Add precomputed face features to employee_profiles
+
+Merges the two open heads (6906856c4dde, 6c9c2f9d8b21).
+
+Revision ID: 3f8e2a91c7d4
+Revises: 6906856c4dde, 6c9c2f9d8b21
+Create Date: 2026-10-17 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8e2a91c7d4"
+down_revision: Union[str, Sequence[str], None] = ("6906856c4dde", "6c9c2f9d8b21")
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("employee_profiles", sa.Column("face_features", sa.LargeBinary(), nullable=True))
+    op.add_column("employee_profiles", sa.Column("face_features_key", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("employee_profiles", "face_features_key")
+    op.drop_column("employee_profiles", "face_features")
@@ -0,0 +1,34 @@
+"""Add (created_at, id) indexes for keyset pagination of attendance_evidences
+
+Revision ID: 8b41d7c2e5f0
+Revises: 3f8e2a91c7d4
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b41d7c2e5f0"
+down_revision: Union[str, Sequence[str], None] = "3f8e2a91c7d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_evidence_session_created",
+        "attendance_evidences",
+        ["session_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_evidence_created_id", "attendance_evidences", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_evidence_created_id", table_name="attendance_evidences")
+    op.drop_index("ix_evidence_session_created", table_name="attendance_evidences")
@@ -0,0 +1,38 @@
+"""Add expense listing indexes on (date, category) and (created_at, id)
+
+Revision ID: c5a9e3f17b28
+Revises: 8b41d7c2e5f0
+Create Date: 2026-10-17 13:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a9e3f17b28"
+down_revision: Union[str, Sequence[str], None] = "8b41d7c2e5f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_expenses() -> bool:
+    # 6906856c4dde drops `expenses` on upgrade; databases that still carry the
+    # table get the indexes, the rest are left alone.
+    return sa.inspect(op.get_bind()).has_table("expenses")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_expenses():
+        return
+    op.create_index("ix_expenses_date_category", "expenses", ["date", "category"], unique=False)
+    op.create_index("ix_expenses_created_at_id", "expenses", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _has_expenses():
+        return
+    op.drop_index("ix_expenses_created_at_id", table_name="expenses")
+    op.drop_index("ix_expenses_date_category", table_name="expenses")
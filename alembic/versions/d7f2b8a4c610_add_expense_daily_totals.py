@@ -0,0 +1,42 @@
+"""Add expense_daily_totals rollup and backfill it from expenses
+
+Revision ID: d7f2b8a4c610
+Revises: c5a9e3f17b28
+Create Date: 2026-10-17 14:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d7f2b8a4c610"
+down_revision: Union[str, Sequence[str], None] = "c5a9e3f17b28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "expense_daily_totals",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(length=32), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("date", "category", name="pk_expense_daily_totals"),
+    )
+    if sa.inspect(op.get_bind()).has_table("expenses"):
+        op.execute(
+            """
+            INSERT INTO expense_daily_totals (date, category, total_amount, tx_count)
+            SELECT date, CAST(category AS VARCHAR(32)), SUM(amount), COUNT(*)
+            FROM expenses
+            GROUP BY date, CAST(category AS VARCHAR(32))
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("expense_daily_totals")
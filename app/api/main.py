@@ -1,19 +1,33 @@
+# ruff: noqa: E402  (the clock starts before the imports so the startup report can time them)
+import asyncio
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.core.config import APP_NAME
-from app.data.db import get_db
+from app.core.config import APP_NAME, settings
+from app.core.deps import require_admin
+from app.core.perf import PerfMiddleware, perf_recorder, startup_timer
+from app.data.db import SessionLocal, engine, get_db, pool_mode
+from app.data.pool import pool_status
+from app.services.payroll_policy_cache import policy_cache
+from app.services.checkin_monitoring_pipeline import monitoring_pipeline
+from app.services.job_runner import job_runner
 
 # Routers
 from app.routes.expenses_router import router as expenses_router
 from app.routes.add_employee_router import router as add_employee_router
 from app.routes import admin_router, proctected_example_router, employee_router
 from app.routes.attendance_router import router as attendance_router
+from app.routes.attendance_router import controller as attendance_controller
 from app.routes.worklog_router import router as worklog_router
 from app.routes.leave_admin_router import router as leave_admin_router
 from app.routes.policy_router import router as policy_router
@@ -27,13 +41,61 @@ from app.routes.employee_bank_detail_router import router as employee_bank_detai
 from app.routes.department_router import router as department_router
 from app.routes.payroll_calculator_router import router as payroll_calculator_router
 from app.routes.employee_profile_router import router as employee_profile_router
+from app.routes.jobs_router import router as jobs_router
+
+
+# How long shutdown waits for a background face model warm-up before abandoning it
+FACE_WARMUP_SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+
+def _warm_payroll_policy_cache() -> None:
+    """Probe the payroll schema and compile policies once, before the first request."""
+    try:
+        with SessionLocal() as db:
+            count = policy_cache.warm(db)
+        print(f"💼 Payroll policy cache warmed ({count} policies)")
+    except Exception as e:  # DB may be unreachable at boot; the cache fills lazily then
+        policy_cache.invalidate()
+        print(f"⚠️ Payroll policy cache warm-up skipped: {e}")
+
+
+def _warm_face_models() -> None:
+    """Load the face detector/ORB/matcher on every face verification worker."""
+    try:
+        with startup_timer.phase(f"face models ({settings.FACE_MODELS_WARMUP})"):
+            attendance_controller.face_pool.warm()
+        print("🙂 Face verification models warmed")
+    except Exception as e:  # verification still works; models then load on first use
+        print(f"⚠️ Face model warm-up skipped: {e}")
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     print("🚀 App startup initiated")
+    # lifespan can run more than once per process (reloads, tests): report this run only
+    startup_timer.reset()
+    startup_timer.record("import app.api.main", _IMPORT_SECONDS)
+    with startup_timer.phase("payroll policy cache"):
+        await run_in_threadpool(_warm_payroll_policy_cache)
+
+    # OpenCV/NumPy are only imported here or on the first face request (FACE_MODELS_WARMUP)
+    face_warmup = None
+    if settings.FACE_MODELS_WARMUP == "startup":
+        await run_in_threadpool(_warm_face_models)
+    elif settings.FACE_MODELS_WARMUP == "background":
+        face_warmup = asyncio.create_task(run_in_threadpool(_warm_face_models))
+    print(f"⏱️ Startup: {startup_timer.report()}")
+
     yield
     print("🛑 App shutdown triggered")
+    if face_warmup is not None and not face_warmup.done():
+        try:
+            await asyncio.wait_for(face_warmup, FACE_WARMUP_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            print("⚠️ Face model warm-up still running at shutdown; abandoned")
+    attendance_controller.shutdown_face_pool()
+    job_runner.shutdown(wait=False)
+    await run_in_threadpool(monitoring_pipeline.stop)
 
 
 app = FastAPI(
@@ -62,6 +124,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency / SQL cost (outermost, so it times CORS and error handling too)
+app.add_middleware(PerfMiddleware)
+
 # Routers
 app.include_router(employee_router.router)
 app.include_router(admin_router.router)
@@ -84,6 +149,7 @@ app.include_router(employee_salary_router, prefix="")
 app.include_router(employee_bank_detail_router, prefix="")
 app.include_router(payroll_calculator_router, prefix="")
 app.include_router(employee_profile_router, prefix="")
+app.include_router(jobs_router, prefix="")
 
 
 # Health check routes
@@ -113,6 +179,26 @@ def debug_db(db: Session = Depends(get_db)):
         return {"connected": False, "error": str(e)}
 
 
+@app.get("/debug/db/pool")
+def debug_db_pool():
+    """Pool occupancy and checkout wait metrics for the application engine."""
+    return pool_status(engine, pool_mode)
+
+
+@app.get("/debug/perf", dependencies=[Depends(require_admin)])
+def debug_perf():
+    """Per-route latency percentiles, SQL statements and DB time; slowest SQL; startup phases."""
+    return {**perf_recorder.snapshot(), "startup": startup_timer.snapshot()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """The same per-route aggregates in Prometheus text format (no SQL text)."""
+    return PlainTextResponse(
+        perf_recorder.prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Global error handlers
 @app.exception_handler(Exception)
 async def unhandled_exceptions(_: Request, __: Exception):
@@ -121,4 +207,11 @@ async def unhandled_exceptions(_: Request, __: Exception):
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(_: Request, exc: StarletteHTTPException):
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),
+    )
+
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
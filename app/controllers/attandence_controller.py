@@ -1,9 +1,19 @@
 from __future__ import annotations
-from sqlalchemy.orm import Session
-from datetime import date
+import json
+import threading
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from datetime import date, datetime
 from fastapi import UploadFile, HTTPException
-from app.services.attendance_service import AttendanceService
-from app.services.face_verification_service import FaceVerificationService
+from fastapi.concurrency import run_in_threadpool
+from app.core.pagination import DEFAULT_PAGE_SIZE, decode_datetime_id_cursor, encode_cursor
+from app.data.db import SessionLocal
+from app.data.models.add_employee import Department
+from app.services import attendance_export_service
+from app.services.attendance_export_service import ExportFormat
+from app.services.attendance_service import AsyncAttendanceService, AttendanceService
 from app.schemas.attendance import (
     CheckInResponse,
     CheckOutResponse,
@@ -19,15 +29,52 @@ from app.schemas.attendance import (
 )
 from app.data.models.attendance_evidence import EvidenceType
 
+if TYPE_CHECKING:
+    # OpenCV/NumPy/Pillow/Supabase: imported on first face request, not at startup
+    from app.services.face_verification_pool import FaceVerificationPool
+    from app.services.face_verification_service import FaceVerificationService
 
 class AttendanceController:
     def __init__(
         self,
         service: AttendanceService | None = None,
         face_service: FaceVerificationService | None = None,
+        face_pool: FaceVerificationPool | None = None,
     ):
         self.service = service or AttendanceService()
-        self.face_service = face_service or FaceVerificationService()
+        self.async_service = AsyncAttendanceService()
+        self._face_service = face_service
+        # An injected service is shared by the pool's workers; otherwise each worker builds its own
+        self._shared_face_service = face_service
+        self._face_pool = face_pool
+        self._face_lock = threading.Lock()
+
+    @property
+    def face_service(self) -> FaceVerificationService:
+        if self._face_service is None:
+            with self._face_lock:
+                if self._face_service is None:
+                    from app.services.face_verification_service import FaceVerificationService
+
+                    self._face_service = FaceVerificationService()
+        return self._face_service
+
+    @property
+    def face_pool(self) -> FaceVerificationPool:
+        if self._face_pool is None:
+            with self._face_lock:
+                if self._face_pool is None:
+                    from app.services.face_verification_pool import FaceVerificationPool
+
+                    self._face_pool = FaceVerificationPool.from_settings(
+                        service=self._shared_face_service
+                    )
+        return self._face_pool
+
+    def shutdown_face_pool(self) -> None:
+        """Stop the face verification workers, if a face request ever started them."""
+        if self._face_pool is not None:
+            self._face_pool.shutdown(wait=False)
 
     def check_in(self, db: Session, employee_id: str) -> CheckInResponse:
         s = self.service.check_in(db, employee_id)
@@ -49,21 +96,24 @@ class AttendanceController:
             workedSeconds=worked,
         )
 
-    def today_status(self, db: Session, employee_id: str) -> TodayStatus:
-        return TodayStatus(**self.service.today_status(db, employee_id))
+    async def today_status(self, db: AsyncSession, employee_id: str) -> TodayStatus:
+        return TodayStatus(**await self.async_service.today_status(db, employee_id))
 
-    def month_view(self, db: Session, employee_id: str, year: int, month: int) -> list[MonthDay]:
-        return [MonthDay(**d) for d in self.service.month_view(db, employee_id, year, month)]
+    async def month_view(
+        self, db: AsyncSession, employee_id: str, year: int, month: int
+    ) -> list[MonthDay]:
+        days = await self.async_service.month_view(db, employee_id, year, month)
+        return [MonthDay(**d) for d in days]
 
-    def get_employee_attendance(
+    async def get_employee_attendance(
         self,
-        db: Session,
+        db: AsyncSession,
         employee_id: str,
         date_from: date,
         date_to: date,
         include_absent: bool,
     ) -> EmployeeAttendanceResponse:
-        return self.service.get_employee_attendance(
+        return await self.async_service.get_employee_attendance(
             db=db,
             employee_id=employee_id,
             date_from=date_from,
@@ -119,12 +169,7 @@ class AttendanceController:
         selfie_mime = selfie_file.content_type or "image/jpeg"
 
         # 2) Verify face FIRST - before creating any attendance record
-        verification_result = self.face_service.verify_face(
-            db=db,
-            employee_id=employee_id,
-            selfie_image_data=selfie_data,
-            selfie_mime=selfie_mime,
-        )
+        verification_result = await self._verify_face(db, employee_id, selfie_data, selfie_mime)
 
         # Convert verification result to schema
         face_result = FaceVerificationResult(
@@ -139,7 +184,7 @@ class AttendanceController:
         session = None
         if face_result.verified:
             # Face verified - create attendance session
-            session = self.service.check_in(db, employee_id)
+            session = await run_in_threadpool(self.service.check_in, db, employee_id)
         else:
             # Face NOT verified - raise exception to prevent check-in
             raise HTTPException(
@@ -153,35 +198,8 @@ class AttendanceController:
             )
 
         # 4) Save evidence for audit trail
-        evidence = self.face_service.save_evidence(
-            db=db,
-            session_id=session.id,
-            evidence_type=EvidenceType.CHECK_IN,
-            verified=face_result.verified,
-            confidence_score=face_result.confidence_score,
-            verification_notes=face_result.message,
-        )
-
-        db.commit()
-        db.refresh(evidence)
-
-        # Handle evidence_type - could be enum or string depending on source
-        evidence_type_value = (
-            evidence.evidence_type.value
-            if hasattr(evidence.evidence_type, "value")
-            else evidence.evidence_type
-        )
-
-        evidence_response = AttendanceEvidenceResponse(
-            id=evidence.id,
-            session_id=evidence.session_id,
-            evidence_type=evidence_type_value,
-            verified=evidence.verified,
-            confidence_score=evidence.confidence_score,
-            verification_notes=evidence.verification_notes,
-            image_path=evidence.image_path,
-            verified_at=evidence.verified_at,
-            created_at=evidence.created_at,
+        evidence_response = await run_in_threadpool(
+            self._record_evidence, db, session.id, EvidenceType.CHECK_IN, face_result
         )
 
         return CheckInWithFaceResponse(
@@ -212,12 +230,7 @@ class AttendanceController:
         selfie_mime = selfie_file.content_type or "image/jpeg"
 
         # 2) Verify face FIRST - before performing any check-out
-        verification_result = self.face_service.verify_face(
-            db=db,
-            employee_id=employee_id,
-            selfie_image_data=selfie_data,
-            selfie_mime=selfie_mime,
-        )
+        verification_result = await self._verify_face(db, employee_id, selfie_data, selfie_mime)
 
         # Convert verification result to schema
         face_result = FaceVerificationResult(
@@ -232,7 +245,7 @@ class AttendanceController:
         session = None
         if face_result.verified:
             # Face verified - perform check-out (close session)
-            session = self.service.check_out(db, employee_id)
+            session = await run_in_threadpool(self.service.check_out, db, employee_id)
         else:
             # Face NOT verified - raise exception to prevent check-out
             raise HTTPException(
@@ -252,10 +265,32 @@ class AttendanceController:
         )
 
         # 4) Save evidence for audit trail
+        evidence_response = await run_in_threadpool(
+            self._record_evidence, db, session.id, EvidenceType.CHECK_OUT, face_result
+        )
+
+        return CheckOutWithFaceResponse(
+            sessionId=session.id,
+            employeeId=session.employee_id,
+            checkInUtc=session.check_in_utc,
+            checkOutUtc=session.check_out_utc,
+            workedSeconds=worked,
+            faceVerification=face_result,
+            evidence=evidence_response,
+        )
+
+    def _record_evidence(
+        self,
+        db: Session,
+        session_id: int,
+        evidence_type: EvidenceType,
+        face_result: FaceVerificationResult,
+    ) -> AttendanceEvidenceResponse:
+        """Save and commit verification evidence (blocking; run off the event loop)."""
         evidence = self.face_service.save_evidence(
             db=db,
-            session_id=session.id,
-            evidence_type=EvidenceType.CHECK_OUT,
+            session_id=session_id,
+            evidence_type=evidence_type,
             verified=face_result.verified,
             confidence_score=face_result.confidence_score,
             verification_notes=face_result.message,
@@ -271,7 +306,7 @@ class AttendanceController:
             else evidence.evidence_type
         )
 
-        evidence_response = AttendanceEvidenceResponse(
+        return AttendanceEvidenceResponse(
             id=evidence.id,
             session_id=evidence.session_id,
             evidence_type=evidence_type_value,
@@ -283,97 +318,159 @@ class AttendanceController:
             created_at=evidence.created_at,
         )
 
-        return CheckOutWithFaceResponse(
-            sessionId=session.id,
-            employeeId=session.employee_id,
-            checkInUtc=session.check_in_utc,
-            checkOutUtc=session.check_out_utc,
-            workedSeconds=worked,
-            faceVerification=face_result,
-            evidence=evidence_response,
-        )
+    async def _verify_face(
+        self, db: Session, employee_id: str, selfie_data: bytes, selfie_mime: str
+    ) -> dict:
+        """Run face verification on the worker pool; 503 + Retry-After when it is saturated."""
+        from app.services.face_verification_pool import FaceVerificationBusy
+
+        try:
+            return await self.face_pool.verify(db, employee_id, selfie_data, selfie_mime)
+        except FaceVerificationBusy as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Face verification is busy, please retry: {e}",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+    def face_verification_metrics(self) -> dict:
+        return self.face_pool.metrics()
 
     # ──────────────────────────────────────────────────────────────────────────────
     # Evidence Query Methods
     # ──────────────────────────────────────────────────────────────────────────────
 
-    def get_session_evidence(self, db: Session, session_id: int) -> list:
+    def get_session_evidence(
+        self,
+        db: Session,
+        session_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[dict], Optional[str]]:
         """
-        Get all evidence records for a specific attendance session.
+        One page of evidence records for an attendance session, newest first.
+        Returns the items and the cursor of the next page (None on the last page).
         """
-        from app.data.models.attendance_evidence import AttendanceEvidence
-        from sqlalchemy import select
-
-        stmt = select(AttendanceEvidence).where(AttendanceEvidence.session_id == session_id)
-        evidences = list(db.execute(stmt).scalars().all())
-
-        result = []
-        for evidence in evidences:
-            # Handle evidence_type - could be enum or string depending on source
-            evidence_type_value = (
-                evidence.evidence_type.value
-                if hasattr(evidence.evidence_type, "value")
-                else evidence.evidence_type
-            )
-            result.append(
-                AttendanceEvidenceResponse(
-                    id=evidence.id,
-                    session_id=evidence.session_id,
-                    evidence_type=evidence_type_value,
-                    verified=evidence.verified,
-                    confidence_score=evidence.confidence_score,
-                    verification_notes=evidence.verification_notes,
-                    image_path=evidence.image_path,
-                    verified_at=evidence.verified_at,
-                    created_at=evidence.created_at,
-                )
-            )
-        return result
+        rows = self.service.repo.evidence_page(
+            db, session_id=session_id, after=decode_datetime_id_cursor(cursor), limit=limit + 1
+        )
+        return self._evidence_page(rows, limit)
 
     def get_employee_evidence(
-        self, db: Session, employee_id: str, date_from=None, date_to=None
-    ) -> list:
+        self,
+        db: Session,
+        employee_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[dict], Optional[str]]:
         """
-        Get all evidence records for an employee, optionally filtered by date range.
+        One page of evidence records for an employee, newest first, optionally
+        filtered by work date. Returns the items and the next page's cursor.
         """
-        from app.data.models.attendance_evidence import AttendanceEvidence
-        from app.data.models.attendance import AttendanceSession
-        from sqlalchemy import select
-
-        query = (
-            select(AttendanceEvidence)
-            .join(AttendanceSession)
-            .where(AttendanceSession.employee_id == employee_id)
+        rows = self.service.repo.evidence_page(
+            db,
+            employee_id=employee_id,
+            date_from=date_from,
+            date_to=date_to,
+            after=decode_datetime_id_cursor(cursor),
+            limit=limit + 1,
         )
+        return self._evidence_page(rows, limit)
 
-        # Add date filters if provided
-        if date_from:
-            query = query.where(AttendanceSession.work_date_local >= date_from)
-        if date_to:
-            query = query.where(AttendanceSession.work_date_local <= date_to)
-
-        query = query.order_by(AttendanceEvidence.created_at.desc())
-        evidences = list(db.execute(query).scalars().all())
-
-        result = []
-        for evidence in evidences:
-            # Handle evidence_type - could be enum or string depending on source
-            evidence_type_value = (
-                evidence.evidence_type.value
-                if hasattr(evidence.evidence_type, "value")
-                else evidence.evidence_type
-            )
-            result.append(
-                AttendanceEvidenceResponse(
-                    id=evidence.id,
-                    session_id=evidence.session_id,
-                    evidence_type=evidence_type_value,
-                    verified=evidence.verified,
-                    confidence_score=evidence.confidence_score,
-                    verification_notes=evidence.verification_notes,
-                    image_path=evidence.image_path,
-                    verified_at=evidence.verified_at,
-                    created_at=evidence.created_at,
+    def export_employee_evidence(
+        self,
+        employee_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        session_factory: sessionmaker = SessionLocal,
+        batch_size: int = 1000,
+    ) -> Iterator[bytes]:
+        """
+        Stream an employee's full evidence history as NDJSON, newest first.
+
+        Walks the same keyset pages as ``get_employee_evidence`` on its own
+        session (the request's session is closed before a streamed body is
+        sent), so only one batch is held in memory at a time.
+        """
+        db = session_factory()
+        try:
+            after = None
+            while True:
+                rows = self.service.repo.evidence_page(
+                    db,
+                    employee_id=employee_id,
+                    date_from=date_from,
+                    date_to=date_to,
+                    after=after,
+                    limit=batch_size,
                 )
+                if not rows:
+                    break
+                yield b"".join(
+                    json.dumps(_evidence_item(row), default=_json_default).encode() + b"\n"
+                    for row in rows
+                )
+                after = (rows[-1]["created_at"], rows[-1]["id"])
+        finally:
+            db.close()
+
+    def export_month_report(
+        self,
+        year: int,
+        month: int,
+        fmt: ExportFormat = "csv",
+        department: Optional[Department] = None,
+        include_absent: bool = True,
+        working_days_only: bool = False,
+        cap_to_today: bool = True,
+        session_factory: sessionmaker = SessionLocal,
+    ) -> Iterator[bytes]:
+        """
+        Stream every employee's (or one department's) month report as CSV/XLSX
+        bytes, on its own session like ``export_employee_evidence``.
+        """
+        db = session_factory()
+        try:
+            rows = attendance_export_service.iter_month_rows(
+                db,
+                year,
+                month,
+                department=department,
+                include_absent=include_absent,
+                working_days_only=working_days_only,
+                cap_to_today=cap_to_today,
+                repo=self.service.repo,
             )
-        return result
+            if fmt == "xlsx":
+                yield from attendance_export_service.xlsx_chunks(rows)
+            else:
+                yield from attendance_export_service.csv_chunks(rows)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _evidence_page(
+        rows: Sequence[RowMapping], limit: int
+    ) -> Tuple[List[dict], Optional[str]]:
+        items = [_evidence_item(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return items, next_cursor
+
+
+def _evidence_item(row: RowMapping) -> dict:
+    item = dict(row)
+    # Handle evidence_type - could be enum or string depending on source
+    evidence_type = item["evidence_type"]
+    item["evidence_type"] = getattr(evidence_type, "value", evidence_type)
+    return item
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
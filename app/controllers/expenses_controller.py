@@ -1,12 +1,15 @@
 # app/controllers/expenses_controller.py
 
-from typing import Optional
+from typing import BinaryIO, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.data.repositories.expense_repository import ExpenseFilter
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate
 from app.services.expense_service import ExpenseService
-from app.services import expense_summary_service
+from app.services import expense_import_service, expense_summary_service
+from app.services.expense_import_service import ImportFormat
 
 
 def get_expense(db: Session, expense_id: int):
@@ -14,9 +17,18 @@ def get_expense(db: Session, expense_id: int):
     return service.get_expense_by_id(expense_id)
 
 
-def get_expenses(db: Session, skip: int = 0, limit: int = 100):
+def get_expenses(
+    db: Session,
+    filters: ExpenseFilter = ExpenseFilter(),
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_total: bool = False,
+):
     service = ExpenseService(db)
-    return service.get_all_expenses()
+    return service.list_expenses(
+        filters, cursor=cursor, limit=limit, skip=skip, include_total=include_total
+    )
 
 
 def create_expense(db: Session, expense_data: ExpenseCreate):
@@ -35,41 +47,55 @@ def delete_expense(db: Session, expense_id: int) -> dict[str, str]:
     return {"detail": "Expense deleted"}
 
 
-def get_total_expenses(db: Session) -> float:
-    return expense_summary_service.get_total_expenses(db)
+def import_expenses(db: Session, stream: BinaryIO, fmt: ImportFormat) -> dict:
+    return expense_import_service.import_expenses(db, stream, fmt)
 
 
-def get_yearly_expenses(db: Session) -> dict:
-    return expense_summary_service.get_yearly_expenses(db)
+# Summaries are served from the async session; the Query-based rollup reads run
+# unchanged on its connection via run_sync, so the event loop is not blocked.
+async def get_total_expenses(db: AsyncSession) -> float:
+    return await db.run_sync(expense_summary_service.get_total_expenses)
 
 
-def get_monthly_expenses(db: Session) -> dict:
-    return expense_summary_service.get_monthly_expenses(db)
+async def get_yearly_expenses(db: AsyncSession) -> dict:
+    return await db.run_sync(expense_summary_service.get_yearly_expenses)
 
 
-def get_half_year_expenses(db: Session) -> dict:
-    return expense_summary_service.get_half_year_expenses(db)
+async def get_monthly_expenses(db: AsyncSession) -> dict:
+    return await db.run_sync(expense_summary_service.get_monthly_expenses)
 
 
-def get_half_month_expenses(
-    db: Session, year: Optional[int] = None, month: Optional[int] = None
+async def get_half_year_expenses(db: AsyncSession) -> dict:
+    return await db.run_sync(expense_summary_service.get_half_year_expenses)
+
+
+async def get_half_month_expenses(
+    db: AsyncSession, year: Optional[int] = None, month: Optional[int] = None
 ) -> dict:
-    return expense_summary_service.get_half_month_expenses(db, year, month)
+    return await db.run_sync(expense_summary_service.get_half_month_expenses, year, month)
 
 
-def get_half_expenses(db: Session, year: int, half: str) -> dict:
-    return expense_summary_service.get_half_expenses(db, year, half)
+async def get_half_expenses(db: AsyncSession, year: int, half: str) -> dict:
+    return await db.run_sync(expense_summary_service.get_half_expenses, year, half)
 
 
-def get_monthwise_expenses(db: Session, year: int, month: Optional[int] = None) -> dict:
-    return expense_summary_service.get_monthwise_expenses(db, year, month)
+async def get_monthwise_expenses(
+    db: AsyncSession, year: int, month: Optional[int] = None
+) -> dict:
+    return await db.run_sync(expense_summary_service.get_monthwise_expenses, year, month)
 
 
-def get_weekly_expenses(db: Session, year: int, month: int) -> dict:
-    return expense_summary_service.get_weekly_expenses(db, year, month)
+async def get_weekly_expenses(db: AsyncSession, year: int, month: int) -> dict:
+    return await db.run_sync(expense_summary_service.get_weekly_expenses, year, month)
 
 
-def get_categorywise_expenses(
-    db: Session, year: Optional[int] = None, month: Optional[int] = None
+async def get_categorywise_expenses(
+    db: AsyncSession, year: Optional[int] = None, month: Optional[int] = None
 ) -> dict:
-    return expense_summary_service.get_categorywise_expenses(db, year, month)
+    return await db.run_sync(expense_summary_service.get_categorywise_expenses, year, month)
+
+
+async def get_dashboard(
+    db: AsyncSession, year: Optional[int] = None, month: Optional[int] = None
+) -> tuple[dict, str]:
+    return await db.run_sync(expense_summary_service.get_dashboard, year, month)
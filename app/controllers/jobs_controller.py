@@ -0,0 +1,39 @@
+# app/controllers/jobs_controller.py
+from __future__ import annotations
+from typing import Any, Dict, List
+
+from fastapi import HTTPException, status
+
+from app.services.job_runner import JobFunction, JobQueueFull, job_runner
+
+# Suggested client back-off when the runner is saturated
+RETRY_AFTER_SECONDS = 30
+
+
+def submit_job(kind: str, fn: JobFunction, **params: Any) -> Dict[str, Any]:
+    """Queue a background job and return the payload for a 202 response."""
+    try:
+        job = job_runner.submit(kind, fn, **params)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Job queue is full: {e}",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "status_url": f"/jobs/{job.id}",
+    }
+
+
+def get_job(job_id: str) -> Dict[str, Any]:
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def list_jobs() -> List[Dict[str, Any]]:
+    return [job.to_dict() for job in job_runner.list()]
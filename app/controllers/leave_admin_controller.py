@@ -283,17 +283,11 @@ class LeaveAdminController:
                 self.repo.use_balance(db, bal, total_hours)
                 final_is_paid = True
 
-        # ── 3) Now write attendance rows with the final is_paid flag ──
-        for day, apply_hours in segments:
-            self.repo.upsert_attendance_leave(
-                db,
-                req.employee_id,
-                day,
-                apply_hours,
-                final_is_paid,
-            )
+        # ── 3) Now write attendance rows with the final is_paid flag (one bulk upsert) ──
+        self.repo.upsert_attendance_leave_days(db, req.employee_id, segments, final_is_paid)
 
         # ── 4) Mark request approved ──
+        # Nothing above commits: the router commits balance, attendance and status together
         self.repo.set_request_status(db, req, "APPROVED", approver_id, note)
         return {"ok": True, "status": "APPROVED", "hours_applied": total_hours}
 
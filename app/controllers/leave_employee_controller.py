@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional, List
 from app.data.models.leave import LeaveStatus
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.schemas.leave_employee_schema import (
@@ -13,12 +14,17 @@ from app.schemas.leave_employee_schema import (
     LeaveRequestOut,
     LeaveSummaryOut,
 )
-from app.services.leave_employee_service import LeaveMeService
+from app.services.leave_employee_service import AsyncLeaveMeService, LeaveMeService
 
 
 class LeaveMeController:
-    def __init__(self, service: Optional[LeaveMeService] = None):
+    def __init__(
+        self,
+        service: Optional[LeaveMeService] = None,
+        async_service: Optional[AsyncLeaveMeService] = None,
+    ):
         self.service = service or LeaveMeService()
+        self.async_service = async_service or AsyncLeaveMeService()
 
     def list_types(self, db: Session) -> List[LeaveTypeOut]:
         return self.service.list_types(db)
@@ -28,10 +34,10 @@ class LeaveMeController:
     ) -> List[LeaveBalanceOut]:
         return self.service.list_balances(db, employee_id, year, month)
 
-    def get_calendar(
-        self, db: Session, employee_id: str, start_dt: datetime, end_dt: datetime
+    async def get_calendar(
+        self, db: AsyncSession, employee_id: str, start_dt: datetime, end_dt: datetime
     ) -> CalendarOut:
-        return self.service.get_calendar(db, employee_id, start_dt, end_dt)
+        return await self.async_service.get_calendar(db, employee_id, start_dt, end_dt)
 
     def apply(self, db: Session, employee_id: str, payload: LeaveApplyIn) -> LeaveRequestOut:
         return self.service.apply(db, employee_id, payload)
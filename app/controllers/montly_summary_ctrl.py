@@ -1,7 +1,11 @@
 from datetime import date
 from sqlalchemy.orm import Session
-from app.services.monthly_summary_service import generate_monthly_summary
-from app.data.repositories.monthly_summary_repo import list_summaries, get_summary
+from app.services.monthly_summary_service import aggregate_month
+from app.data.repositories.monthly_summary_repo import (
+    bulk_upsert_summaries,
+    get_summary,
+    list_summaries,
+)
 
 
 def get_employee_summary(db: Session, employee_id: str, month_start: date):
@@ -13,7 +17,6 @@ def get_month_summaries(db: Session, month_start: date):
 
 
 def rollup_month_summaries(db: Session, month_start: date, employees: list[str]):
-    results = []
-    for emp in employees:
-        results.append(generate_monthly_summary(db, emp, month_start))
+    results = aggregate_month(db, month_start, employees)
+    bulk_upsert_summaries(db, results)
     return results
@@ -28,6 +28,44 @@ class _Settings(BaseModel):
     SUPABASE_BUCKET_PUBLIC: bool = os.getenv("SUPABASE_BUCKET_PUBLIC", "false").lower() == "true"
     SIGNED_URL_EXPIRE_SECONDS: int = int(os.getenv("SIGNED_URL_EXPIRE_SECONDS", "3600"))
 
+    PAYROLL_POLICY_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PAYROLL_POLICY_CACHE_TTL_SECONDS", "300")
+    )
+    CALENDAR_INDEX_TTL_SECONDS: float = float(os.getenv("CALENDAR_INDEX_TTL_SECONDS", "300"))
+    EMPLOYEE_IDENTITY_CACHE_TTL_SECONDS: float = float(
+        os.getenv("EMPLOYEE_IDENTITY_CACHE_TTL_SECONDS", "60")
+    )
+    EXPENSE_DASHBOARD_CACHE_TTL_SECONDS: float = float(
+        os.getenv("EXPENSE_DASHBOARD_CACHE_TTL_SECONDS", "30")
+    )
+    EXPENSE_IMPORT_BATCH_SIZE: int = int(os.getenv("EXPENSE_IMPORT_BATCH_SIZE", "2000"))
+    EXPENSE_IMPORT_MAX_ERRORS: int = int(os.getenv("EXPENSE_IMPORT_MAX_ERRORS", "1000"))
+
+    JOB_MAX_WORKERS: int = int(os.getenv("JOB_MAX_WORKERS", "2"))
+    JOB_MAX_PENDING: int = int(os.getenv("JOB_MAX_PENDING", "8"))
+    JOB_CHUNK_SIZE: int = int(os.getenv("JOB_CHUNK_SIZE", "50"))
+
+    CHECKIN_MONITORING_ENABLED: bool = (
+        os.getenv("CHECKIN_MONITORING_ENABLED", "true").lower() == "true"
+    )
+    CHECKIN_MONITORING_BATCH_SIZE: int = int(os.getenv("CHECKIN_MONITORING_BATCH_SIZE", "50"))
+    CHECKIN_MONITORING_FLUSH_SECONDS: float = float(
+        os.getenv("CHECKIN_MONITORING_FLUSH_SECONDS", "2")
+    )
+    CHECKIN_MONITORING_MAX_QUEUE: int = int(os.getenv("CHECKIN_MONITORING_MAX_QUEUE", "1000"))
+
+    PERF_METRICS_ENABLED: bool = os.getenv("PERF_METRICS_ENABLED", "true").lower() == "true"
+    PERF_WINDOW: int = int(os.getenv("PERF_WINDOW", "1000"))
+    PERF_SLOW_STATEMENTS: int = int(os.getenv("PERF_SLOW_STATEMENTS", "20"))
+
+    FACE_VERIFY_EXECUTOR: str = os.getenv("FACE_VERIFY_EXECUTOR", "thread").lower()
+    FACE_VERIFY_WORKERS: int = int(os.getenv("FACE_VERIFY_WORKERS", "2"))
+    FACE_VERIFY_MAX_QUEUE: int = int(os.getenv("FACE_VERIFY_MAX_QUEUE", "8"))
+    FACE_VERIFY_RETRY_AFTER_SECONDS: int = int(os.getenv("FACE_VERIFY_RETRY_AFTER_SECONDS", "5"))
+    # startup: load models before serving; background: after startup, off the critical
+    # path; off: on the first face request
+    FACE_MODELS_WARMUP: str = os.getenv("FACE_MODELS_WARMUP", "background").lower()
+
 
 settings = _Settings()
 
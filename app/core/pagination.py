@@ -0,0 +1,64 @@
+# app/core/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints that can grow without bound page on a stable sort key such as
+``(created_at, id)`` instead of OFFSET: the next page starts strictly after the
+last row returned, so every page costs one index range scan no matter how deep
+the client has paged. The position is handed to clients as an opaque cursor in
+the ``X-Next-Cursor`` header and as an RFC 8288 ``Link: <...>; rel="next"``.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*key: Any) -> str:
+    """Opaque, URL-safe cursor for a sort key (datetimes are ISO-encoded)."""
+    parts = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps(parts, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor from ``encode_cursor``; raises ValueError when it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(parts, list):
+        raise ValueError("Invalid cursor")
+    return parts
+
+
+def decode_datetime_id_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a ``(created_at, id)`` cursor; None passes through."""
+    if not cursor:
+        return None
+    parts = decode_cursor(cursor)
+    try:
+        created_at, row_id = parts
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def set_next_page_headers(
+    request: Request, response: Response, next_cursor: Optional[str]
+) -> None:
+    """Advertise the next page (if any) via ``X-Next-Cursor`` and a ``Link`` header."""
+    if not next_cursor:
+        return
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
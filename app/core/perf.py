@@ -0,0 +1,300 @@
+# app/core/perf.py
+"""
+Per-route request latency and SQL cost, cheap enough to leave on in production.
+
+``PerfMiddleware`` (pure ASGI, so streaming responses are untouched) opens a
+per-request ``_RequestCost`` in a context variable; cursor-execute listeners on
+the engines (``instrument_engine``) add each statement's count and duration to
+it. Context variables follow the request into ``run_in_threadpool`` and the
+async engine's greenlets, so sync and async endpoints are both covered, and
+statements outside a request (jobs, startup) are ignored.
+
+When the request finishes its route *template* (``/api/{employee_id}/days``,
+never the raw path, so cardinality stays bounded) gets one sample in a
+fixed-size ring buffer of PERF_WINDOW entries; percentiles are computed from
+that window on read. The PERF_SLOW_STATEMENTS slowest statements seen are kept
+(truncated SQL only, never parameters).
+
+Served as JSON at ``/debug/perf`` (admins) and Prometheus text at ``/metrics``.
+
+``startup_timer`` collects how long each cold-start phase took (importing the
+app, the ``lifespan`` warm-ups); ``main`` logs the report once startup is done
+and ``/debug/perf`` includes it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+_SQL_PREVIEW_CHARS = 300
+_UNMATCHED = "<unmatched>"
+
+
+class _RequestCost:
+    __slots__ = ("scope", "statements", "db_seconds")
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None):
+        self.scope = scope or {}
+        self.statements = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the (shared) scope before the endpoint runs
+        return getattr(self.scope.get("route"), "path", None) or _UNMATCHED
+
+
+_current: ContextVar[Optional[_RequestCost]] = ContextVar("perf_request_cost", default=None)
+
+
+@dataclass
+class _RouteStats:
+    window: int
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    statements: int = 0
+    db_seconds: float = 0.0
+    # (latency seconds, statements, db seconds) of the last `window` requests
+    samples: Deque[Tuple[float, int, float]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.samples = deque(maxlen=self.window)
+
+
+def _quantile(values: List[float], q: float) -> float:
+    return values[int(q * (len(values) - 1))] if values else 0.0
+
+
+class PerfRecorder:
+    def __init__(self, window: int = 1000, slow_statements: int = 20):
+        self.window = window
+        self.slow_limit = slow_statements
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+            # min-heap of (seconds, seq, route, sql): the root is the fastest kept
+            self._slow: List[Tuple[float, int, str, str]] = []
+
+    def record_request(
+        self, method: str, cost: _RequestCost, seconds: float, status: int
+    ) -> None:
+        key = (method, cost.route)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats(self.window)
+            stats.count += 1
+            stats.errors += status >= 500
+            stats.total_seconds += seconds
+            stats.statements += cost.statements
+            stats.db_seconds += cost.db_seconds
+            stats.samples.append((seconds, cost.statements, cost.db_seconds))
+
+    def record_statement(self, cost: _RequestCost, statement: str, seconds: float) -> None:
+        cost.statements += 1
+        cost.db_seconds += seconds
+        if self.slow_limit <= 0:
+            return
+        slow = self._slow
+        if len(slow) >= self.slow_limit and seconds <= slow[0][0]:
+            return  # fast path without the lock: not among the slowest
+        entry = (seconds, next(self._seq), cost.route, statement[:_SQL_PREVIEW_CHARS])
+        with self._lock:
+            if len(self._slow) < self.slow_limit:
+                heapq.heappush(self._slow, entry)
+            elif seconds > self._slow[0][0]:
+                heapq.heapreplace(self._slow, entry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = [
+                (method, route, s.count, s.errors, s.total_seconds, s.statements,
+                 s.db_seconds, list(s.samples))
+                for (method, route), s in self._routes.items()
+            ]
+            slow = sorted(self._slow, reverse=True)
+
+        out: List[Dict[str, Any]] = []
+        for method, route, count, errors, total, statements, db_seconds, samples in routes:
+            latencies = sorted(sample[0] for sample in samples)
+            out.append(
+                {
+                    "method": method,
+                    "route": route,
+                    "count": count,
+                    "errors": errors,
+                    "latency_ms_p50": round(_quantile(latencies, 0.50) * 1000, 3),
+                    "latency_ms_p95": round(_quantile(latencies, 0.95) * 1000, 3),
+                    "latency_ms_p99": round(_quantile(latencies, 0.99) * 1000, 3),
+                    "latency_ms_avg": round(total / count * 1000, 3),
+                    "statements_avg": round(statements / count, 2),
+                    "statements_max": max(sample[1] for sample in samples),
+                    "db_ms_avg": round(db_seconds / count * 1000, 3),
+                    "db_ms_total": round(db_seconds * 1000, 3),
+                }
+            )
+        out.sort(key=lambda r: r["latency_ms_avg"] * r["count"], reverse=True)
+        return {
+            "window": self.window,
+            "routes": out,
+            "slowest_statements": [
+                {"ms": round(seconds * 1000, 3), "route": route, "sql": sql}
+                for seconds, _, route, sql in slow
+            ],
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (0.0.4) of the per-route counters and quantiles."""
+        with self._lock:
+            routes = [
+                (method, route, s.count, s.errors, s.total_seconds, s.statements,
+                 s.db_seconds, sorted(sample[0] for sample in s.samples))
+                for (method, route), s in sorted(self._routes.items())
+            ]
+
+        lines = [
+            "# HELP app_request_duration_seconds Request latency (quantiles over the last"
+            f" {self.window} requests per route).",
+            "# TYPE app_request_duration_seconds summary",
+        ]
+        for method, route, count, _, total, _, _, latencies in routes:
+            labels = f'method="{method}",route="{_escape(route)}"'
+            for q in (0.5, 0.95, 0.99):
+                lines.append(
+                    f'app_request_duration_seconds{{{labels},quantile="{q}"}} '
+                    f"{_quantile(latencies, q):.6f}"
+                )
+            lines.append(f"app_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"app_request_duration_seconds_count{{{labels}}} {count}")
+
+        for name, help_text, index, fmt in (
+            ("app_request_errors_total", "Requests answered with a 5xx status.", 3, "{}"),
+            ("app_db_statements_total", "SQL statements executed by requests.", 5, "{}"),
+            ("app_db_seconds_total", "Time spent executing SQL in requests.", 6, "{:.6f}"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for row in routes:
+                labels = f'method="{row[0]}",route="{_escape(row[1])}"'
+                lines.append(f"{name}{{{labels}}} {fmt.format(row[index])}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+perf_recorder = PerfRecorder(
+    window=settings.PERF_WINDOW, slow_statements=settings.PERF_SLOW_STATEMENTS
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Engine listeners
+# ──────────────────────────────────────────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["perf_statement_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    cost = _current.get()
+    started = conn.info.pop("perf_statement_start", None)
+    if cost is not None and started is not None:
+        perf_recorder.record_statement(cost, statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute ``engine``'s statements to the current request (pass ``.sync_engine`` if async)."""
+    if not settings.PERF_METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Middleware
+# ──────────────────────────────────────────────────────────────────────────────
+class PerfMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PERF_METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        cost = _RequestCost(scope)
+        token = _current.set(cost)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            perf_recorder.record_request(
+                scope["method"], cost, time.perf_counter() - started, status
+            )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Startup phases
+# ──────────────────────────────────────────────────────────────────────────────
+class StartupTimer:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._phases: List[Tuple[str, float]] = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self._phases = []
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"phase": name, "ms": round(s * 1000, 1)} for name, s in self._phases]
+
+    def report(self) -> str:
+        phases = self.snapshot()
+        total = sum(p["ms"] for p in phases)
+        parts = ", ".join(f"{p['phase']} {p['ms']:.0f} ms" for p in phases)
+        return f"{parts} (total {total:.0f} ms)"
+
+
+startup_timer = StartupTimer()
@@ -1,11 +1,20 @@
-from supabase import create_client, Client
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 _supabase: Client | None = None
 
 
 def get_supabase() -> Client:
     global _supabase
     if _supabase is None:
+        # supabase pulls in httpx/gotrue/postgrest (~200 ms); only pay for it on first storage use
+        from supabase import create_client
+
         _supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
     return _supabase
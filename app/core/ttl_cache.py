@@ -0,0 +1,83 @@
+# app/core/ttl_cache.py
+"""
+Small thread-safe in-process TTL cache.
+
+Values are computed outside the lock; a value computed while ``invalidate()``
+ran is returned to its caller but not stored, so a write that lands mid-compute
+can never be hidden behind a stale entry for a whole TTL.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    def __init__(self, ttl_seconds: float, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, V]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], V]) -> V:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            generation = self._generation
+        value = compute()
+        self._store(key, value, generation)
+        return value
+
+    async def get_or_compute_async(
+        self, key: Hashable, compute: Callable[[], Awaitable[V]]
+    ) -> V:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            generation = self._generation
+        value = await compute()
+        self._store(key, value, generation)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or every entry when no key is given."""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _store(self, key: Hashable, value: V, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation and self.ttl_seconds > 0:
+                if len(self._entries) >= self.max_entries:
+                    self._evict(time.monotonic())
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def _evict(self, now: float) -> None:
+        # Drop expired entries; if still full, the one closest to expiring
+        for k in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[k]
+        if len(self._entries) >= self.max_entries:
+            del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
@@ -0,0 +1,260 @@
+# app/data/calendar_index.py
+"""
+Process-wide index of compiled working calendars, one per (region, year).
+
+Rollups and monthly reports ask "is this a working day / a holiday?" for every
+date they touch. Answering that from ``workweek_policies`` and
+``holiday_calendar`` meant a query (and a re-parse of ``"1st,3rd"`` Saturday
+rules) per date. Each region's workweek policy and holidays, including
+``recurs_annually`` ones, are compiled once into a ``RegionCalendar``: one
+``DayKind`` byte per day of the year, so every lookup is an index.
+
+Precedence for a date is: a regional holiday over a global (NULL region) one,
+a holiday dated in that year over a recurring one, then the lowest id; any
+holiday over the workweek. Employees without a region get the global holidays
+and the Mon–Fri default.
+
+The cache is invalidated by the policy and leave repositories whenever a
+workweek or holiday is written (again once that session commits). Entries also
+expire after CALENDAR_INDEX_TTL_SECONDS so that other worker processes converge.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from enum import IntEnum
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.data.models.policy import HolidayCalendar, WorkweekPolicy
+
+_WEEKDAY_KEYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+class DayKind(IntEnum):
+    WORKING = 0
+    WEEKEND = 1
+    PAID_HOLIDAY = 2
+    UNPAID_HOLIDAY = 3
+
+
+@dataclass(frozen=True)
+class HolidayEntry:
+    """The holiday_calendar columns the index needs."""
+
+    region: Optional[str]
+    holiday_date: date
+    is_paid: bool
+    recurs_annually: bool
+
+
+def workweek_allows(policy_json: Optional[Dict], d: date) -> bool:
+    """Whether a region's workweek policy (None/empty: Mon–Fri) makes d a working day."""
+    weekday = d.weekday()  # Mon=0 .. Sun=6
+    default = weekday <= 4
+    if not policy_json:
+        return default
+
+    key = _WEEKDAY_KEYS[weekday]
+    rule = policy_json.get(key, default)
+    if isinstance(rule, bool):
+        return rule
+    if key == "sat" and isinstance(rule, str):  # e.g., "1st,3rd"
+        nth = (d.day + 6) // 7  # 1-7 -> 1st, 8-14 -> 2nd, ...
+        wanted = {s.strip().lower() for s in rule.split(",")}
+        return bool({f"{nth}st", f"{nth}nd", f"{nth}rd", f"{nth}th"} & wanted)
+    return default
+
+
+def _occurrence(entry: HolidayEntry, year: int) -> Optional[date]:
+    """Date the holiday falls on in ``year``, if any."""
+    if entry.holiday_date.year == year:
+        return entry.holiday_date
+    if not entry.recurs_annually or entry.holiday_date.year > year:
+        return None
+    try:
+        return entry.holiday_date.replace(year=year)
+    except ValueError:  # 29 February in a non-leap year
+        return None
+
+
+@dataclass(frozen=True)
+class RegionCalendar:
+    """Day kinds of one region for one calendar year."""
+
+    region: Optional[str]
+    year: int
+    kinds: bytes  # kinds[day_of_year - 1]
+
+    def kind(self, d: date) -> DayKind:
+        return DayKind(self.kinds[self._index(d)])
+
+    def is_working(self, d: date) -> bool:
+        return self.kinds[self._index(d)] == DayKind.WORKING
+
+    def holiday_paid(self, d: date) -> Optional[bool]:
+        """True/False for a paid/unpaid holiday, None when d is not a holiday."""
+        kind = self.kinds[self._index(d)]
+        if kind == DayKind.PAID_HOLIDAY:
+            return True
+        if kind == DayKind.UNPAID_HOLIDAY:
+            return False
+        return None
+
+    def count(self, kind: DayKind, start: date, end: date) -> int:
+        """Number of days of ``kind`` in [start..end] inclusive (clamped to this year)."""
+        start = max(start, date(self.year, 1, 1))
+        end = min(end, date(self.year, 12, 31))
+        if start > end:
+            return 0
+        return self.kinds.count(kind, self._index(start), self._index(end) + 1)
+
+    def _index(self, d: date) -> int:
+        if d.year != self.year:
+            raise ValueError(f"{d} is outside the {self.year} calendar")
+        return d.timetuple().tm_yday - 1
+
+
+def compile_calendar(
+    region: Optional[str],
+    year: int,
+    policy_json: Optional[Dict],
+    holidays: Sequence[HolidayEntry],
+) -> RegionCalendar:
+    """Compile a workweek policy and holidays (ordered by id) into a RegionCalendar."""
+    first = date(year, 1, 1)
+    n_days = (date(year + 1, 1, 1) - first).days
+    kinds = bytearray(
+        DayKind.WORKING if workweek_allows(policy_json, first + timedelta(days=i))
+        else DayKind.WEEKEND
+        for i in range(n_days)
+    )
+
+    # Strongest entries first (sorted() is stable, so ids stay ascending within a rank)
+    ranked = sorted(
+        (h for h in holidays if h.region is None or h.region == region),
+        key=lambda h: (h.region is not None, h.holiday_date.year == year),
+        reverse=True,
+    )
+    decided: Set[date] = set()
+    for entry in ranked:
+        d = _occurrence(entry, year)
+        if d is None or d in decided:
+            continue
+        decided.add(d)
+        kind = DayKind.PAID_HOLIDAY if entry.is_paid else DayKind.UNPAID_HOLIDAY
+        kinds[(d - first).days] = kind
+
+    return RegionCalendar(region=region, year=year, kinds=bytes(kinds))
+
+
+class CalendarIndex:
+    """Thread-safe cache of RegionCalendar objects keyed by (region, year)."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[Optional[str], int], Tuple[float, RegionCalendar]] = {}
+
+    def get(self, db: Session, region: Optional[str], year: int) -> RegionCalendar:
+        return self.get_many(db, [region], year)[region]
+
+    def get_many(
+        self, db: Session, regions: Iterable[Optional[str]], year: int
+    ) -> Dict[Optional[str], RegionCalendar]:
+        """Return calendars for the given regions, compiling all misses from two queries."""
+        now = time.monotonic()
+        found: Dict[Optional[str], RegionCalendar] = {}
+        missing = set()
+
+        with self._lock:
+            for region in set(regions):
+                entry = self._entries.get((region, year))
+                if entry is None or entry[0] <= now:
+                    missing.add(region)
+                else:
+                    found[region] = entry[1]
+
+        if missing:
+            loaded = self._load(db, missing, year)
+            expires_at = now + self.ttl_seconds
+            with self._lock:
+                for region, calendar in loaded.items():
+                    self._entries[(region, year)] = (expires_at, calendar)
+            found.update(loaded)
+
+        return found
+
+    def invalidate(self, region: Optional[str] = None) -> None:
+        """Drop one region's calendars, or everything when no region is given."""
+        with self._lock:
+            if region is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == region]:
+                    del self._entries[key]
+
+    def invalidate_on_commit(self, db: Session) -> None:
+        """
+        Invalidate now and again when ``db`` commits, so a calendar rebuilt by
+        another request in between cannot keep the pre-commit data.
+        """
+        self.invalidate()
+        if not event.contains(db, "after_commit", self._after_commit):
+            event.listen(db, "after_commit", self._after_commit, once=True)
+
+    def _after_commit(self, session: Session) -> None:
+        self.invalidate()
+
+    def _load(
+        self, db: Session, regions: Iterable[Optional[str]], year: int
+    ) -> Dict[Optional[str], RegionCalendar]:
+        named = {r for r in regions if r}
+        year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+
+        policies: Dict[str, Dict] = {}
+        if named:
+            for policy_region, policy_json in (
+                db.query(WorkweekPolicy.region, WorkweekPolicy.policy_json)
+                .filter(WorkweekPolicy.region.in_(named))
+                .order_by(WorkweekPolicy.id)
+            ):
+                policies.setdefault(policy_region, policy_json)
+
+        region_filter = or_(HolidayCalendar.region.is_(None), HolidayCalendar.region.in_(named))
+        holidays = [
+            HolidayEntry(h_region, h_date, bool(h_paid), bool(h_recurs))
+            for h_region, h_date, h_paid, h_recurs in db.query(
+                HolidayCalendar.region,
+                HolidayCalendar.holiday_date,
+                HolidayCalendar.is_paid,
+                HolidayCalendar.recurs_annually,
+            )
+            .filter(
+                region_filter,
+                or_(
+                    HolidayCalendar.holiday_date.between(year_start, year_end),
+                    and_(
+                        HolidayCalendar.recurs_annually.is_(True),
+                        HolidayCalendar.holiday_date < year_start,
+                    ),
+                ),
+            )
+            .order_by(HolidayCalendar.id)
+        ]
+
+        return {
+            region: compile_calendar(
+                region, year, policies.get(region) if region else None, holidays
+            )
+            for region in regions
+        }
+
+
+calendar_index = CalendarIndex(ttl_seconds=settings.CALENDAR_INDEX_TTL_SECONDS)
@@ -1,33 +1,48 @@
 from __future__ import annotations
+import logging
 import os
 from pathlib import Path
-from typing import Generator, Any, Dict
+from typing import AsyncGenerator, Generator, Any, Dict, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import CheckConstraint, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
-from sqlalchemy.pool import NullPool
+
+from app.core.perf import instrument_engine
+from app.data.pool import PoolConfig, engine_options, instrument
 
 # ---------- Load .env ----------
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 ENV_PATH = PROJECT_ROOT / ".env"
 load_dotenv(dotenv_path=ENV_PATH)
-print(f"[DB] loaded .env from {ENV_PATH}")
+logger.debug("loaded .env from %s", ENV_PATH)
 
 # ---------- Read DATABASE_URL ----------
 raw_url = os.getenv("DATABASE_URL")
-print(f"[DB] raw DATABASE_URL: {raw_url!r}")
 
 # ---------- Fallback to SQLite if missing or invalid ----------
 if not raw_url or not raw_url.startswith("postgres"):
     dev_db_path = PROJECT_ROOT.parent / "dev.db"
     raw_url = f"sqlite:///{dev_db_path}"
-    print(f"[DB] Using fallback SQLite: {raw_url}")
+    logger.info("DATABASE_URL not set to Postgres, using fallback SQLite: %s", raw_url)
 
 # ---------- Normalize and configure ----------
-engine_kwargs: Dict[str, Any] = dict(pool_pre_ping=True)
+# Pooling comes from DB_POOL_* (see app/data/pool.py); pool_mode is resolved per backend
+pool_config = PoolConfig.from_env()
+pool_mode = pool_config.resolve_mode("sqlite" if raw_url.startswith("sqlite") else "postgresql")
+engine_kwargs: Dict[str, Any] = dict(pool_pre_ping=pool_config.pre_ping)
 
 try:
     if raw_url.startswith("postgres://"):
@@ -55,16 +70,17 @@ try:
             },
         )
 
-        if "pooler.supabase.com" in (parsed.hostname or ""):
-            engine_kwargs["poolclass"] = NullPool
+        pool_mode = pool_config.resolve_mode("postgresql", parsed.hostname, parsed.port)
+        engine_kwargs = engine_options(pool_mode, pool_config, driver="psycopg")
 
-        print(
-            f"[DB] parsed -> user={url.username} host={url.host} port={url.port} db={url.database}"
+        logger.info(
+            "database user=%s host=%s port=%s db=%s pool=%s",
+            url.username, url.host, url.port, url.database, pool_mode,
         )
         engine = create_engine(url, **engine_kwargs)
 
     elif raw_url.startswith("sqlite:///"):
-        engine_kwargs["poolclass"] = NullPool
+        engine_kwargs = engine_options(pool_mode, pool_config, driver="pysqlite")
         engine_kwargs["connect_args"] = {"check_same_thread": False}
         engine = create_engine(raw_url, **engine_kwargs)
 
@@ -72,13 +88,57 @@ try:
         raise ValueError(f"Unsupported database backend: {raw_url}")
 
 except Exception as e:
-    print(f"[DB] URL parse/normalize failed: {e}")
+    logger.warning("DATABASE_URL parse/normalize failed: %s", e)
     engine = create_engine(raw_url, **engine_kwargs)
 
+instrument(engine)
+instrument_engine(engine)
+
 # ---------- Create session and base ----------
 Base = declarative_base()
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# ---------- Async engine (created on first use) ----------
+# Same database and pool mode as ``engine``, through psycopg's async driver (or
+# aiosqlite for the SQLite fallback). Bound lazily so processes that never serve
+# an async route do not import the async driver.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        url = engine.url
+        if url.get_backend_name() == "sqlite":
+            url = url.set(drivername="sqlite+aiosqlite")
+        driver = "psycopg" if url.get_backend_name() == "postgresql" else "aiosqlite"
+        _async_engine = create_async_engine(
+            url, **engine_options(pool_mode, pool_config, driver=driver, is_async=True)
+        )
+        instrument(_async_engine.sync_engine)
+        instrument_engine(_async_engine.sync_engine)
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+# ---------- SQLite compatibility ----------
+# JSONB columns are Postgres-only; render them as JSON so the SQLite fallback can
+# create and use the same tables (local runs, background jobs, tests).
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+# Same for regex CHECKs (``code ~ '...'``): SQLite cannot parse ``~``, so they are
+# left out there and only enforced on Postgres.
+@compiles(CheckConstraint, "sqlite")
+def _compile_check_for_sqlite(constraint, compiler, **kw):
+    if " ~ " in str(constraint.sqltext):
+        return None
+    return compiler.visit_check_constraint(constraint, **kw)
+
+
 # ---------- Startup probe ----------
 # Commented out to speed up startup
 # try:
@@ -103,5 +163,11 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Enable automatic table creation on startup
 # Base.metadata.create_all(bind=engine)  # Commented out to prevent hanging on startup; use Alembic migrations instead
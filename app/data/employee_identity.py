@@ -0,0 +1,104 @@
+# app/data/employee_identity.py
+"""
+Shared lookup of the few employee columns most requests need.
+
+A check-in used to load the same ``employees`` row two or three times (the
+existence check, then report and calendar code asking for the name or region
+again). ``employee_identity.get`` resolves ``employee_id`` to an
+``EmployeeIdentity`` once:
+
+- per request: the answer is kept in the session's ``info`` dict, so every
+  service using that session reuses it, including "not found";
+- per process: found employees are kept for EMPLOYEE_IDENTITY_CACHE_TTL_SECONDS
+  so the next requests skip the query entirely.
+
+Employee create/update/delete invalidate the process cache (``EmployeeService``).
+Other worker processes converge within the TTL; the cached columns change rarely
+and nothing here decides pay.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.data.models.add_employee import Department, Employee
+
+_SESSION_KEY = "employee_identity"
+
+
+@dataclass(frozen=True)
+class EmployeeIdentity:
+    employee_id: str
+    name: str
+    region: Optional[str]
+    department: Department
+
+
+def _identity_stmt(employee_id: str):
+    return select(Employee.employee_id, Employee.name, Employee.region, Employee.department).where(
+        Employee.employee_id == employee_id
+    )
+
+
+def _identity(row) -> Optional[EmployeeIdentity]:
+    return EmployeeIdentity(*row) if row else None
+
+
+class EmployeeIdentityCache:
+    def __init__(self, ttl_seconds: float):
+        # Misses are stored as None, which TTLCache treats as absent: not-found
+        # is only remembered for the request (unknown ids never pin entries)
+        self._cache: TTLCache[Optional[EmployeeIdentity]] = TTLCache(ttl_seconds, 4096)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def get(self, db: Session, employee_id: str) -> Optional[EmployeeIdentity]:
+        """The employee's identity, or None when no such employee exists."""
+        seen = self._request_map(db)
+        if employee_id not in seen:
+            seen[employee_id] = self._cache.get_or_compute(
+                employee_id, lambda: _identity(db.execute(_identity_stmt(employee_id)).first())
+            )
+        return seen[employee_id]
+
+    async def get_async(self, db: AsyncSession, employee_id: str) -> Optional[EmployeeIdentity]:
+        seen = self._request_map(db)
+        if employee_id not in seen:
+
+            async def load() -> Optional[EmployeeIdentity]:
+                return _identity((await db.execute(_identity_stmt(employee_id))).first())
+
+            seen[employee_id] = await self._cache.get_or_compute_async(employee_id, load)
+        return seen[employee_id]
+
+    def invalidate(self, employee_id: Optional[str] = None, db: Optional[Session] = None) -> None:
+        """Drop one employee (or all), also from ``db``'s request map when given."""
+        self._cache.invalidate(employee_id)
+        if db is not None:
+            seen = self._request_map(db)
+            if employee_id is None:
+                seen.clear()
+            else:
+                seen.pop(employee_id, None)
+
+    @staticmethod
+    def _request_map(
+        db: Union[Session, AsyncSession],
+    ) -> Dict[str, Optional[EmployeeIdentity]]:
+        return db.info.setdefault(_SESSION_KEY, {})
+
+
+employee_identity = EmployeeIdentityCache(ttl_seconds=settings.EMPLOYEE_IDENTITY_CACHE_TTL_SECONDS)
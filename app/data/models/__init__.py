@@ -4,7 +4,7 @@ from app.data.models.policy import WorkweekPolicy, HolidayCalendar
 from app.data.models.shifts import Shift, EmployeeShiftAssignment
 from app.data.models.leave import LeaveType, LeaveRequest, LeaveBalance
 from app.data.models.admin import Admin
-from app.data.models.expenses import Expense
+from app.data.models.expenses import Expense, ExpenseDailyTotal
 from app.data.models.shift_grace_policy import ShiftGracePolicy
 from app.data.models.employee_bank_detail import EmployeeBankDetail
 from app.data.models.employee_salary import EmployeeSalary
@@ -45,6 +45,7 @@ __all__ = [
     "CheckInMonitoring",
     "Admin",
     "Expense",
+    "ExpenseDailyTotal",
     "ShiftGracePolicy",
     "EmployeeBankDetail",
 ]
@@ -1,7 +1,7 @@
 # app/features/attendance.py
 from __future__ import annotations
 from datetime import datetime, date, timedelta
-from typing import Iterable, Optional, List, Dict
+from typing import Iterable, Optional, List, Dict, Tuple
 
 from enum import Enum
 from zoneinfo import ZoneInfo
@@ -27,10 +27,11 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 
 from app.data.db import Base, SessionLocal
+from app.data.upsert import upsert_rows
+from app.data.calendar_index import calendar_index
 from app.data.models.add_employee import (
     Employee,
 )  # uses employees.employee_id as business key
-from app.data.models.policy import WorkweekPolicy, HolidayCalendar
 
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -209,56 +210,14 @@ class CheckInMonitoring(Base):
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def _nth_weekday_of_month(d: date) -> int:
-    """Return ordinal of weekday in month (e.g., 1..5 for Saturdays)."""
-    # e.g., for 3rd Saturday, returns 3 when d is that Saturday
-    day = d.day
-    return (day + 6) // 7  # 1-7 -> 1, 8-14 -> 2, 15-21 -> 3, etc.
-
-
 def _is_working_day(db: Session, region: Optional[str], d: date) -> bool:
-    # Default Mon–Fri working, Sat/Sun off
-    weekday = d.weekday()  # Mon=0 .. Sun=6
-    default = weekday <= 4
-
-    if not region:
-        return default
-
-    policy: Optional[WorkweekPolicy] = (
-        db.query(WorkweekPolicy).filter(WorkweekPolicy.region == region).one_or_none()
-    )
-    if not policy or not policy.policy_json:
-        return default
-
-    pj = policy.policy_json
-    mapping = {0: "mon", 1: "tue", 2: "wed", 3: "thu", 4: "fri", 5: "sat", 6: "sun"}
-    key = mapping.get(weekday)
-    rule = pj.get(key, default)
-
-    if isinstance(rule, bool):
-        return rule
-    if key == "sat" and isinstance(rule, str):  # e.g., "1st,3rd"
-        nth = _nth_weekday_of_month(d)
-        wanted = {s.strip().lower() for s in rule.split(",")}
-        return (
-            (f"{nth}st" in wanted)
-            or (f"{nth}nd" in wanted)
-            or (f"{nth}rd" in wanted)
-            or (f"{nth}th" in wanted)
-        )
-    return default
+    # Region workweek policy (default Mon–Fri); holidays are not working days
+    return calendar_index.get(db, region, d.year).is_working(d)
 
 
 def _holiday_is_paid(db: Session, region: Optional[str], d: date) -> Optional[bool]:
-    # Region match or global (NULL region)
-    row = (
-        db.query(HolidayCalendar)
-        .filter(HolidayCalendar.holiday_date == d)
-        .filter((HolidayCalendar.region == region) | (HolidayCalendar.region.is_(None)))
-        .order_by(HolidayCalendar.region.desc().nulls_last())
-        .first()
-    )
-    return None if not row else bool(row.is_paid)
+    # Region match or global (NULL region), including recurring holidays
+    return calendar_index.get(db, region, d.year).holiday_paid(d)
 
 
 def _employee_region(db: Session, employee_id: str) -> Optional[str]:
@@ -287,25 +246,15 @@ def _local_date_ist(ts_utc: datetime) -> date:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def rollup_day(db: Session, employee_id: str, d: date) -> AttendanceDay:
-    """Compute and upsert AttendanceDay for employee_id on local date d."""
-    region = _employee_region(db, employee_id)
-
-    # Gather sessions
-    sessions: List[AttendanceSession] = (
-        db.query(AttendanceSession)
-        .filter(AttendanceSession.employee_id == employee_id)
-        .filter(AttendanceSession.work_date_local == d)
-        .all()
-    )
+def _compute_day(
+    sessions: Iterable[AttendanceSession], is_working: bool, holiday_paid: Optional[bool]
+) -> Dict[str, object]:
+    """Rollup column values for one employee-day from its sessions and resolved policy."""
+    sessions = list(sessions)
     seconds_worked = _sum_session_seconds(sessions)
     first_in = min((s.check_in_utc for s in sessions), default=None)
     last_out = max((s.check_out_utc for s in sessions if s.check_out_utc), default=None)
 
-    # Policy resolution
-    is_working = _is_working_day(db, region, d)
-    holiday_paid = _holiday_is_paid(db, region, d)
-
     # Expected hours: 8h if working; 0 if weekend; holiday handled below
     expected_seconds = 8 * 3600 if is_working else 0
 
@@ -343,6 +292,37 @@ def rollup_day(db: Session, employee_id: str, d: date) -> AttendanceDay:
                 status = DayStatus.ABSENT
                 unpaid_seconds = expected_seconds
 
+    return {
+        "seconds_worked": seconds_worked,
+        "expected_seconds": expected_seconds,
+        "paid_leave_seconds": paid_leave_seconds,
+        "overtime_seconds": overtime_seconds,
+        "underwork_seconds": underwork_seconds,
+        "unpaid_seconds": unpaid_seconds,
+        "first_check_in_utc": first_in,
+        "last_check_out_utc": last_out,
+        "leave_type_code": leave_type_code,
+        "status": status,
+    }
+
+
+def rollup_day(db: Session, employee_id: str, d: date) -> AttendanceDay:
+    """Compute and upsert AttendanceDay for employee_id on local date d."""
+    region = _employee_region(db, employee_id)
+
+    # Gather sessions
+    sessions: List[AttendanceSession] = (
+        db.query(AttendanceSession)
+        .filter(AttendanceSession.employee_id == employee_id)
+        .filter(AttendanceSession.work_date_local == d)
+        .all()
+    )
+    values = _compute_day(
+        sessions,
+        is_working=_is_working_day(db, region, d),
+        holiday_paid=_holiday_is_paid(db, region, d),
+    )
+
     # Upsert day
     day: Optional[AttendanceDay] = (
         db.query(AttendanceDay)
@@ -353,32 +333,113 @@ def rollup_day(db: Session, employee_id: str, d: date) -> AttendanceDay:
         day = AttendanceDay(employee_id=employee_id, work_date_local=d)
         db.add(day)
 
-    day.seconds_worked = seconds_worked
-    day.expected_seconds = expected_seconds
-    day.paid_leave_seconds = paid_leave_seconds
-    day.overtime_seconds = overtime_seconds
-    day.underwork_seconds = underwork_seconds
-    day.unpaid_seconds = unpaid_seconds
-    day.first_check_in_utc = first_in
-    day.last_check_out_utc = last_out
-    day.leave_type_code = leave_type_code
-    day.status = status
+    for field, value in values.items():
+        setattr(day, field, value)
 
     return day
 
 
 def recompute_range(db: Session, employee_ids: Iterable[str], start: date, end: date) -> int:
-    """Recompute [start..end] inclusive for listed employees."""
+    """
+    Recompute [start..end] inclusive for listed employees.
+
+    Same rules as ``rollup_day``, but regions and sessions for the whole employee
+    set and range are loaded in two queries, working days and holidays come from
+    the calendar index, every day is computed in memory and ``attendance_days``
+    is bulk-upserted.
+    """
     if start > end:
         raise ValueError("start > end")
-    n = 0
-    cur = start
-    while cur <= end:
-        for emp in employee_ids:
-            rollup_day(db, emp, cur)
-            n += 1
-        cur += timedelta(days=1)
-    return n
+    ids = list(dict.fromkeys(employee_ids))
+    if not ids:
+        return 0
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    regions: Dict[str, Optional[str]] = {
+        emp_id: region
+        for emp_id, region in db.query(Employee.employee_id, Employee.region).filter(
+            Employee.employee_id.in_(ids)
+        )
+    }
+    sessions: Dict[Tuple[str, date], List[AttendanceSession]] = {}
+    for sess in db.query(AttendanceSession).filter(
+        AttendanceSession.employee_id.in_(ids),
+        AttendanceSession.work_date_local.between(start, end),
+    ):
+        sessions.setdefault((sess.employee_id, sess.work_date_local), []).append(sess)
+
+    calendars = {
+        year: calendar_index.get_many(db, [regions.get(emp_id) for emp_id in ids], year)
+        for year in range(start.year, end.year + 1)
+    }
+
+    rows: List[Dict[str, object]] = []
+    for emp_id in ids:
+        region = regions.get(emp_id)
+        for d in dates:
+            calendar = calendars[d.year][region]
+            values = _compute_day(
+                sessions.get((emp_id, d), ()),
+                is_working=calendar.is_working(d),
+                holiday_paid=calendar.holiday_paid(d),
+            )
+            rows.append({"employee_id": emp_id, "work_date_local": d, **values})
+
+    _upsert_days(db, rows)
+    return len(rows)
+
+
+_ROLLUP_FIELDS = (
+    "seconds_worked",
+    "expected_seconds",
+    "paid_leave_seconds",
+    "overtime_seconds",
+    "underwork_seconds",
+    "unpaid_seconds",
+    "first_check_in_utc",
+    "last_check_out_utc",
+    "leave_type_code",
+    "status",
+)
+
+
+def _upsert_days(db: Session, rows: List[Dict[str, object]]) -> None:
+    """Bulk INSERT .. ON CONFLICT the computed day rows (ORM loop on other dialects)."""
+    db.flush()  # pending ORM changes to these rows go first
+    written = upsert_rows(
+        db,
+        AttendanceDay,
+        rows,
+        index_elements=("employee_id", "work_date_local"),
+        set_=lambda excluded: {
+            **{field: excluded[field] for field in _ROLLUP_FIELDS},
+            "updated_at": func.now(),
+        },
+        constraint="uq_attendance_day_emp_date",
+    )
+    if written:
+        # Day objects already loaded in this session no longer match the table
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, AttendanceDay):
+                db.expire(obj)
+        return
+
+    existing = {
+        (day.employee_id, day.work_date_local): day
+        for day in db.query(AttendanceDay).filter(
+            AttendanceDay.employee_id.in_({r["employee_id"] for r in rows}),
+            AttendanceDay.work_date_local.in_({r["work_date_local"] for r in rows}),
+        )
+    }
+    for row in rows:
+        day = existing.get((row["employee_id"], row["work_date_local"]))  # type: ignore[arg-type]
+        if day is None:
+            day = AttendanceDay(
+                employee_id=row["employee_id"], work_date_local=row["work_date_local"]
+            )
+            db.add(day)
+        for field in _ROLLUP_FIELDS:
+            setattr(day, field, row[field])
 
 
 # ──────────────────────────────────────────────────────────────────────────────
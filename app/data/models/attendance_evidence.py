@@ -98,4 +98,7 @@ class AttendanceEvidence(Base):
     __table_args__ = (
         Index("ix_evidence_session_type", "session_id", "evidence_type"),
         Index("ix_evidence_verified", "verified"),
+        # Keyset pagination on (created_at, id), per session and across an employee's sessions
+        Index("ix_evidence_session_created", "session_id", "created_at", "id"),
+        Index("ix_evidence_created_id", "created_at", "id"),
     )
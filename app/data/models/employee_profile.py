@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, LargeBinary, String, DateTime, ForeignKey, func
 from app.data.db import Base
 
 
@@ -21,6 +21,11 @@ class EmployeeProfile(Base):
 
     profile_updated_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Precomputed face features of the profile image (see FaceFeatures.to_bytes) and the
+    # "<profile_path>@<profile_updated_at>" key of the image they were computed from.
+    face_features = Column(LargeBinary, nullable=True)
+    face_features_key = Column(String, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -9,6 +9,8 @@ from sqlalchemy import (
     Text,
     DateTime,
     Enum as SqlEnum,
+    Index,
+    PrimaryKeyConstraint,
     func,
 )
 from sqlalchemy.orm import Mapped
@@ -42,3 +44,26 @@ class Expense(Base):
     added_by = Column(String(100), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        # Date-range (+ category) filters and summaries
+        Index("ix_expenses_date_category", "date", "category"),
+        # Keyset pagination of the expense list, newest first
+        Index("ix_expenses_created_at_id", "created_at", "id"),
+    )
+
+
+class ExpenseDailyTotal(Base):
+    """
+    Pre-aggregated expenses per (date, category), kept in step with ``expenses``
+    by ExpenseRepository so dashboard summaries never scan the raw table.
+    """
+
+    __tablename__ = "expense_daily_totals"
+
+    date = Column(Date, nullable=False)
+    category = Column(String(32), nullable=False)  # ExpenseCategory value
+    total_amount = Column(Float, nullable=False, default=0.0)
+    tx_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (PrimaryKeyConstraint("date", "category", name="pk_expense_daily_totals"),)
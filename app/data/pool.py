@@ -0,0 +1,209 @@
+# app/data/pool.py
+"""
+Connection pool configuration and instrumentation for the application engine.
+
+Every request used to open a new TLS connection to Postgres (NullPool was forced
+for the Supabase pooler host), so the handshake dominated cheap endpoints. The
+pool is now chosen by ``DB_POOL_MODE``:
+
+``queue``
+    A client-side QueuePool. For a direct Postgres host or the Supabase
+    session pooler (port 5432).
+``transaction``
+    QueuePool with psycopg 3 prepared statements disabled. For the Supabase
+    transaction pooler (port 6543) or PgBouncer in transaction mode, where
+    consecutive transactions on one client connection can land on different
+    server connections that do not share prepared statements.
+``pgbouncer``
+    No client-side pooling (NullPool), prepared statements disabled. For an
+    app-local PgBouncer that already pools, so connections are cheap to open
+    and holding them here would only pin server slots.
+``null``
+    NullPool with no other changes (the previous behaviour).
+
+When DB_POOL_MODE is unset, Postgres gets ``transaction`` on the Supabase
+pooler's transaction port and ``queue`` otherwise; SQLite keeps ``null``,
+since opening a local file costs next to nothing.
+
+The async engine (``app.data.db.get_async_engine``) gets the same mode with
+the asyncio-adapted QueuePool. All pool classes time every checkout, including
+waits for a free connection and new connects, into ``pool_metrics`` (served at
+``/debug/db/pool``).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+POOL_MODES = ("queue", "transaction", "pgbouncer", "null")
+SUPABASE_TRANSACTION_PORT = 6543
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    mode: Optional[str] = None  # None: pick from the backend (see module docstring)
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30.0
+    recycle: int = 1800
+    lifo: bool = True
+    pre_ping: bool = True
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        mode = os.getenv("DB_POOL_MODE", "").strip().lower() or None
+        if mode is not None and mode not in POOL_MODES:
+            raise ValueError(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, got {mode!r}")
+        return cls(
+            mode=mode,
+            size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            lifo=_env_bool("DB_POOL_LIFO", True),
+            pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+        )
+
+    def resolve_mode(
+        self, backend: str, host: Optional[str] = None, port: Optional[int] = None
+    ) -> str:
+        if self.mode:
+            return self.mode
+        if backend == "sqlite":
+            return "null"
+        if "pooler.supabase.com" in (host or "") and port == SUPABASE_TRANSACTION_PORT:
+            return "transaction"
+        return "queue"
+
+
+def engine_options(
+    mode: str, config: PoolConfig, driver: str = "psycopg", is_async: bool = False
+) -> Dict[str, Any]:
+    """``create_engine`` (or, with is_async, ``create_async_engine``) kwargs for a pool mode."""
+    options: Dict[str, Any] = {"pool_pre_ping": config.pre_ping}
+    if mode in ("queue", "transaction"):
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=config.size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.timeout,
+            pool_recycle=config.recycle,
+            pool_use_lifo=config.lifo,
+        )
+    else:
+        options["poolclass"] = InstrumentedNullPool
+    if mode in ("transaction", "pgbouncer") and driver == "psycopg":
+        # psycopg 3 prepares a statement after 5 executions; a transaction pooler
+        # may route the next execution to a server connection that never saw it
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters and a rolling window of checkout wait times."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self._waits.clear()
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts, total_wait = self.checkouts, self.total_wait
+            data: Dict[str, Any] = {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "wait_ms_avg": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+        for label, q in (("wait_ms_p50", 0.50), ("wait_ms_p95", 0.95), ("wait_ms_p99", 0.99)):
+            data[label] = round(waits[int(q * (len(waits) - 1))] * 1000, 3) if waits else 0.0
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPool(Pool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_InstrumentedPool, NullPool):
+    pass
+
+
+def instrument(engine: Engine) -> None:
+    """Count physical connections opened by ``engine``'s pool (pass ``.sync_engine`` if async)."""
+    event.listen(engine, "connect", lambda *_: pool_metrics.record_connect())
+
+
+def pool_status(engine: Engine, mode: str) -> Dict[str, Any]:
+    """Current pool occupancy plus ``pool_metrics`` for the debug endpoint."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"mode": mode, "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            timeout=pool.timeout(),
+        )
+    status.update(pool_metrics.snapshot())
+    return status
@@ -4,6 +4,7 @@ from __future__ import annotations
 from typing import Optional, Tuple, List, cast
 from sqlalchemy.orm import Session
 from sqlalchemy import select, or_, func
+from app.data.employee_identity import employee_identity
 from app.data.models.add_employee import Employee, Department
 
 
@@ -11,12 +12,15 @@ class EmployeeRepository:
     def update(self, db: Session, obj: Employee) -> Employee:
         db.add(obj)
         db.commit()
+        employee_identity.invalidate(db=db)  # employee_id itself may have changed
         db.refresh(obj)
         return obj
 
     def delete(self, db: Session, obj: Employee) -> None:
+        employee_id = obj.employee_id
         db.delete(obj)
         db.commit()
+        employee_identity.invalidate(employee_id, db)
 
     def get_by_employee_id(self, db: Session, code: str) -> Optional[Employee]:
         return db.execute(select(Employee).where(Employee.employee_id == code)).scalar_one_or_none()
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 from datetime import datetime, date
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 from calendar import monthrange
 
-from sqlalchemy import select, and_
+from sqlalchemy import Row, select, and_, or_, func, insert, literal, tuple_, RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.data.models.attendance import (
@@ -14,11 +15,61 @@ from app.data.models.attendance import (
     CheckInMonitoring,
     DayStatus,  # Enum -> binds to DB enum values like "Present"
 )
-from app.data.models.add_employee import Employee
+from app.data.models.add_employee import Department, Employee
+from app.data.models.attendance_evidence import AttendanceEvidence
+from app.data.upsert import dialect_insert
 
 EIGHT_HOURS = 8 * 60 * 60  # 28_800
 
 
+# ─────────────────────────────
+# Read statements (shared by the sync and async repositories)
+# ─────────────────────────────
+def _open_session_stmt(employee_id: str):
+    """Most recent open session (check_out_utc is NULL) for an employee."""
+    return (
+        select(AttendanceSession)
+        .where(
+            and_(
+                AttendanceSession.employee_id == employee_id,
+                AttendanceSession.check_out_utc.is_(None),
+            )
+        )
+        .order_by(AttendanceSession.id.desc())
+        .limit(1)
+    )
+
+
+def _day_stmt(employee_id: str, work_date_local: date):
+    return select(AttendanceDay).where(
+        (AttendanceDay.employee_id == employee_id)
+        & (AttendanceDay.work_date_local == work_date_local)
+    )
+
+
+def _days_stmt(employee_id: str, date_from: date, date_to: date):
+    """AttendanceDay rows in [date_from, date_to] inclusive, by date."""
+    return (
+        select(AttendanceDay)
+        .where(
+            and_(
+                AttendanceDay.employee_id == employee_id,
+                AttendanceDay.work_date_local >= date_from,
+                AttendanceDay.work_date_local <= date_to,
+            )
+        )
+        .order_by(AttendanceDay.work_date_local.asc())
+    )
+
+
+def _employee_stmt(employee_id: str):
+    return select(Employee).where(Employee.employee_id == employee_id)
+
+
+def _month_bounds(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
 class AttendanceRepository:
     # ─────────────────────────────
     # Sessions
@@ -27,25 +78,13 @@ class AttendanceRepository:
         """
         Return the most recent open session (check_out_utc is NULL) for an employee, if any.
         """
-        stmt = (
-            select(AttendanceSession)
-            .where(
-                and_(
-                    AttendanceSession.employee_id == employee_id,
-                    AttendanceSession.check_out_utc.is_(None),
-                )
-            )
-            .order_by(AttendanceSession.id.desc())
-            .limit(1)
-        )
-        return db.execute(stmt).scalar_one_or_none()
+        return db.execute(_open_session_stmt(employee_id)).scalar_one_or_none()
 
     def get_session_by_id(self, db: Session, session_id: int) -> AttendanceSession | None:
         """
-        Fetch a session by its ID.
+        Fetch a session by its ID (no query when it is already in this session).
         """
-        stmt = select(AttendanceSession).where(AttendanceSession.id == session_id)
-        return db.execute(stmt).scalar_one_or_none()
+        return db.get(AttendanceSession, session_id)
 
     def create_session(
         self,
@@ -82,11 +121,7 @@ class AttendanceRepository:
         """
         Fetch the AttendanceDay row (one per employee per local date).
         """
-        stmt = select(AttendanceDay).where(
-            (AttendanceDay.employee_id == employee_id)
-            & (AttendanceDay.work_date_local == work_date_local)
-        )
-        return db.execute(stmt).scalar_one_or_none()
+        return db.execute(_day_stmt(employee_id, work_date_local)).scalar_one_or_none()
 
     def upsert_day_add_work(
         self,
@@ -101,30 +136,110 @@ class AttendanceRepository:
         Ensure the daily rollup row exists and add 'seconds' to seconds_worked.
         Sets safe defaults for NOT NULL columns. The policy/rollup layer can
         later overwrite expected_seconds/status for weekends/holidays/leave.
+
+        Runs as one INSERT .. ON CONFLICT DO UPDATE: the increment and the
+        first/last punch bounds are computed by the database against the row
+        as it is at write time, so concurrent check-outs (or a leave approval
+        touching the same day) cannot lose each other's updates, and no SELECT
+        precedes the write. Dialects without ON CONFLICT fall back to
+        read-modify-write.
         """
+        seconds = max(0, int(seconds or 0))  # never subtract
+        stmt = dialect_insert(db, AttendanceDay)
+        if stmt is None:
+            return self._add_work_read_modify_write(
+                db, employee_id, work_date_local, start_utc, end_utc, seconds
+            )
+
+        db.flush()  # pending ORM changes to this day go first
+        stmt = stmt.values(
+            employee_id=employee_id,
+            work_date_local=work_date_local,
+            # NOT NULL metrics (safe defaults)
+            seconds_worked=seconds,
+            expected_seconds=EIGHT_HOURS,
+            paid_leave_seconds=0,
+            overtime_seconds=0,
+            underwork_seconds=0,
+            unpaid_seconds=0,
+            # timestamps
+            first_check_in_utc=start_utc,
+            last_check_out_utc=end_utc,
+            # IMPORTANT: pass Enum, not raw uppercase strings
+            status=DayStatus.PRESENT,  # binds to "Present" in DB
+            lock_flag=False,
+        )
+        day, new = AttendanceDay.__table__.c, stmt.excluded
+        least: Any
+        greatest: Any
+        target: dict[str, Any]
+        if db.get_bind().dialect.name == "postgresql":
+            least, greatest = func.least, func.greatest
+            target = {"constraint": "uq_attendance_day_emp_date"}
+        else:
+            # SQLite's multi-argument min()/max() are the scalar LEAST/GREATEST
+            least, greatest = func.min, func.max
+            target = {"index_elements": ["employee_id", "work_date_local"]}
+
+        stmt = stmt.on_conflict_do_update(
+            **target,
+            set_={
+                "seconds_worked": day.seconds_worked + new.seconds_worked,
+                # Expand first/last punch boundaries if needed
+                "first_check_in_utc": least(
+                    func.coalesce(day.first_check_in_utc, new.first_check_in_utc),
+                    new.first_check_in_utc,
+                ),
+                "last_check_out_utc": greatest(
+                    func.coalesce(day.last_check_out_utc, new.last_check_out_utc),
+                    new.last_check_out_utc,
+                ),
+                # Normalize legacy nulls if any (after schema evolution)
+                **{
+                    col: func.coalesce(day[col], new[col])
+                    for col in (
+                        "expected_seconds",
+                        "paid_leave_seconds",
+                        "overtime_seconds",
+                        "underwork_seconds",
+                        "unpaid_seconds",
+                        "status",
+                    )
+                },
+                "updated_at": func.now(),
+            },
+        ).returning(AttendanceDay)
+        # populate_existing: a copy of this day already in the session is refreshed
+        return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+    def _add_work_read_modify_write(
+        self,
+        db: Session,
+        employee_id: str,
+        work_date_local: date,
+        start_utc: datetime,
+        end_utc: datetime,
+        seconds: int,
+    ) -> AttendanceDay:
         d = self.get_day(db, employee_id, work_date_local)
         if not d:
             d = AttendanceDay(
                 employee_id=employee_id,
                 work_date_local=work_date_local,
-                # NOT NULL metrics (safe defaults)
                 seconds_worked=0,
                 expected_seconds=EIGHT_HOURS,
                 paid_leave_seconds=0,
                 overtime_seconds=0,
                 underwork_seconds=0,
                 unpaid_seconds=0,
-                # timestamps
                 first_check_in_utc=start_utc,
                 last_check_out_utc=end_utc,
-                # IMPORTANT: pass Enum, not raw uppercase strings
-                status=DayStatus.PRESENT,  # binds to "Present" in DB
+                status=DayStatus.PRESENT,
                 lock_flag=False,
             )
             db.add(d)
             db.flush()
         else:
-            # Normalize legacy nulls if any (after schema evolution)
             if d.expected_seconds is None:
                 d.expected_seconds = EIGHT_HOURS
             if d.paid_leave_seconds is None:
@@ -137,15 +252,12 @@ class AttendanceRepository:
                 d.unpaid_seconds = 0
             if d.status is None:
                 d.status = DayStatus.PRESENT
-
-            # Expand first/last punch boundaries if needed
             if not d.first_check_in_utc or start_utc < d.first_check_in_utc:
                 d.first_check_in_utc = start_utc
             if not d.last_check_out_utc or end_utc > d.last_check_out_utc:
                 d.last_check_out_utc = end_utc
 
-        # Accumulate worked time (never subtract)
-        d.seconds_worked += max(0, int(seconds or 0))
+        d.seconds_worked += seconds
         return d
 
     def month_days(
@@ -154,16 +266,7 @@ class AttendanceRepository:
         """
         Return all AttendanceDay rows for the given calendar month (local).
         """
-        start = date(year, month, 1)
-        end = date(year, month, monthrange(year, month)[1])
-        stmt = (
-            select(AttendanceDay)
-            .where(
-                (AttendanceDay.employee_id == employee_id)
-                & (AttendanceDay.work_date_local.between(start, end))
-            )
-            .order_by(AttendanceDay.work_date_local.asc())
-        )
+        stmt = _days_stmt(employee_id, *_month_bounds(year, month))
         return list(db.execute(stmt).scalars().all())
 
     def get_days_for_employee(
@@ -176,25 +279,63 @@ class AttendanceRepository:
         """
         Return AttendanceDay rows in [date_from, date_to] inclusive.
         """
+        return list(db.execute(_days_stmt(employee_id, date_from, date_to)).scalars().all())
+
+    def iter_month_report_rows(
+        self,
+        db: Session,
+        date_from: date,
+        date_to: date,
+        department: Optional[Department] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Row]:
+        """
+        Employees employed at some point in [date_from, date_to] (optionally of
+        one department), each left-joined to its attendance_days in that range,
+        ordered by employee then date. An employee with no days yields one row
+        with NULL day columns.
+
+        Streamed through a server-side cursor ``batch_size`` rows at a time, so
+        a company-wide month never sits in memory at once.
+        """
         stmt = (
-            select(AttendanceDay)
-            .where(
+            select(
+                Employee.employee_id,
+                Employee.name,
+                Employee.department,
+                Employee.region,
+                Employee.date_of_joining,
+                Employee.date_of_leaving,
+                AttendanceDay.work_date_local,
+                AttendanceDay.seconds_worked,
+                AttendanceDay.status,
+                AttendanceDay.first_check_in_utc,
+                AttendanceDay.last_check_out_utc,
+            )
+            .outerjoin(
+                AttendanceDay,
                 and_(
-                    AttendanceDay.employee_id == employee_id,
+                    AttendanceDay.employee_id == Employee.employee_id,
                     AttendanceDay.work_date_local >= date_from,
                     AttendanceDay.work_date_local <= date_to,
-                )
+                ),
+            )
+            .where(
+                Employee.date_of_joining <= date_to,
+                or_(Employee.date_of_leaving.is_(None), Employee.date_of_leaving >= date_from),
             )
-            .order_by(AttendanceDay.work_date_local.asc())
+            .order_by(Employee.employee_id, AttendanceDay.work_date_local)
+            .execution_options(yield_per=batch_size)
         )
-        return list(db.execute(stmt).scalars().all())
+        if department is not None:
+            stmt = stmt.where(Employee.department == department)
+        yield from db.execute(stmt)
 
     # ─────────────────────────────
     # Employees (basic lookup)
     # ─────────────────────────────
     def get_employee_basic(self, db: Session, employee_id: str) -> Optional[Employee]:
-        stmt = select(Employee).where(Employee.employee_id == employee_id)
-        return db.execute(stmt).scalar_one_or_none()
+        return db.execute(_employee_stmt(employee_id)).scalar_one_or_none()
 
     # ─────────────────────────────
     # Monitoring
@@ -224,6 +365,15 @@ class AttendanceRepository:
         db.flush()
         return m
 
+    def create_monitoring_bulk(self, db: Session, rows: list[dict]) -> int:
+        """
+        Insert many CheckInMonitoring rows with a single executemany (flushed, not committed).
+        """
+        if not rows:
+            return 0
+        db.execute(insert(CheckInMonitoring), rows)
+        return len(rows)
+
     def get_monitoring_for_employee(self, db: Session, employee_id: str) -> List[CheckInMonitoring]:
         """
         Returns monitoring records for an employee ordered by capture time (desc).
@@ -235,3 +385,87 @@ class AttendanceRepository:
             .order_by(CheckInMonitoring.monitored_at_utc.desc())
         )
         return list(db.execute(stmt).scalars().all())
+
+    # ─────────────────────────────
+    # Evidence
+    # ─────────────────────────────
+    def evidence_page(
+        self,
+        db: Session,
+        *,
+        session_id: int | None = None,
+        employee_id: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        after: Tuple[datetime, int] | None = None,
+        limit: int = 100,
+    ) -> Sequence[RowMapping]:
+        """
+        One page of evidence rows, newest first, keyed on (created_at, id).
+
+        Selects plain columns (no ORM identity map) and starts strictly after the
+        ``after`` key, so each page is one range scan of a (created_at, id) index.
+        """
+        stmt = select(
+            AttendanceEvidence.id,
+            AttendanceEvidence.session_id,
+            AttendanceEvidence.evidence_type,
+            AttendanceEvidence.verified,
+            AttendanceEvidence.confidence_score,
+            AttendanceEvidence.verification_notes,
+            AttendanceEvidence.image_path,
+            AttendanceEvidence.verified_at,
+            AttendanceEvidence.created_at,
+        )
+        if session_id is not None:
+            stmt = stmt.where(AttendanceEvidence.session_id == session_id)
+        if employee_id is not None:
+            stmt = stmt.join(
+                AttendanceSession, AttendanceEvidence.session_id == AttendanceSession.id
+            ).where(AttendanceSession.employee_id == employee_id)
+            if date_from:
+                stmt = stmt.where(AttendanceSession.work_date_local >= date_from)
+            if date_to:
+                stmt = stmt.where(AttendanceSession.work_date_local <= date_to)
+        if after is not None:
+            after_created_at, after_id = after
+            stmt = stmt.where(
+                tuple_(AttendanceEvidence.created_at, AttendanceEvidence.id)
+                < tuple_(
+                    literal(after_created_at, AttendanceEvidence.created_at.type),
+                    literal(after_id, AttendanceEvidence.id.type),
+                )
+            )
+        stmt = stmt.order_by(
+            AttendanceEvidence.created_at.desc(), AttendanceEvidence.id.desc()
+        ).limit(limit)
+        return db.execute(stmt).mappings().all()
+
+
+class AsyncAttendanceRepository:
+    """
+    AsyncSession versions of the hot attendance reads (today, month view, days),
+    built from the same statements as AttendanceRepository.
+    """
+
+    async def get_open_session(
+        self, db: AsyncSession, employee_id: str
+    ) -> AttendanceSession | None:
+        return (await db.execute(_open_session_stmt(employee_id))).scalar_one_or_none()
+
+    async def get_day(
+        self, db: AsyncSession, employee_id: str, work_date_local: date
+    ) -> AttendanceDay | None:
+        return (await db.execute(_day_stmt(employee_id, work_date_local))).scalar_one_or_none()
+
+    async def month_days(
+        self, db: AsyncSession, employee_id: str, year: int, month: int
+    ) -> list[AttendanceDay]:
+        stmt = _days_stmt(employee_id, *_month_bounds(year, month))
+        return list((await db.execute(stmt)).scalars().all())
+
+    async def get_days_for_employee(
+        self, db: AsyncSession, employee_id: str, date_from: date, date_to: date
+    ) -> List[AttendanceDay]:
+        stmt = _days_stmt(employee_id, date_from, date_to)
+        return list((await db.execute(stmt)).scalars().all())
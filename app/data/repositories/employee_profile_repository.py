@@ -1,12 +1,34 @@
+from typing import Sequence
+
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from app.data.models.employee_profile import EmployeeProfile
 
 
+def profile_features_key(profile_path: str | None, updated_at: datetime | None) -> str:
+    """Identify the profile image a stored feature blob was computed from."""
+    if updated_at is not None:
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        stamp = updated_at.astimezone(timezone.utc).isoformat()
+    else:
+        stamp = ""
+    return f"{profile_path or ''}@{stamp}"
+
+
 class EmployeeProfileRepo:
     def get_by_employee_id(self, db: Session, employee_id: str) -> EmployeeProfile | None:
         return db.query(EmployeeProfile).filter(EmployeeProfile.employee_id == employee_id).first()
 
+    def list_with_face_features(
+        self, db: Session, employee_ids: Sequence[str] | None = None
+    ) -> list[EmployeeProfile]:
+        """Profiles that have stored face features, optionally limited to some employees."""
+        query = db.query(EmployeeProfile).filter(EmployeeProfile.face_features.isnot(None))
+        if employee_ids is not None:
+            query = query.filter(EmployeeProfile.employee_id.in_(list(employee_ids)))
+        return query.order_by(EmployeeProfile.employee_id).all()
+
     def upsert_profile_image(
         self,
         db: Session,
@@ -15,6 +37,7 @@ class EmployeeProfileRepo:
         path: str,
         mime: str | None,
         size: int | None,
+        face_features: bytes | None = None,
     ) -> EmployeeProfile:
         row = self.get_by_employee_id(db, employee_id)
         if not row:
@@ -25,8 +48,20 @@ class EmployeeProfileRepo:
         row.profile_path = path  # type: ignore[assignment]
         row.profile_mime = mime  # type: ignore[assignment]
         row.profile_size = size  # type: ignore[assignment]
-        row.profile_updated_at = datetime.now(timezone.utc)  # type: ignore[assignment]
+        updated_at = datetime.now(timezone.utc)
+        row.profile_updated_at = updated_at  # type: ignore[assignment]
+        row.face_features = face_features  # type: ignore[assignment]
+        features_key = profile_features_key(path, updated_at) if face_features else None
+        row.face_features_key = features_key  # type: ignore[assignment]
 
         db.commit()
         db.refresh(row)
         return row
+
+    def save_face_features(self, db: Session, row: EmployeeProfile, face_features: bytes) -> None:
+        """Attach features computed from the row's current image (flushed, not committed)."""
+        row.face_features = face_features  # type: ignore[assignment]
+        row.face_features_key = profile_features_key(  # type: ignore[assignment]
+            row.profile_path, row.profile_updated_at  # type: ignore[arg-type]
+        )
+        db.flush()
@@ -1,12 +1,42 @@
 # app/data/repositories/expense_repository.py
-from typing import Optional
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence
 
-from sqlalchemy import desc, select
+from sqlalchemy import delete, desc, func, insert, literal, select, tuple_
 from sqlalchemy.orm import Session
 
-from app.data.models.expenses import Expense
+from app.data.models.expenses import Expense, ExpenseCategory, ExpenseDailyTotal
+from app.data.upsert import upsert_rows
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate
 
+# (date, category value, amount, transaction count) change to expense_daily_totals
+DailyDelta = tuple[date, str, float, int]
+
+# Columns written by bulk_create (id, created_at and updated_at are left to the database)
+_BULK_COLUMNS = ("title", "amount", "category", "date", "description", "added_by")
+
+
+@dataclass(frozen=True)
+class ExpenseFilter:
+    """Server-side filters for expense listings (all optional, combined with AND)."""
+
+    category: Optional[ExpenseCategory] = None
+    added_by: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def apply(self, stmt):
+        if self.category is not None:
+            stmt = stmt.where(Expense.category == self.category)
+        if self.added_by:
+            stmt = stmt.where(Expense.added_by == self.added_by)
+        if self.date_from:
+            stmt = stmt.where(Expense.date >= self.date_from)
+        if self.date_to:
+            stmt = stmt.where(Expense.date <= self.date_to)
+        return stmt
+
 
 class ExpenseRepository:
     def __init__(self, db: Session) -> None:
@@ -15,14 +45,80 @@ class ExpenseRepository:
     def create(self, data: ExpenseCreate) -> Expense:
         expense = Expense(**data.model_dump())
         self.db.add(expense)
-        self.db.commit()
+        self.apply_daily_deltas([_delta(expense, +1)])
+        self._commit()
         self.db.refresh(expense)
         return expense
 
+    def bulk_create(self, items: Sequence[ExpenseCreate]) -> int:
+        """
+        Insert many expenses and their daily-total deltas in one transaction.
+
+        Rows go in through COPY on Postgres (psycopg 3) and one executemany
+        INSERT elsewhere; no ORM objects are built. Returns the number inserted.
+        """
+        if not items:
+            return 0
+        rows = [item.model_dump(include=set(_BULK_COLUMNS)) for item in items]
+        if not self._copy_rows(rows):
+            self.db.execute(insert(Expense.__table__), rows)
+        self.apply_daily_deltas(
+            (row["date"], row["category"].value, float(row["amount"]), 1) for row in rows
+        )
+        self._commit()
+        return len(rows)
+
+    def _copy_rows(self, rows: Sequence[dict]) -> bool:
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql" or bind.dialect.driver != "psycopg":
+            return False
+        raw = self.db.connection().connection.driver_connection
+        assert raw is not None
+        statement = f"COPY {Expense.__tablename__} ({', '.join(_BULK_COLUMNS)}) FROM STDIN"
+        with raw.cursor() as cursor, cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(
+                    [row["category"].value if c == "category" else row[c] for c in _BULK_COLUMNS]
+                )
+        return True
+
     def list_all(self) -> list[Expense]:
         stmt = select(Expense).order_by(desc(Expense.created_at))
         return list(self.db.execute(stmt).scalars().all())
 
+    def list_page(
+        self,
+        filters: ExpenseFilter = ExpenseFilter(),
+        after: Optional[tuple[datetime, int]] = None,
+        offset: int = 0,
+        limit: int = 10,
+    ) -> list[Expense]:
+        """
+        One page of expenses, newest first, ordered by (created_at, id).
+
+        ``after`` is the (created_at, id) of the last row of the previous page
+        (keyset pagination, served by ix_expenses_created_at_id); ``offset`` is
+        only honoured for legacy skip-based callers.
+        """
+        stmt = filters.apply(select(Expense))
+        if after is not None:
+            after_created_at, after_id = after
+            stmt = stmt.where(
+                tuple_(Expense.created_at, Expense.id)
+                < tuple_(
+                    literal(after_created_at, Expense.created_at.type),
+                    literal(after_id, Expense.id.type),
+                )
+            )
+        elif offset:
+            stmt = stmt.offset(offset)
+        stmt = stmt.order_by(desc(Expense.created_at), desc(Expense.id)).limit(limit)
+        return list(self.db.execute(stmt).scalars().all())
+
+    def count(self, filters: ExpenseFilter = ExpenseFilter()) -> int:
+        stmt = filters.apply(select(func.count()).select_from(Expense))
+        return int(self.db.execute(stmt).scalar_one())
+
     def get_by_id(self, expense_id: int) -> Optional[Expense]:
         return self.db.get(Expense, expense_id)
 
@@ -30,9 +126,11 @@ class ExpenseRepository:
         expense = self.get_by_id(expense_id)
         if not expense:
             return None
+        before = _delta(expense, -1)
         for k, v in data.model_dump(exclude_unset=True).items():
             setattr(expense, k, v)
-        self.db.commit()
+        self.apply_daily_deltas([before, _delta(expense, +1)])
+        self._commit()
         self.db.refresh(expense)
         return expense
 
@@ -40,6 +138,63 @@ class ExpenseRepository:
         expense = self.get_by_id(expense_id)
         if not expense:
             return False
+        self.apply_daily_deltas([_delta(expense, -1)])
         self.db.delete(expense)
-        self.db.commit()
+        self._commit()
         return True
+
+    def _commit(self) -> None:
+        self.db.commit()
+
+    # ── Daily totals ───────────────────────────────────────────────────────────
+    def apply_daily_deltas(self, deltas: Iterable[DailyDelta]) -> None:
+        """
+        Add amount/count deltas to expense_daily_totals in the caller's transaction.
+
+        One INSERT .. ON CONFLICT DO UPDATE adds to existing buckets atomically;
+        buckets left without transactions are removed.
+        """
+        merged: dict[tuple[date, str], list[Any]] = {}
+        for day, category, amount, count in deltas:
+            bucket = merged.setdefault((day, category), [0.0, 0])
+            bucket[0] += amount
+            bucket[1] += count
+        merged = {key: v for key, v in merged.items() if v[1] or v[0]}
+        if not merged:
+            return
+
+        rows = [
+            {"date": day, "category": category, "total_amount": amount, "tx_count": count}
+            for (day, category), (amount, count) in merged.items()
+        ]
+        written = upsert_rows(
+            self.db,
+            ExpenseDailyTotal,
+            rows,
+            index_elements=("date", "category"),
+            set_=lambda excluded: {
+                "total_amount": ExpenseDailyTotal.total_amount + excluded.total_amount,
+                "tx_count": ExpenseDailyTotal.tx_count + excluded.tx_count,
+            },
+        )
+        if not written:
+            for row in rows:
+                total = self.db.get(ExpenseDailyTotal, (row["date"], row["category"]))
+                if total is None:
+                    self.db.add(ExpenseDailyTotal(**row))
+                else:
+                    total.total_amount += row["total_amount"]
+                    total.tx_count += row["tx_count"]
+            self.db.flush()
+
+        self.db.execute(
+            delete(ExpenseDailyTotal)
+            .where(tuple_(ExpenseDailyTotal.date, ExpenseDailyTotal.category).in_(list(merged)))
+            .where(ExpenseDailyTotal.tx_count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _delta(expense: Expense, sign: int) -> DailyDelta:
+    category = getattr(expense.category, "value", expense.category)
+    return (expense.date, str(category), sign * float(expense.amount), sign)  # type: ignore[return-value,arg-type]
@@ -4,6 +4,7 @@ from datetime import date, datetime
 from typing import Optional, List, Tuple
 
 from sqlalchemy import select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.data.models.leave import (
@@ -17,11 +18,55 @@ from app.data.models.policy import HolidayCalendar
 from app.data.models.add_employee import Employee
 
 
+# --------- Calendar statements (shared by the sync and async repositories) ----------
+def _region_stmt(employee_id: str):
+    return select(Employee.region).where(Employee.employee_id == employee_id)
+
+
+def _holidays_stmt(date_from: date, date_to: date, region: Optional[str]):
+    stmt = select(HolidayCalendar).where(
+        and_(
+            HolidayCalendar.holiday_date >= date_from,
+            HolidayCalendar.holiday_date <= date_to,
+        )
+    )
+    if region:
+        stmt = stmt.where(
+            or_(
+                HolidayCalendar.region == region,
+                HolidayCalendar.region.is_(None),
+            )
+        )
+    else:
+        # only global
+        stmt = stmt.where(HolidayCalendar.region.is_(None))
+    return stmt.order_by(HolidayCalendar.holiday_date.asc())
+
+
+def _approved_leaves_stmt(employee_id: str, start_dt: datetime, end_dt: datetime):
+    return (
+        select(LeaveRequest, LeaveType)
+        .join(LeaveType, LeaveType.id == LeaveRequest.leave_type_id)
+        .where(
+            and_(
+                LeaveRequest.employee_id == employee_id,
+                LeaveRequest.status == LeaveStatus.APPROVED,
+                ~(
+                    or_(
+                        LeaveRequest.end_datetime < start_dt,
+                        LeaveRequest.start_datetime > end_dt,
+                    )
+                ),
+            )
+        )
+        .order_by(LeaveRequest.start_datetime.asc())
+    )
+
+
 class LeaveMeRepository:
     # --------- Identity helpers ----------
     def get_employee_region(self, db: Session, employee_id: str) -> Optional[str]:
-        stmt = select(Employee.region).where(Employee.employee_id == employee_id)
-        row = db.execute(stmt).first()
+        row = db.execute(_region_stmt(employee_id)).first()
         return row[0] if row else None
 
     def get_leave_type_by_code(self, db: Session, code: str) -> Optional[LeaveType]:
@@ -74,23 +119,7 @@ class LeaveMeRepository:
     def list_holidays_in_range(
         self, db: Session, date_from: date, date_to: date, region: Optional[str]
     ) -> List[HolidayCalendar]:
-        stmt = select(HolidayCalendar).where(
-            and_(
-                HolidayCalendar.holiday_date >= date_from,
-                HolidayCalendar.holiday_date <= date_to,
-            )
-        )
-        if region:
-            stmt = stmt.where(
-                or_(
-                    HolidayCalendar.region == region,
-                    HolidayCalendar.region.is_(None),
-                )
-            )
-        else:
-            # only global
-            stmt = stmt.where(HolidayCalendar.region.is_(None))
-        stmt = stmt.order_by(HolidayCalendar.holiday_date.asc())
+        stmt = _holidays_stmt(date_from, date_to, region)
         return list(db.execute(stmt).scalars().all())
 
     # --------- Requests ----------
@@ -172,24 +201,7 @@ class LeaveMeRepository:
     def list_my_approved_leaves_in_range(
         self, db: Session, employee_id: str, start_dt: datetime, end_dt: datetime
     ) -> List[Tuple[LeaveRequest, LeaveType]]:
-        stmt = (
-            select(LeaveRequest, LeaveType)
-            .join(LeaveType, LeaveType.id == LeaveRequest.leave_type_id)
-            .where(
-                and_(
-                    LeaveRequest.employee_id == employee_id,
-                    LeaveRequest.status == LeaveStatus.APPROVED,
-                    ~(
-                        or_(
-                            LeaveRequest.end_datetime < start_dt,
-                            LeaveRequest.start_datetime > end_dt,
-                        )
-                    ),
-                )
-            )
-            .order_by(LeaveRequest.start_datetime.asc())
-        )
-        rows = db.execute(stmt).all()
+        rows = db.execute(_approved_leaves_stmt(employee_id, start_dt, end_dt)).all()
         return [(row[0], row[1]) for row in rows]
 
     # --------- Monthly leave type limit check ----------
@@ -215,3 +227,19 @@ class LeaveMeRepository:
             .limit(1)
         )
         return db.execute(stmt).first() is not None
+
+
+class AsyncLeaveMeRepository:
+    """AsyncSession versions of the leave calendar reads."""
+
+    async def list_holidays_in_range(
+        self, db: AsyncSession, date_from: date, date_to: date, region: Optional[str]
+    ) -> List[HolidayCalendar]:
+        stmt = _holidays_stmt(date_from, date_to, region)
+        return list((await db.execute(stmt)).scalars().all())
+
+    async def list_my_approved_leaves_in_range(
+        self, db: AsyncSession, employee_id: str, start_dt: datetime, end_dt: datetime
+    ) -> List[Tuple[LeaveRequest, LeaveType]]:
+        rows = (await db.execute(_approved_leaves_stmt(employee_id, start_dt, end_dt))).all()
+        return [(row[0], row[1]) for row in rows]
@@ -4,12 +4,13 @@ from __future__ import annotations
 from calendar import monthrange
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 from sqlalchemy.types import Date
 
+from app.data.calendar_index import calendar_index
 from app.data.models.attendance import AttendanceDay, DayStatus
 from app.data.models.leave import (
     LeaveBalance,
@@ -19,8 +20,21 @@ from app.data.models.leave import (
     LeaveType,
 )
 from app.data.models.policy import HolidayCalendar
+from app.data.upsert import dialect_insert
 
 EIGHT_HOURS = 8.0
+EIGHT_HOURS_SECONDS = 8 * 3600
+
+
+def _hours(value) -> Decimal:
+    # Balance columns load as Decimal (Numeric) but are seeded/adjusted with floats
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def _recompute_closing(bal: LeaveBalance) -> None:
+    bal.closing = float(
+        _hours(bal.opening) + _hours(bal.accrued) + _hours(bal.adjusted) - _hours(bal.used)
+    )
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -31,7 +45,7 @@ class LeaveRepository:
     def create_type(self, db: Session, payload: dict) -> LeaveType:
         row = LeaveType(**payload)
         db.add(row)
-        db.commit()
+        db.flush()
         return row
 
     def list_types(self, db: Session) -> List[LeaveType]:
@@ -62,7 +76,8 @@ class LeaveRepository:
     def create_holiday(self, db: Session, payload: dict) -> HolidayCalendar:
         h = HolidayCalendar(**payload)
         db.add(h)
-        db.commit()
+        db.flush()
+        calendar_index.invalidate_on_commit(db)
         return h
 
     def list_holidays(
@@ -87,6 +102,7 @@ class LeaveRepository:
             if v is not None and hasattr(h, k):
                 setattr(h, k, v)
         db.flush()
+        calendar_index.invalidate_on_commit(db)
         return h
 
     def delete_holiday(self, db: Session, holiday_id: int) -> bool:
@@ -94,6 +110,7 @@ class LeaveRepository:
         if not h:
             return False
         db.delete(h)
+        calendar_index.invalidate_on_commit(db)
         return True
 
     # --- Balances ---
@@ -133,10 +150,8 @@ class LeaveRepository:
             # update opening/closing only if not yet initialized
             if row.opening is None or float(row.opening) == 0.0:
                 row.opening = opening_hours
-            row.closing = (
-                (row.opening or 0) + (row.accrued or 0) + (row.adjusted or 0) - (row.used or 0)
-            )
-            db.commit()
+            _recompute_closing(row)
+            db.flush()
             return row
         row = LeaveBalance(
             employee_id=employee_id,
@@ -149,30 +164,24 @@ class LeaveRepository:
             closing=opening_hours,
         )
         db.add(row)
-        db.commit()
+        db.flush()
         return row
 
     def adjust_balance(self, db: Session, bal: LeaveBalance, delta_hours: float) -> LeaveBalance:
-        bal.adjusted = (bal.adjusted or 0) + delta_hours
-        bal.closing = (
-            (bal.opening or 0) + (bal.accrued or 0) + (bal.adjusted or 0) - (bal.used or 0)
-        )
+        bal.adjusted = float(_hours(bal.adjusted) + _hours(delta_hours))
+        _recompute_closing(bal)
         db.flush()
         return bal
 
     def accrue_balance(self, db: Session, bal: LeaveBalance, add_hours: float) -> LeaveBalance:
-        bal.accrued = (bal.accrued or 0) + add_hours
-        bal.closing = (
-            (bal.opening or 0) + (bal.accrued or 0) + (bal.adjusted or 0) - (bal.used or 0)
-        )
+        bal.accrued = float(_hours(bal.accrued) + _hours(add_hours))
+        _recompute_closing(bal)
         db.flush()
         return bal
 
     def use_balance(self, db: Session, bal: LeaveBalance, use_hours: float) -> LeaveBalance:
-        bal.used = (bal.used or 0) + use_hours
-        bal.closing = (
-            (bal.opening or 0) + (bal.accrued or 0) + (bal.adjusted or 0) - (bal.used or 0)
-        )
+        bal.used = float(_hours(bal.used) + _hours(use_hours))
+        _recompute_closing(bal)
         db.flush()
         return bal
 
@@ -193,7 +202,7 @@ class LeaveRepository:
     def create_request(self, db: Session, payload: dict) -> LeaveRequest:
         row = LeaveRequest(**payload)
         db.add(row)
-        db.commit()
+        db.flush()
         return row
 
     def get_request(self, db: Session, req_id: int) -> Optional[LeaveRequest]:
@@ -316,50 +325,139 @@ class LeaveRepository:
         """
         Write leave impact into attendance_days.
         """
-        row = db.execute(
-            select(AttendanceDay).where(
-                and_(
-                    AttendanceDay.employee_id == employee_id,
-                    AttendanceDay.work_date_local == d,
+        return self.upsert_attendance_leave_days(db, employee_id, [(d, hours)], is_paid)[0]
+
+    def upsert_attendance_leave_days(
+        self,
+        db: Session,
+        employee_id: str,
+        segments: Sequence[Tuple[date, Decimal | float]],
+        is_paid: bool,
+    ) -> List[AttendanceDay]:
+        """
+        Write the leave hours of every (day, hours) segment into attendance_days.
+
+        One multi-row INSERT .. ON CONFLICT DO UPDATE .. RETURNING: missing days
+        are created as LEAVE, existing ones get the hours added and over/under
+        work recomputed by the database against the row as it is at write time
+        (a concurrent check-out is not lost). Nothing is committed; the caller
+        owns the transaction. Dialects without ON CONFLICT fall back to one
+        SELECT for the range plus ORM writes.
+        """
+        increments: Dict[date, int] = {}
+        for d, hours in segments:
+            hours_decimal = hours if isinstance(hours, Decimal) else Decimal(str(hours))
+            increments[d] = increments.get(d, 0) + int(round(hours_decimal * Decimal("3600")))
+        if not increments:
+            return []
+
+        stmt = dialect_insert(db, AttendanceDay)
+        if stmt is None:
+            return self._leave_days_read_modify_write(db, employee_id, increments, is_paid)
+
+        db.flush()  # pending ORM changes to these days go first
+        rows = []
+        for d, inc in sorted(increments.items()):
+            paid = inc if is_paid else 0
+            rows.append(
+                dict(
+                    employee_id=employee_id,
+                    work_date_local=d,
+                    seconds_worked=0,
+                    expected_seconds=EIGHT_HOURS_SECONDS,
+                    paid_leave_seconds=paid,
+                    overtime_seconds=max(0, paid - EIGHT_HOURS_SECONDS),
+                    underwork_seconds=max(0, EIGHT_HOURS_SECONDS - paid),
+                    unpaid_seconds=0 if is_paid else inc,
+                    first_check_in_utc=None,
+                    last_check_out_utc=None,
+                    status=DayStatus.LEAVE,
+                    lock_flag=False,
                 )
             )
-        ).scalar_one_or_none()
-        if not row:
-            row = AttendanceDay(
-                employee_id=employee_id,
-                work_date_local=d,
-                seconds_worked=0,
-                expected_seconds=8 * 3600,
-                paid_leave_seconds=0,
-                overtime_seconds=0,
-                underwork_seconds=0,
-                unpaid_seconds=0,
-                first_check_in_utc=None,
-                last_check_out_utc=None,
-                status=DayStatus.LEAVE,
-                lock_flag=False,
-            )
-            db.add(row)
-            db.commit()
+        stmt = stmt.values(rows)
+
+        day, new = AttendanceDay.__table__.c, stmt.excluded
+        greatest: Any
+        target: Dict[str, Any]
+        if db.get_bind().dialect.name == "postgresql":
+            greatest = func.greatest
+            target = {"constraint": "uq_attendance_day_emp_date"}
         else:
+            # SQLite's multi-argument max() is the scalar GREATEST
+            greatest = func.max
+            target = {"index_elements": ["employee_id", "work_date_local"]}
+
+        # SET expressions see the row before this update, so add the new paid hours explicitly
+        blended = (
+            func.coalesce(day.seconds_worked, 0)
+            + func.coalesce(day.paid_leave_seconds, 0)
+            + new.paid_leave_seconds
+        )
+        expected = func.coalesce(func.nullif(day.expected_seconds, 0), EIGHT_HOURS_SECONDS)
+        stmt = stmt.on_conflict_do_update(
+            **target,
+            set_={
+                "status": new.status,
+                "paid_leave_seconds": func.coalesce(day.paid_leave_seconds, 0)
+                + new.paid_leave_seconds,
+                "unpaid_seconds": func.coalesce(day.unpaid_seconds, 0) + new.unpaid_seconds,
+                "overtime_seconds": greatest(0, blended - expected),
+                "underwork_seconds": greatest(0, expected - blended),
+                "updated_at": func.now(),
+            },
+        ).returning(AttendanceDay)
+        # populate_existing: copies of these days already in the session are refreshed
+        return list(db.scalars(stmt, execution_options={"populate_existing": True}))
+
+    def _leave_days_read_modify_write(
+        self, db: Session, employee_id: str, increments: Dict[date, int], is_paid: bool
+    ) -> List[AttendanceDay]:
+        existing = {
+            row.work_date_local: row
+            for row in db.execute(
+                select(AttendanceDay).where(
+                    and_(
+                        AttendanceDay.employee_id == employee_id,
+                        AttendanceDay.work_date_local.between(min(increments), max(increments)),
+                    )
+                )
+            ).scalars()
+        }
+        out = []
+        for d, inc in sorted(increments.items()):
+            row = existing.get(d)
+            if row is None:
+                row = AttendanceDay(
+                    employee_id=employee_id,
+                    work_date_local=d,
+                    seconds_worked=0,
+                    expected_seconds=EIGHT_HOURS_SECONDS,
+                    paid_leave_seconds=0,
+                    overtime_seconds=0,
+                    underwork_seconds=0,
+                    unpaid_seconds=0,
+                    first_check_in_utc=None,
+                    last_check_out_utc=None,
+                    lock_flag=False,
+                )
+                db.add(row)
             # make sure status is harmonized
             row.status = DayStatus.LEAVE
 
-        hours_decimal = hours if isinstance(hours, Decimal) else Decimal(str(hours))
-        inc = int(round(hours_decimal * Decimal("3600")))
-
-        if is_paid:
-            row.paid_leave_seconds = (row.paid_leave_seconds or 0) + inc
-        else:
-            row.unpaid_seconds = (row.unpaid_seconds or 0) + inc
-
-        # Recompute simple under/over math against expected_seconds
-        blended = (row.seconds_worked or 0) + (row.paid_leave_seconds or 0)
-        exp = row.expected_seconds or (8 * 3600)
-        row.overtime_seconds = max(0, blended - exp)
-        row.underwork_seconds = max(0, exp - blended)
-        db.commit()
-        return row
+            if is_paid:
+                row.paid_leave_seconds = (row.paid_leave_seconds or 0) + inc
+            else:
+                row.unpaid_seconds = (row.unpaid_seconds or 0) + inc
+
+            # Recompute simple under/over math against expected_seconds
+            blended = (row.seconds_worked or 0) + (row.paid_leave_seconds or 0)
+            exp = row.expected_seconds or EIGHT_HOURS_SECONDS
+            row.overtime_seconds = max(0, blended - exp)
+            row.underwork_seconds = max(0, exp - blended)
+            out.append(row)
+        db.flush()
+        return out
 
     # --- Permission usage for a month (approved only) ---
     def month_permission_hours(
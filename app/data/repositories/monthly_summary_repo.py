@@ -1,6 +1,8 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import date
 from app.data.models.monthly_summary import MonthlyEmployeeSummary
+from app.data.upsert import upsert_rows
 
 
 def get_summary(db: Session, employee_id: str, month_start: date):
@@ -11,16 +13,41 @@ def get_summary(db: Session, employee_id: str, month_start: date):
     )
 
 
-def upsert_summary(db: Session, summary_data: dict):
+def upsert_summary(db: Session, summary_data: dict, commit: bool = True):
     existing = get_summary(db, summary_data["employee_id"], summary_data["month_start"])
     if existing:
         for key, value in summary_data.items():
             setattr(existing, key, value)
     else:
         db.add(MonthlyEmployeeSummary(**summary_data))
-    db.commit()
+    if commit:
+        db.commit()
     return existing or summary_data
 
 
+def bulk_upsert_summaries(db: Session, rows: list[dict], commit: bool = True) -> None:
+    """Insert or update many summaries in one INSERT ... ON CONFLICT statement."""
+    written = upsert_rows(
+        db,
+        MonthlyEmployeeSummary,
+        rows,
+        index_elements=["employee_id", "month_start"],
+        set_=lambda excluded: {
+            **{
+                key: excluded[key]
+                for key in (rows[0] if rows else {})
+                if key not in ("employee_id", "month_start")
+            },
+            "updated_at": func.now(),
+        },
+        constraint="uq_monthly_summary_emp_month",
+    )
+    if not written:
+        for row in rows:
+            upsert_summary(db, row, commit=False)
+    if commit:
+        db.commit()
+
+
 def list_summaries(db: Session, month_start: date):
     return db.query(MonthlyEmployeeSummary).filter_by(month_start=month_start).all()
@@ -6,6 +6,7 @@ from typing import Optional, List, Dict
 from sqlalchemy import select, and_
 from sqlalchemy.orm import Session
 
+from app.data.calendar_index import calendar_index
 from app.data.models.policy import WorkweekPolicy, HolidayCalendar
 
 # from app.data.models.payroll import PayPeriod  # Commented out as payroll is removed
@@ -30,6 +31,7 @@ class PolicyRepository:
             db.add(row)
         db.flush()
         db.commit()
+        calendar_index.invalidate(region)
         return row
 
     # ── Holidays ───────────────────────────────────────────────────────────────
@@ -52,6 +54,7 @@ class PolicyRepository:
         db.add(h)
         db.flush()
         db.commit()
+        calendar_index.invalidate()
         return h
 
     def list_holidays(
@@ -81,6 +84,7 @@ class PolicyRepository:
     def delete_holiday(self, db: Session, holiday: HolidayCalendar) -> None:
         db.delete(holiday)
         db.flush()
+        calendar_index.invalidate_on_commit(db)
 
     # ── Period locking guard for deletes ───────────────────────────────────────
     def is_period_locked_for_date(self, db: Session, d: date) -> bool:
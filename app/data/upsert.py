@@ -0,0 +1,80 @@
+# app/data/upsert.py
+"""
+Dialect-aware ``INSERT ... ON CONFLICT DO UPDATE`` helpers.
+
+Postgres and SQLite share the same ON CONFLICT syntax (and SQLAlchemy exposes the
+same ``on_conflict_do_update``/``excluded`` API for both), so callers build one
+statement and run it on either backend. Other dialects get ``None`` and should
+fall back to a read-modify-write loop.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+# Bind-parameter limits per statement (Postgres wire protocol / SQLite >= 3.32)
+_MAX_PARAMS = {"postgresql": 65535, "sqlite": 32766}
+
+
+def dialect_insert(db: Session, model: Any):
+    """Return a dialect-specific ``insert(model)`` supporting ON CONFLICT, or None."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(model)
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(model)
+    return None
+
+
+def upsert_rows(
+    db: Session,
+    model: Any,
+    rows: Sequence[Mapping[str, Any]],
+    index_elements: Sequence[str],
+    set_: Optional[Callable[[Any], Dict[str, Any]]] = None,
+    constraint: Optional[str] = None,
+) -> bool:
+    """
+    Bulk upsert ``rows`` into ``model``'s table with multi-row INSERT statements.
+
+    Args:
+        db: Database session (the caller owns the transaction)
+        model: Mapped class or Table
+        rows: Column dicts; every row must have the same keys
+        index_elements: Columns of the unique key the conflict is detected on
+        set_: Builds the DO UPDATE assignments from ``stmt.excluded``; defaults to
+            overwriting every non-key column with the incoming value
+        constraint: Postgres constraint name to target instead of index_elements
+
+    Returns:
+        False when the dialect has no ON CONFLICT support (nothing was written).
+    """
+    if dialect_insert(db, model) is None:
+        return False
+    if not rows:
+        return True
+
+    dialect = db.get_bind().dialect.name
+    per_statement = max(1, _MAX_PARAMS.get(dialect, 32766) // max(len(rows[0]), 1))
+
+    for start in range(0, len(rows), per_statement):
+        chunk: List[Mapping[str, Any]] = list(rows[start : start + per_statement])
+        stmt = dialect_insert(db, model).values(chunk)
+        if set_ is not None:
+            assignments = set_(stmt.excluded)
+        else:
+            assignments = {
+                key: stmt.excluded[key] for key in chunk[0] if key not in index_elements
+            }
+        if constraint and dialect == "postgresql":
+            stmt = stmt.on_conflict_do_update(constraint=constraint, set_=assignments)
+        else:
+            stmt = stmt.on_conflict_do_update(index_elements=list(index_elements), set_=assignments)
+        db.execute(stmt)
+    return True
@@ -1,9 +1,15 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.data.db import get_db
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_page_headers
+from app.data.db import get_async_db, get_db
 from app.controllers.attandence_controller import AttendanceController
+from app.data.models.add_employee import Department
+from app.services.attendance_export_service import MEDIA_TYPES, ExportFormat, xlsx_available
 from app.schemas.attendance import (
     CheckInResponse,
     CheckOutResponse,
@@ -15,6 +21,7 @@ from app.schemas.attendance import (
     EmployeeCheckInMonitoringResponse,
     CheckInWithFaceResponse,
     CheckOutWithFaceResponse,
+    AttendanceEvidenceResponse,
 )
 
 router = APIRouter(prefix="/api", tags=["Attendance"])
@@ -54,6 +61,7 @@ async def check_in_with_face(
     Returns:
     - 200: Face verified, check-in recorded successfully
     - 401: Face verification failed, NO check-in recorded
+    - 503: Face verification is saturated; retry after ``Retry-After`` seconds
     """
     try:
         return await controller.check_in_with_face(db, employeeId, selfie)
@@ -90,6 +98,7 @@ async def check_out_with_face(
     Returns:
     - 200: Face verified, check-out recorded successfully
     - 401: Face verification failed, NO check-out recorded
+    - 503: Face verification is saturated; retry after ``Retry-After`` seconds
     """
     try:
         return await controller.check_out_with_face(db, employeeId, selfie)
@@ -102,19 +111,70 @@ async def check_out_with_face(
         raise HTTPException(status_code=500, detail=f"Check-out failed: {str(e)}")
 
 
+@router.get(
+    "/face-verification/metrics",
+    summary="Face verification pool load and per-stage timings",
+)
+def face_verification_metrics():
+    """
+    In-flight/rejected counts of the face verification worker pool, plus latency
+    (avg/p50/p95/max ms) of queue wait, download, decode, detect and match.
+    """
+    return controller.face_verification_metrics()
+
+
 @router.get("/today", response_model=TodayStatus)
-def today(employeeId: str = Query(..., min_length=1), db: Session = Depends(get_db)):
-    return controller.today_status(db, employeeId)
+async def today(
+    employeeId: str = Query(..., min_length=1), db: AsyncSession = Depends(get_async_db)
+):
+    return await controller.today_status(db, employeeId)
 
 
 @router.get("/month", response_model=list[MonthDay])
-def month(
+async def month(
     employeeId: str = Query(..., min_length=1),
     year: int = Query(..., ge=1970),
     month: int = Query(..., ge=1, le=12),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return controller.month_view(db, employeeId, year, month)
+    return await controller.month_view(db, employeeId, year, month)
+
+
+@router.get(
+    "/attendance/export",
+    summary="Stream a company- or department-wide month report as CSV or XLSX",
+    response_class=StreamingResponse,
+)
+def export_month_report(
+    year: int = Query(..., ge=1900, le=3000),
+    month: int = Query(..., ge=1, le=12),
+    format: ExportFormat = Query("csv"),
+    department: Optional[Department] = Query(None, description="Only this department"),
+    include_absent: bool = Query(True, description="Fill missing days as ABSENT"),
+    working_days_only: bool = Query(False, description="Skip region weekends and holidays"),
+    cap_to_today: bool = Query(True, description="For current month, report only up to today"),
+):
+    """
+    One row per employee per day, ordered by employee then date, with the same
+    columns and absence rules as the per-employee month report.
+    """
+    if format == "xlsx" and not xlsx_available():
+        raise HTTPException(status_code=501, detail="XLSX export needs openpyxl installed")
+    scope = department.value if department else "all"
+    filename = f"attendance_{year}-{month:02d}_{scope}.{format}"
+    return StreamingResponse(
+        controller.export_month_report(
+            year,
+            month,
+            format,
+            department=department,
+            include_absent=include_absent,
+            working_days_only=working_days_only,
+            cap_to_today=cap_to_today,
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get(
@@ -122,15 +182,15 @@ def month(
     response_model=EmployeeAttendanceResponse,
     summary="Get daily attendance for an employee by employee_id",
 )
-def get_employee_attendance_days(
+async def get_employee_attendance_days(
     employee_id: str,
     date_from: date = Query(..., description="Inclusive start date (YYYY-MM-DD, local IST date)"),
     date_to: date = Query(..., description="Inclusive end date (YYYY-MM-DD, local IST date)"),
     include_absent: bool = Query(True, description="Fill missing days as ABSENT"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        return controller.get_employee_attendance(
+        return await controller.get_employee_attendance(
             db=db,
             employee_id=employee_id,
             date_from=date_from,
@@ -225,39 +285,82 @@ def get_employee_month_report(
 
 @router.get(
     "/evidence/session/{session_id}",
-    response_model=list,
-    summary="Get all evidence for an attendance session",
+    response_model=List[AttendanceEvidenceResponse],
+    summary="Get evidence for an attendance session (cursor-paginated)",
 )
 def get_session_evidence(
     session_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
 ):
     """
-    Get all face verification evidence records for a specific attendance session.
-    Includes both check-in and check-out evidence if available.
+    Get face verification evidence records for a specific attendance session,
+    newest first. Includes both check-in and check-out evidence if available.
+    When more records exist, X-Next-Cursor and Link (rel="next") point at the next page.
     """
     try:
-        return controller.get_session_evidence(db, session_id)
+        items, next_cursor = controller.get_session_evidence(db, session_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve evidence: {str(e)}")
+    set_next_page_headers(request, response, next_cursor)
+    return items
 
 
 @router.get(
     "/evidence/employee/{employee_id}",
-    response_model=list,
-    summary="Get all face verification evidence for an employee",
+    response_model=List[AttendanceEvidenceResponse],
+    summary="Get face verification evidence for an employee (cursor-paginated)",
 )
 def get_employee_evidence(
     employee_id: str,
+    request: Request,
+    response: Response,
     date_from: date = Query(None, description="Filter from date (YYYY-MM-DD, optional)"),
     date_to: date = Query(None, description="Filter to date (YYYY-MM-DD, optional)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
 ):
     """
-    Get all face verification evidence records for an employee.
-    Optionally filter by date range.
+    Get face verification evidence records for an employee, newest first.
+    Optionally filter by date range. When more records exist, X-Next-Cursor
+    and Link (rel="next") point at the next page.
     """
     try:
-        return controller.get_employee_evidence(db, employee_id, date_from, date_to)
+        items, next_cursor = controller.get_employee_evidence(
+            db, employee_id, date_from, date_to, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve evidence: {str(e)}")
+    set_next_page_headers(request, response, next_cursor)
+    return items
+
+
+@router.get(
+    "/evidence/employee/{employee_id}/export",
+    summary="Stream an employee's full evidence history as NDJSON",
+    response_class=StreamingResponse,
+)
+def export_employee_evidence(
+    employee_id: str,
+    date_from: date = Query(None, description="Filter from date (YYYY-MM-DD, optional)"),
+    date_to: date = Query(None, description="Filter to date (YYYY-MM-DD, optional)"),
+):
+    """
+    Full evidence history for auditors, one JSON object per line, newest first.
+    Rows are read in keyset batches, so memory stays flat however long the history is.
+    """
+    return StreamingResponse(
+        controller.export_employee_evidence(employee_id, date_from, date_to),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="evidence_{employee_id}.ndjson"'
+        },
+    )
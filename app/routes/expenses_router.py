@@ -1,16 +1,34 @@
 # app/routes/expenses_router.py
+from datetime import date
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.controllers import expenses_controller
-from app.data.db import get_db
+from app.core.pagination import MAX_PAGE_SIZE, set_next_page_headers
+from app.data.db import get_async_db, get_db
+from app.data.models.expenses import ExpenseCategory
+from app.data.repositories.expense_repository import ExpenseFilter
+from app.services.expense_import_service import ImportFormat, detect_format
 from app.schemas.expense import (
     Expense as ExpenseOut,
 )
 from app.schemas.expense import (
     ExpenseCreate,
+    ExpenseImportReport,
     ExpenseUpdate,
     HalfSummary,
     MonthlySummary,
@@ -19,10 +37,12 @@ from app.schemas.expense import (
     WeeklySummary,
     YearlySummary,
     CategorySummaryResponse,
+    DashboardSummary,
 )
 
 # Reusable DB session type (removes Ruff B008 and keeps behavior the same)
 DBSession = Annotated[Session, Depends(get_db)]
+AsyncDBSession = Annotated[AsyncSession, Depends(get_async_db)]
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
@@ -34,8 +54,46 @@ def create_expense(expense: ExpenseCreate, db: DBSession):
 
 
 @router.get("/", response_model=list[ExpenseOut])
-def list_expenses(db: DBSession, skip: int = 0, limit: int = 10):
-    return expenses_controller.get_expenses(db, skip=skip, limit=limit)
+def list_expenses(
+    request: Request,
+    response: Response,
+    db: DBSession,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset; ignored with cursor"),
+    category: Optional[ExpenseCategory] = None,
+    added_by: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    include_total: bool = Query(False, description="Also return X-Total-Count (extra query)"),
+):
+    filters = ExpenseFilter(
+        category=category, added_by=added_by, date_from=date_from, date_to=date_to
+    )
+    items, next_cursor, total = expenses_controller.get_expenses(
+        db, filters, cursor=cursor, skip=skip, limit=limit, include_total=include_total
+    )
+    set_next_page_headers(request, response, next_cursor)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return items
+
+
+@router.post("/import", response_model=ExpenseImportReport)
+def import_expenses(
+    db: DBSession,
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[ImportFormat] = Query(None, description="Defaults from the file type"),
+):
+    """
+    Bulk-create expenses from a CSV or NDJSON upload, in batches.
+    Invalid rows are skipped and listed by line number in the report.
+    """
+    try:
+        fmt = format or detect_format(file.filename, file.content_type)
+        return expenses_controller.import_expenses(db, file.file, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{expense_id}", response_model=ExpenseOut)
@@ -55,36 +113,65 @@ def delete_expense(expense_id: int, db: DBSession):
 
 # ---------- Summary Endpoints ----------
 @router.get("/summary/total", response_model=TotalSummary)
-def total_expenses(db: DBSession):
-    total = expenses_controller.get_total_expenses(db)
+async def total_expenses(db: AsyncDBSession):
+    total = await expenses_controller.get_total_expenses(db)
     return {"total_expenses_all_time": total}
 
 
 @router.get("/summary/year", response_model=YearlySummary)
-def yearly_expenses(db: DBSession):
-    return expenses_controller.get_yearly_expenses(db)
+async def yearly_expenses(db: AsyncDBSession):
+    return await expenses_controller.get_yearly_expenses(db)
 
 
 @router.get("/summary/month", response_model=MonthlySummary)
-def monthly_expenses(db: DBSession):
-    return expenses_controller.get_monthly_expenses(db)
+async def monthly_expenses(db: AsyncDBSession):
+    return await expenses_controller.get_monthly_expenses(db)
 
 
 @router.get("/summary/half", response_model=HalfSummary)
-def half_expenses(db: DBSession, year: int, half: str):
-    return expenses_controller.get_half_expenses(db, year, half)
+async def half_expenses(db: AsyncDBSession, year: int, half: str):
+    return await expenses_controller.get_half_expenses(db, year, half)
 
 
 @router.get("/summary/monthwise", response_model=MonthwiseSummary)
-def monthwise_expenses(db: DBSession, year: int, month: Optional[int] = None):
-    return expenses_controller.get_monthwise_expenses(db, year, month)
+async def monthwise_expenses(db: AsyncDBSession, year: int, month: Optional[int] = None):
+    return await expenses_controller.get_monthwise_expenses(db, year, month)
 
 
 @router.get("/summary/week", response_model=WeeklySummary)
-def weekly_expenses(db: DBSession, year: int, month: int):
-    return expenses_controller.get_weekly_expenses(db, year, month)
+async def weekly_expenses(db: AsyncDBSession, year: int, month: int):
+    return await expenses_controller.get_weekly_expenses(db, year, month)
 
 
 @router.get("/summary/category", response_model=CategorySummaryResponse)
-def categorywise_expenses(db: DBSession, year: Optional[int] = None, month: Optional[int] = None):
-    return expenses_controller.get_categorywise_expenses(db, year, month)
+async def categorywise_expenses(
+    db: AsyncDBSession, year: Optional[int] = None, month: Optional[int] = None
+):
+    return await expenses_controller.get_categorywise_expenses(db, year, month)
+
+
+@router.get(
+    "/summary/dashboard",
+    response_model=DashboardSummary,
+    responses={304: {"description": "Not modified (If-None-Match matched the ETag)"}},
+)
+async def dashboard(
+    db: AsyncDBSession,
+    year: Optional[int] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    All summary tiles for one (year, month) in one call, defaulting to today.
+    Cached briefly in-process; poll with If-None-Match to get a bodiless 304.
+    """
+    payload, etag = await expenses_controller.get_dashboard(db, year, month)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
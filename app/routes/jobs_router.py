@@ -0,0 +1,18 @@
+# app/routes/jobs_router.py
+from fastapi import APIRouter
+
+from app.controllers.jobs_controller import get_job, list_jobs
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+# ✅ Recent background jobs (newest first)
+@router.get("/")
+def jobs():
+    return list_jobs()
+
+
+# ✅ Progress, throughput and per-employee errors of one job
+@router.get("/{job_id}")
+def job_status(job_id: str):
+    return get_job(job_id)
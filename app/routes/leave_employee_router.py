@@ -4,6 +4,7 @@ from typing import Iterable
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.schemas.leave_employee_schema import (
@@ -15,7 +16,7 @@ from app.schemas.leave_employee_schema import (
 )
 from app.controllers.leave_employee_controller import LeaveMeController
 from app.data.models.leave import LeaveStatus
-from app.data.db import SessionLocal
+from app.data.db import SessionLocal, get_async_db
 
 router = APIRouter(prefix="/api/leave", tags=["Leave"])
 ctl = LeaveMeController()
@@ -41,7 +42,6 @@ def list_balances(
     return ctl.list_balances(db, employeeId, year, month)
 
 
-@router.get("/calendar")
 def _parse_flexible_datetime(value: str) -> datetime:
     """Parse a datetime value that may be ISO format or common date formats.
 
@@ -70,15 +70,16 @@ def _parse_flexible_datetime(value: str) -> datetime:
     raise HTTPException(400, f"Invalid datetime: Unsupported format '{value}'")
 
 
-def get_calendar(
+@router.get("/calendar")
+async def get_calendar(
     employeeId: str,
     start: str = Query(..., description="ISO datetime or DD-MM-YYYY"),
     end: str = Query(..., description="ISO datetime or DD-MM-YYYY"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     start_dt = _parse_flexible_datetime(start)
     end_dt = _parse_flexible_datetime(end)
-    return ctl.get_calendar(db, employeeId, start_dt, end_dt)
+    return await ctl.get_calendar(db, employeeId, start_dt, end_dt)
 
 
 @router.post("/apply")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from datetime import date
 
@@ -7,7 +7,9 @@ from app.controllers.montly_summary_ctrl import (
     get_month_summaries,
     rollup_month_summaries,
 )
+from app.controllers.jobs_controller import submit_job
 from app.data.db import get_db
+from app.services.monthly_summary_service import rollup_month_job
 from app.data.models.add_employee import Employee  # assuming you have an Employee model
 
 router = APIRouter(prefix="/monthly-summary", tags=["Monthly Summary"])
@@ -31,7 +33,16 @@ def employee_summary(employee_id: str, month_start: date, db: Session = Depends(
 
 # ✅ Trigger rollup for all employees for a given month
 @router.post("/rollup")
-def rollup(month_start: date, db: Session = Depends(get_db)):
-    employees = [e.employee_id for e in db.query(Employee).all()]
+def rollup(
+    month_start: date,
+    response: Response,
+    background: bool = Query(False, description="Run as a background job and return its id"),
+    db: Session = Depends(get_db),
+):
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return submit_job("monthly_summary_rollup", rollup_month_job, month_start=month_start)
+
+    employees = [code for (code,) in db.query(Employee.employee_id)]
     results = rollup_month_summaries(db, month_start, employees)
     return {"generated": len(results), "summaries": results}
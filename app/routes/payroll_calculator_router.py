@@ -4,14 +4,17 @@ API endpoints for payroll calculations and examination.
 """
 
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from app.controllers.jobs_controller import submit_job
 from app.data.db import SessionLocal
 from app.services.payroll_calculator_service import (
     get_payroll_for_employee,
     get_payroll_for_all_employees,
     generate_salary_breakdown,
+    generate_salary_breakdowns_batch,
+    generate_salaries_job,
 )
 
 router = APIRouter(prefix="/api/payroll", tags=["payroll"])
@@ -26,7 +29,7 @@ def get_db():
 
 
 @router.get("/calculation/employee/{employee_id}")
-async def get_employee_payroll(
+def get_employee_payroll(
     employee_id: str,
     month_start: date = Query(..., description="First day of month (YYYY-MM-01)"),
     db: Session = Depends(get_db),
@@ -48,7 +51,7 @@ async def get_employee_payroll(
 
 
 @router.get("/calculation/all")
-async def get_all_employees_payroll(
+def get_all_employees_payroll(
     month_start: date = Query(..., description="First day of month (YYYY-MM-01)"),
     db: Session = Depends(get_db),
 ):
@@ -62,7 +65,7 @@ async def get_all_employees_payroll(
 
 
 @router.post("/generate/employee/{employee_id}")
-async def generate_employee_salary(
+def generate_employee_salary(
     employee_id: str,
     month_start: date = Query(..., description="First day of month (YYYY-MM-01)"),
     db: Session = Depends(get_db),
@@ -100,52 +103,43 @@ async def generate_employee_salary(
 
 
 @router.post("/generate/all")
-async def generate_all_employees_salaries(
+def generate_all_employees_salaries(
+    response: Response,
     month_start: date = Query(..., description="First day of month (YYYY-MM-01)"),
+    background: bool = Query(False, description="Run as a background job and return its id"),
     db: Session = Depends(get_db),
 ):
     """
     Generate/update salary records for all employees for a given month.
 
-    Returns summary of generated records.
+    Runs the set-based batch engine: all inputs are loaded in a few queries and
+    every breakdown is written in one transaction. Returns summary of generated
+    records plus per-phase timings (milliseconds).
+
+    With ``background=true`` the run is queued as a job (committed in chunks) and
+    202 is returned immediately with the job id; poll ``GET /jobs/{job_id}``.
     """
-    from app.data.models.add_employee import Employee
-
-    employees = db.query(Employee).all()
-    results = []
-    errors = []
-
-    for employee in employees:
-        try:
-            salary = generate_salary_breakdown(db, employee.employee_id, month_start)
-            if salary:
-                results.append(
-                    {
-                        "employee_id": employee.id,
-                        "employee_code": employee.employee_id,
-                        "gross_salary": salary.gross_salary,
-                        "status": "success",
-                    }
-                )
-            else:
-                errors.append(
-                    {
-                        "employee_id": employee.id,
-                        "error": "Salary record not found",
-                    }
-                )
-        except Exception as e:
-            errors.append(
-                {
-                    "employee_id": employee.id,
-                    "error": str(e),
-                }
-            )
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return submit_job("payroll_generate_all", generate_salaries_job, month_start=month_start)
+
+    batch = generate_salary_breakdowns_batch(db, month_start)
 
     return {
         "month": month_start.isoformat(),
-        "generated": len(results),
-        "failed": len(errors),
-        "results": results,
-        "errors": errors,
+        "generated": len(batch.calculations),
+        "failed": len(batch.errors),
+        "results": [
+            {
+                "employee_id": p.employee_id,
+                "employee_code": p.employee_code,
+                "gross_salary": p.gross_salary,
+                "status": "success",
+            }
+            for p in batch.calculations
+        ],
+        "errors": [
+            {"employee_id": e["employee_id"], "error": e["error"]} for e in batch.errors
+        ],
+        "timings": batch.timings,
     }
@@ -94,3 +94,35 @@ class CategorySummaryResponse(BaseModel):
     start_date: str
     end_date: str
     breakdown: list[CategoryBreakdown]
+
+
+class HalfMonthSummary(BaseModel):
+    year: int
+    month: int
+    first_half_total: float
+    second_half_total: float
+
+
+class DashboardSummary(BaseModel):
+    year: int
+    month: int
+    total: TotalSummary
+    yearly: YearlySummary
+    monthly: MonthlySummary
+    half: HalfSummary
+    half_month: HalfMonthSummary
+    monthwise: MonthwiseSummary
+    weekly: WeeklySummary
+    category: CategorySummaryResponse
+
+
+class ExpenseImportRowError(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class ExpenseImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[ExpenseImportRowError]
+    errors_truncated: bool = False
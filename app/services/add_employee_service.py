@@ -7,6 +7,7 @@ from sqlalchemy import select, func
 from app.core.security import hash_password
 from app.data.models.add_employee import Employee, Department
 from app.schemas.add_employee import EmployeeCreate, EmployeeUpdate, EmployeeRead
+from app.data.employee_identity import employee_identity
 
 
 class EmployeeService:
@@ -31,6 +32,8 @@ class EmployeeService:
         emp = Employee(**data)
         db.add(emp)
         db.commit()
+        # A "not found" for this id may be remembered by the request
+        employee_identity.invalidate(emp.employee_id, db)
         db.refresh(emp)
         return emp
 
@@ -100,6 +103,9 @@ class EmployeeService:
             setattr(emp, k, v)
 
         db.commit()
+        employee_identity.invalidate(employee_id, db)
+        if data.get("employee_id") not in (None, employee_id):
+            employee_identity.invalidate(data["employee_id"], db)
         db.refresh(emp)
         return emp
 
@@ -109,6 +115,7 @@ class EmployeeService:
             return False
         db.delete(emp)
         db.commit()
+        employee_identity.invalidate(employee_id, db)
         return True
 
     def get_employees_by_department(self, db: Session, department: Department) -> List[Employee]:
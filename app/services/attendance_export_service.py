@@ -0,0 +1,146 @@
+# app/services/attendance_export_service.py
+"""
+Company- or department-wide month attendance export as CSV or XLSX.
+
+Rows come from one ordered, server-side-cursor query over ``employees`` left
+joined to ``attendance_days`` (``AttendanceRepository.iter_month_report_rows``);
+missing days are filled as ABSENT here, one employee at a time, with the same
+rules as ``AttendanceService.get_employee_month_report``. Nothing but the
+current employee's days is held in memory.
+
+CSV is encoded and yielded in chunks as rows arrive. XLSX is a zip archive and
+cannot be produced incrementally, so rows go into an openpyxl write-only
+workbook (constant memory) saved to a temporary file that is then streamed.
+openpyxl is only imported when an XLSX export is requested.
+"""
+
+import csv
+import importlib.util
+import io
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from itertools import chain, groupby
+from typing import Any, Iterable, Iterator, Literal, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.timeutils import IST, _to_hours_minutes
+from app.data.calendar_index import calendar_index
+from app.data.models.add_employee import Department
+from app.data.models.attendance import DayStatus
+from app.data.repositories.attendance_repository import AttendanceRepository
+
+ExportFormat = Literal["csv", "xlsx"]
+
+EXPORT_COLUMNS = (
+    "employee_id",
+    "employee_name",
+    "department",
+    "work_date_local",
+    "status",
+    "seconds_worked",
+    "hours_worked",
+    "first_check_in_utc",
+    "last_check_out_utc",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def xlsx_available() -> bool:
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+def iter_month_rows(
+    db: Session,
+    year: int,
+    month: int,
+    department: Optional[Department] = None,
+    include_absent: bool = True,
+    working_days_only: bool = False,
+    cap_to_today: bool = True,
+    repo: Optional[AttendanceRepository] = None,
+) -> Iterator[tuple]:
+    """Yield one EXPORT_COLUMNS tuple per employee per reported day, by employee then date."""
+    repo = repo or AttendanceRepository()
+    start = date(year, month, 1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    if cap_to_today:
+        # Future days of the current month are not absences yet
+        end = min(end, datetime.now(IST).date())
+
+    rows = repo.iter_month_report_rows(db, start, end, department)
+    for _, group in groupby(rows, key=lambda r: r.employee_id):
+        first = next(group)
+        by_date = {r.work_date_local: r for r in chain([first], group) if r.work_date_local}
+        work_calendar = calendar_index.get(db, first.region, year) if working_days_only else None
+
+        # Days before joining / after leaving are not absences
+        day = max(start, first.date_of_joining)
+        last = min(end, first.date_of_leaving or end)
+        while day <= last:
+            if work_calendar is None or work_calendar.is_working(day):
+                r = by_date.get(day)
+                if r is not None:
+                    seconds = r.seconds_worked or 0
+                    yield (
+                        first.employee_id, first.name, first.department, day, r.status,
+                        seconds, _to_hours_minutes(seconds),
+                        r.first_check_in_utc, r.last_check_out_utc,
+                    )
+                elif include_absent:
+                    yield (
+                        first.employee_id, first.name, first.department, day, DayStatus.ABSENT,
+                        0, _to_hours_minutes(0), None, None,
+                    )
+            day += timedelta(days=1)
+
+
+def csv_chunks(rows: Iterable[tuple], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow([_csv_cell(v) for v in row])
+        if i % rows_per_chunk == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def xlsx_chunks(rows: Iterable[tuple], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Attendance")
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append([_xlsx_cell(v) for v in row])
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while chunk := tmp.read(chunk_size):
+            yield chunk
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _xlsx_cell(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Excel has no time zones; the columns are UTC by name
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
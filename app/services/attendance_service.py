@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Sequence
 from datetime import datetime, timedelta, date
 import calendar
 import platform
@@ -6,12 +6,16 @@ import os
 import sqlite3
 from pathlib import Path
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from app.data.repositories.attendance_repository import AttendanceRepository
-from app.data.models.add_employee import Employee
-from app.data.models.attendance import DayStatus
+from app.core.config import settings
+from app.data.repositories.attendance_repository import (
+    AsyncAttendanceRepository,
+    AttendanceRepository,
+)
+from app.data.models.attendance import AttendanceDay, AttendanceSession, DayStatus
 from app.schemas.attendance import (
     EmployeeAttendanceResponse,
     AttendanceDayItem,
@@ -28,9 +32,11 @@ from app.core.timeutils import (
     IST,
     _to_hours_minutes,
     _last_day_of_month,
-    _is_weekend,
     _avg_hhmm,
 )
+from app.data.calendar_index import calendar_index
+from app.data.employee_identity import EmployeeIdentity, employee_identity
+from app.services.checkin_monitoring_pipeline import monitoring_pipeline
 
 
 class AttendanceService:
@@ -38,13 +44,7 @@ class AttendanceService:
         self.repo = repo or AttendanceRepository()
 
     def _ensure_employee_exists(self, db: Session, employee_id: str):
-        # Check if employee exists
-        from sqlalchemy import select
-
-        emp = db.execute(
-            select(Employee).where(Employee.employee_id == employee_id)
-        ).scalar_one_or_none()
-        if not emp:
+        if not employee_identity.get(db, employee_id):
             raise HTTPException(404, f"Employee {employee_id} not found")
 
     def check_in(self, db: Session, employee_id: str):
@@ -56,11 +56,12 @@ class AttendanceService:
         wdate = to_local_date_ist(t0)
         sess = self.repo.create_session(db, employee_id, t0, wdate)
 
-        # Capture monitoring data
-        self.capture_checkin_monitoring(db, sess.id)
-
         db.commit()
         db.refresh(sess)
+
+        # Monitoring is captured off the request path, after the session is durable
+        if settings.CHECKIN_MONITORING_ENABLED:
+            monitoring_pipeline.enqueue(sess.id, t0)
         return sess
 
     def check_out(self, db: Session, employee_id: str):
@@ -119,39 +120,13 @@ class AttendanceService:
         self._ensure_employee_exists(db, employee_id)
         now = now_utc()
         wdate = to_local_date_ist(now)
-
         day = self.repo.get_day(db, employee_id, wdate)
-        closed_seconds = day.seconds_worked if day else 0
-
         open_sess = self.repo.get_open_session(db, employee_id)
-        open_since = (
-            open_sess.check_in_utc
-            if (open_sess and to_local_date_ist(open_sess.check_in_utc) == wdate)
-            else None
-        )
-        running = int((now - open_since).total_seconds()) if open_since else 0
-
-        total = closed_seconds + running
-        return {
-            "employeeId": employee_id,
-            "workDateLocal": wdate,
-            "openSessionId": open_sess.id if open_sess else None,
-            "openSinceUtc": open_since,
-            "secondsWorkedSoFar": total,
-            "present": total > 0 or bool(open_sess),
-        }
+        return _today_status(employee_id, now, wdate, day, open_sess)
 
     def month_view(self, db: Session, employee_id: str, year: int, month: int):
         self._ensure_employee_exists(db, employee_id)
-        days = self.repo.month_days(db, employee_id, year, month)
-        return [
-            {
-                "date": d.work_date_local,
-                "secondsWorked": d.seconds_worked,
-                "present": d.seconds_worked > 0,
-            }
-            for d in days
-        ]
+        return _month_view(self.repo.month_days(db, employee_id, year, month))
 
     def get_employee_attendance(
         self,
@@ -164,58 +139,13 @@ class AttendanceService:
         if date_from > date_to:
             raise ValueError("date_from cannot be after date_to")
 
-        emp = self.repo.get_employee_basic(db, employee_id)
+        emp = employee_identity.get(db, employee_id)
         if not emp:
             # Surface a clean error; your router will map to 404
             raise LookupError("Employee not found")
 
         rows = self.repo.get_days_for_employee(db, employee_id, date_from, date_to)
-
-        # Map existing days by date for quick lookup
-        by_date: Dict[date, AttendanceDayItem] = {}
-        for r in rows:
-            by_date[r.work_date_local] = AttendanceDayItem(
-                work_date_local=r.work_date_local,
-                seconds_worked=r.seconds_worked or 0,
-                hours_worked=_to_hours_minutes(r.seconds_worked or 0),
-                status=r.status,
-                first_check_in_utc=r.first_check_in_utc,
-                last_check_out_utc=r.last_check_out_utc,
-            )
-
-        # Build full day range; optionally inject ABSENT for missing rows
-        items: List[AttendanceDayItem] = []
-        cursor = date_from
-        while cursor <= date_to:
-            if cursor in by_date:
-                items.append(by_date[cursor])
-            else:
-                if include_absent:
-                    items.append(
-                        AttendanceDayItem(
-                            work_date_local=cursor,
-                            seconds_worked=0,
-                            hours_worked=_to_hours_minutes(0),
-                            status=DayStatus.ABSENT,
-                            first_check_in_utc=None,
-                            last_check_out_utc=None,
-                        )
-                    )
-            cursor = cursor + timedelta(days=1)
-
-        present_days = sum(1 for it in items if it.status == DayStatus.PRESENT)
-        absent_days = sum(1 for it in items if it.status == DayStatus.ABSENT)
-
-        return EmployeeAttendanceResponse(
-            employee_id=employee_id,
-            employee_name=getattr(emp, "name", None),
-            date_from=date_from,
-            date_to=date_to,
-            total_days=len(items),
-            present_days=present_days,
-            absent_days=absent_days,
-            items=items,
-        )
+        return _attendance_range(emp, employee_id, date_from, date_to, rows, include_absent)
 
     def get_employee_attendance_monthly(
         self,
@@ -229,11 +159,12 @@ class AttendanceService:
         """
         Month-wise aggregation for an employee in a given year.
         - If include_absent=True, missing calendar days are counted as ABSENT.
-        - If working_days_only=True, only Mon–Fri are considered for absence fill.
+        - If working_days_only=True, only the employee's working days are counted
+          (region workweek policy, holidays excluded).
         - If cap_to_today=True, for current month in `year`, counts only up to local IST 'today'.
         """
         # Validate employee
-        emp = self.repo.get_employee_basic(db, employee_id)
+        emp = employee_identity.get(db, employee_id)
         if not emp:
             raise LookupError("Employee not found")
 
@@ -244,6 +175,7 @@ class AttendanceService:
 
         # Index by date for quick lookup
         by_date = {r.work_date_local: r for r in day_rows}
+        work_calendar = calendar_index.get(db, emp.region, year)
 
         months: list[MonthlyAttendanceItem] = []
         total_seconds = 0
@@ -269,8 +201,8 @@ class AttendanceService:
 
             cursor = m_start
             while cursor <= m_end:
-                # Skip weekends if we're only counting working days
-                if working_days_only and _is_weekend(cursor):
+                # Skip weekends/holidays if we're only counting working days
+                if working_days_only and not work_calendar.is_working(cursor):
                     cursor += timedelta(days=1)
                     continue
 
@@ -309,7 +241,7 @@ class AttendanceService:
 
         return EmployeeYearlyAttendanceResponse(
             employee_id=employee_id,
-            employee_name=getattr(emp, "name", None),
+            employee_name=emp.name,
             year=year,
             total_seconds_worked=total_seconds,
             total_hours_worked=_to_hours_minutes(total_seconds),
@@ -332,13 +264,14 @@ class AttendanceService:
         Detailed single-month report with daily rows and monthly totals.
 
         - include_absent=True: fills missing calendar days as ABSENT
-        - working_days_only=True: counts only Mon–Fri (weekends entirely ignored)
+        - working_days_only=True: counts only working days (region weekends and
+          holidays entirely ignored)
         - cap_to_today=True: for the current month, count only up to local 'today'
         """
         if month < 1 or month > 12:
             raise ValueError("month must be in 1..12")
 
-        emp = self.repo.get_employee_basic(db, employee_id)
+        emp = employee_identity.get(db, employee_id)
         if not emp:
             raise LookupError("Employee not found")
 
@@ -354,6 +287,7 @@ class AttendanceService:
 
         rows = self.repo.get_days_for_employee(db, employee_id, start, end)
         by_date = {r.work_date_local: r for r in rows}
+        work_calendar = calendar_index.get(db, emp.region, year)
 
         items: list[AttendanceDayItem] = []
         total_seconds = 0
@@ -363,7 +297,7 @@ class AttendanceService:
 
         cursor = start
         while cursor <= end:
-            if working_days_only and _is_weekend(cursor):
+            if working_days_only and not work_calendar.is_working(cursor):
                 cursor += timedelta(days=1)
                 continue
 
@@ -406,7 +340,7 @@ class AttendanceService:
 
         return EmployeeMonthlyAttendanceResponse(
             employee_id=employee_id,
-            employee_name=getattr(emp, "name", None),
+            employee_name=emp.name,
             year=year,
             month=month,
             month_name=calendar.month_name[month],
@@ -425,7 +359,7 @@ class AttendanceService:
         """
         Returns monitoring data for an employee.
         """
-        emp = self.repo.get_employee_basic(db, employee_id)
+        emp = employee_identity.get(db, employee_id)
         if not emp:
             raise LookupError("Employee not found")
 
@@ -455,7 +389,7 @@ class AttendanceService:
 
         return EmployeeCheckInMonitoringResponse(
             employee_id=employee_id,
-            employee_name=getattr(emp, "name", None),
+            employee_name=emp.name,
             items=items,
         )
 
@@ -713,16 +647,14 @@ class AttendanceService:
         logger.info(f"Final unique sites: {len(unique_sites)}")
         return unique_sites
 
-    def capture_checkin_monitoring(self, db: Session, session_id: int):
+    def collect_monitoring_snapshot(self) -> dict:
         """
-        Captures system monitoring data at check-in time.
+        Captures system monitoring data (run by the monitoring pipeline worker).
         """
         import psutil
 
-        monitored_at = now_utc()
-
-        # Get CPU and memory usage
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # CPU usage since the previous call (non-blocking; the worker primes it)
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory_percent = psutil.virtual_memory().percent
 
         # Get active applications (running processes)
@@ -740,13 +672,152 @@ class AttendanceService:
         # Get browser history
         visited_sites = self._get_browser_history(hours_back=24)
 
-        # Save to database
-        self.repo.create_monitoring(
-            db=db,
-            session_id=session_id,
-            monitored_at_utc=monitored_at,
-            cpu_percent=cpu_percent,
-            memory_percent=memory_percent,
-            active_apps=active_apps,
-            visited_sites=visited_sites,
+        return {
+            "cpu_percent": cpu_percent,
+            "memory_percent": memory_percent,
+            "active_apps": active_apps,
+            "visited_sites": visited_sites,
+        }
+
+
+class AsyncAttendanceService:
+    """
+    The hot attendance reads (today, month view, date range) on an AsyncSession,
+    so they run on the event loop without holding a threadpool thread.
+    """
+
+    def __init__(self, repo: AsyncAttendanceRepository | None = None):
+        self.repo = repo or AsyncAttendanceRepository()
+
+    async def _require_employee(
+        self, db: AsyncSession, employee_id: str
+    ) -> EmployeeIdentity:
+        emp = await employee_identity.get_async(db, employee_id)
+        if not emp:
+            raise HTTPException(404, f"Employee {employee_id} not found")
+        return emp
+
+    async def today_status(self, db: AsyncSession, employee_id: str) -> dict:
+        await self._require_employee(db, employee_id)
+        now = now_utc()
+        wdate = to_local_date_ist(now)
+        day = await self.repo.get_day(db, employee_id, wdate)
+        open_sess = await self.repo.get_open_session(db, employee_id)
+        return _today_status(employee_id, now, wdate, day, open_sess)
+
+    async def month_view(
+        self, db: AsyncSession, employee_id: str, year: int, month: int
+    ) -> list[dict]:
+        await self._require_employee(db, employee_id)
+        return _month_view(await self.repo.month_days(db, employee_id, year, month))
+
+    async def get_employee_attendance(
+        self,
+        db: AsyncSession,
+        employee_id: str,
+        date_from: date,
+        date_to: date,
+        include_absent: bool = True,
+    ) -> EmployeeAttendanceResponse:
+        if date_from > date_to:
+            raise ValueError("date_from cannot be after date_to")
+        emp = await employee_identity.get_async(db, employee_id)
+        if not emp:
+            raise LookupError("Employee not found")
+        rows = await self.repo.get_days_for_employee(db, employee_id, date_from, date_to)
+        return _attendance_range(emp, employee_id, date_from, date_to, rows, include_absent)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Response builders shared by AttendanceService and AsyncAttendanceService
+# ──────────────────────────────────────────────────────────────────────────────
+def _today_status(
+    employee_id: str,
+    now: datetime,
+    wdate: date,
+    day: AttendanceDay | None,
+    open_sess: AttendanceSession | None,
+) -> dict:
+    closed_seconds = day.seconds_worked if day else 0
+    open_since = (
+        open_sess.check_in_utc
+        if (open_sess and to_local_date_ist(open_sess.check_in_utc) == wdate)
+        else None
+    )
+    running = int((now - open_since).total_seconds()) if open_since else 0
+
+    total = closed_seconds + running
+    return {
+        "employeeId": employee_id,
+        "workDateLocal": wdate,
+        "openSessionId": open_sess.id if open_sess else None,
+        "openSinceUtc": open_since,
+        "secondsWorkedSoFar": total,
+        "present": total > 0 or bool(open_sess),
+    }
+
+
+def _month_view(days: Sequence[AttendanceDay]) -> list[dict]:
+    return [
+        {
+            "date": d.work_date_local,
+            "secondsWorked": d.seconds_worked,
+            "present": d.seconds_worked > 0,
+        }
+        for d in days
+    ]
+
+
+def _attendance_range(
+    emp: EmployeeIdentity,
+    employee_id: str,
+    date_from: date,
+    date_to: date,
+    rows: Sequence[AttendanceDay],
+    include_absent: bool,
+) -> EmployeeAttendanceResponse:
+    # Map existing days by date for quick lookup
+    by_date: Dict[date, AttendanceDayItem] = {}
+    for r in rows:
+        by_date[r.work_date_local] = AttendanceDayItem(
+            work_date_local=r.work_date_local,
+            seconds_worked=r.seconds_worked or 0,
+            hours_worked=_to_hours_minutes(r.seconds_worked or 0),
+            status=r.status,
+            first_check_in_utc=r.first_check_in_utc,
+            last_check_out_utc=r.last_check_out_utc,
         )
+
+    # Build full day range; optionally inject ABSENT for missing rows
+    items: List[AttendanceDayItem] = []
+    cursor = date_from
+    while cursor <= date_to:
+        if cursor in by_date:
+            items.append(by_date[cursor])
+        else:
+            if include_absent:
+                items.append(
+                    AttendanceDayItem(
+                        work_date_local=cursor,
+                        seconds_worked=0,
+                        hours_worked=_to_hours_minutes(0),
+                        status=DayStatus.ABSENT,
+                        first_check_in_utc=None,
+                        last_check_out_utc=None,
+                    )
+                )
+        cursor = cursor + timedelta(days=1)
+
+    present_days = sum(1 for it in items if it.status == DayStatus.PRESENT)
+    absent_days = sum(1 for it in items if it.status == DayStatus.ABSENT)
+
+    return EmployeeAttendanceResponse(
+        employee_id=employee_id,
+        employee_name=emp.name,
+        date_from=date_from,
+        date_to=date_to,
+        total_days=len(items),
+        present_days=present_days,
+        absent_days=absent_days,
+        items=items,
+    )
@@ -0,0 +1,174 @@
+# app/services/checkin_monitoring_pipeline.py
+"""
+Asynchronous capture of check-in monitoring telemetry.
+
+Collecting a snapshot (CPU/memory, running processes, browser history files) is
+slow disk and process-table work, so check-in only enqueues the committed
+session id. A single daemon worker drains the queue, takes one snapshot per
+batch and writes the batch to ``checkin_monitoring`` with one INSERT on its own
+session. If the queue is full the capture is dropped (monitoring is optional);
+check-in never waits for it. Controlled by ``CHECKIN_MONITORING_ENABLED``.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.data.db import SessionLocal
+from app.data.repositories.attendance_repository import AttendanceRepository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+Snapshot = Dict[str, Any]  # cpu_percent, memory_percent, active_apps, visited_sites
+
+
+def _default_snapshot() -> Snapshot:
+    from app.services.attendance_service import AttendanceService
+
+    return AttendanceService().collect_monitoring_snapshot()
+
+
+def _prime_cpu_percent() -> None:
+    # psutil.cpu_percent(interval=None) measures since its previous call; the first
+    # call only sets the baseline, so make it when the worker starts.
+    import psutil
+
+    psutil.cpu_percent(interval=None)
+
+
+class MonitoringCapturePipeline:
+    """Bounded queue plus one worker thread that batches monitoring inserts."""
+
+    def __init__(
+        self,
+        snapshot: Callable[[], Snapshot] = _default_snapshot,
+        on_start: Optional[Callable[[], None]] = _prime_cpu_percent,
+        session_factory: sessionmaker = SessionLocal,
+        batch_size: int = 50,
+        flush_seconds: float = 2.0,
+        max_queue: int = 1000,
+        repo: AttendanceRepository | None = None,
+    ):
+        self.snapshot = snapshot
+        self.on_start = on_start
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.repo = repo or AttendanceRepository()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"enqueued": 0, "dropped": 0, "written": 0, "failed": 0, "batches": 0}
+
+    def enqueue(self, session_id: int, monitored_at_utc: datetime) -> bool:
+        """Queue a capture for a committed session; False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((session_id, monitored_at_utc))
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(f"Monitoring queue full; dropped capture for session {session_id}")
+            return False
+        self._count("enqueued")
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is queued and stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Worker
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="checkin-monitoring", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        if self.on_start is not None:
+            try:
+                self.on_start()
+            except Exception as e:
+                logger.warning(f"Monitoring worker start hook failed: {e}")
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch: List[Tuple[int, datetime]] = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[int, datetime]]) -> None:
+        try:
+            snapshot = self.snapshot()
+        except Exception as e:
+            logger.warning(f"Monitoring snapshot failed: {e}")
+            snapshot = {}
+
+        rows = [
+            {
+                "session_id": session_id,
+                "monitored_at_utc": monitored_at,
+                "cpu_percent": snapshot.get("cpu_percent"),
+                "memory_percent": snapshot.get("memory_percent"),
+                "active_apps": snapshot.get("active_apps", []),
+                "visited_sites": snapshot.get("visited_sites", []),
+            }
+            for session_id, monitored_at in batch
+        ]
+
+        db = self.session_factory()
+        try:
+            self.repo.create_monitoring_bulk(db, rows)
+            db.commit()
+            self._count("written", len(rows))
+        except Exception as e:
+            db.rollback()
+            self._count("failed", len(rows))
+            logger.error(f"Failed to write {len(rows)} monitoring rows: {e}")
+        finally:
+            db.close()
+        self._count("batches")
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+
+monitoring_pipeline = MonitoringCapturePipeline(
+    batch_size=settings.CHECKIN_MONITORING_BATCH_SIZE,
+    flush_seconds=settings.CHECKIN_MONITORING_FLUSH_SECONDS,
+    max_queue=settings.CHECKIN_MONITORING_MAX_QUEUE,
+)
@@ -19,6 +19,16 @@ class EmployeeProfileService:
     def __init__(self):
         self.emp_repo = EmployeeRepository()
         self.profile_repo = EmployeeProfileRepo()
+        self._face_service = None
+
+    @property
+    def face_service(self):
+        # Built on first enrollment (imports OpenCV; models come from the shared registry)
+        if self._face_service is None:
+            from app.services.face_verification_service import FaceVerificationService
+
+            self._face_service = FaceVerificationService()
+        return self._face_service
 
     async def upload_profile_image(self, db: Session, employee_id: str, file: UploadFile):
         # 1) validate employee exists
@@ -37,7 +47,18 @@ class EmployeeProfileService:
         if len(data) > MAX_BYTES:
             raise ValueError("Image too large (max 3MB)")
 
-        # 3) build storage path (unique)
+        # 3) describe the enrolled face once, so check-ins never re-download this image
+        face_features = None
+        try:
+            features = self.face_service.extract_face_features(data)
+            if features is not None:
+                face_features = features.to_bytes()
+            else:
+                logger.warning(f"No face detected in profile image for {employee_id}")
+        except Exception as e:
+            logger.warning(f"Could not precompute face features for {employee_id}: {e}")
+
+        # 4) build storage path (unique)
         ext = (
             "jpg"
             if content_type == "image/jpeg"
@@ -49,7 +70,7 @@ class EmployeeProfileService:
 
         supabase = get_supabase()
 
-        # 4) delete old image (optional best practice)
+        # 5) delete old image (optional best practice)
         existing = self.profile_repo.get_by_employee_id(db, employee_id)
         if existing and existing.profile_bucket and existing.profile_path:
             try:
@@ -58,7 +79,7 @@ class EmployeeProfileService:
                 # don't fail upload if delete fails
                 pass
 
-        # 5) upload to Supabase
+        # 6) upload to Supabase
         try:
             res = supabase.storage.from_(bucket).upload(
                 path,
@@ -70,7 +91,7 @@ class EmployeeProfileService:
             logger.error(f"Supabase upload failed: {str(e)}")
             raise ValueError(f"Upload to storage failed: {str(e)}")
 
-        # 6) save metadata in DB
+        # 7) save metadata (and face features) in DB
         row = self.profile_repo.upsert_profile_image(
             db=db,
             employee_id=employee_id,
@@ -78,9 +99,10 @@ class EmployeeProfileService:
             path=path,
             mime=content_type,
             size=len(data),
+            face_features=face_features,
         )
 
-        # 7) return URL for UI
+        # 8) return URL for UI
         url = self._build_image_url(bucket, path)
         return row, url
 
@@ -1,23 +1,21 @@
 # app/services/employee_salary_service.py
 from typing import Optional
-from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from app.data.models.employee_salary import EmployeeSalary
-from app.data.models.payroll_policy import PayrollPolicy
+from app.data.models.payroll_policy_rule import Ruletypes
 from app.data.models.salary_breakdown import SalaryBreakdown
 from app.data.models.add_employee import Employee
 from app.schemas.employee_salary import EmployeeSalaryCreate, EmployeeSalaryUpdate
+from app.services.payroll_policy_cache import CompiledPolicy, policy_cache
 
 
-def calculate_gross_with_breakdown(base_salary: float, policy: Optional[PayrollPolicy]):
+def calculate_gross_with_breakdown(base_salary: float, policy: Optional[CompiledPolicy]):
     gross = base_salary
     breakdowns = []
 
     if policy:
         for rule in policy.rules:
-            if not rule.is_enabled:
-                continue
-            amount = (base_salary * rule.value / 100) if rule.is_percentage else rule.value
+            amount = rule.amount_for(base_salary)
             breakdowns.append(
                 {
                     "rule_name": rule.rule_name,
@@ -26,18 +24,16 @@ def calculate_gross_with_breakdown(base_salary: float, policy: Optional[PayrollP
                     "applies_to": rule.applies_to,
                 }
             )
-            if rule.rule_type == "ALLOWANCE":
+            if rule.rule_type is Ruletypes.ALLOWANCE:
                 gross += amount
-            elif rule.rule_type == "DEDUCTION":
+            elif rule.rule_type is Ruletypes.DEDUCTION:
                 gross -= amount
 
     return gross, breakdowns
 
 
 def _payroll_policy_tables_exist(db: Session) -> bool:
-    bind = db.get_bind()
-    inspector = inspect(bind)
-    return inspector.has_table("payroll_policies") and inspector.has_table("payroll_policy_rules")
+    return policy_cache.tables_exist(db)
 
 
 def create_salary(db: Session, data: EmployeeSalaryCreate):
@@ -48,7 +44,7 @@ def create_salary(db: Session, data: EmployeeSalaryCreate):
 
     policy = None
     if data.payroll_policy_id and _payroll_policy_tables_exist(db):
-        policy = db.query(PayrollPolicy).filter(PayrollPolicy.id == data.payroll_policy_id).first()
+        policy = policy_cache.get(db, data.payroll_policy_id)
     gross, breakdowns = calculate_gross_with_breakdown(data.base_salary, policy)
 
     salary = EmployeeSalary(
@@ -80,7 +76,7 @@ def update_salary(db: Session, salary_id: int, updates: EmployeeSalaryUpdate):
 
     policy = None
     if salary.payroll_policy_id and _payroll_policy_tables_exist(db):
-        policy = db.query(PayrollPolicy).filter(PayrollPolicy.id == salary.payroll_policy_id).first()
+        policy = policy_cache.get(db, salary.payroll_policy_id)
     gross, breakdowns = calculate_gross_with_breakdown(salary.base_salary, policy)
     salary.gross_salary = gross
 
@@ -0,0 +1,144 @@
+# app/services/expense_import_service.py
+"""
+Bulk expense import from CSV or NDJSON uploads.
+
+The upload is consumed as a stream: generators parse one record at a time and
+validate it against ``ExpenseCreate``, and valid rows are inserted
+EXPENSE_IMPORT_BATCH_SIZE at a time through ``ExpenseRepository.bulk_create``
+(COPY on Postgres, one executemany INSERT elsewhere). Memory is bounded by the
+batch size and the error report cap, not by the file.
+
+Each batch commits on its own, so a file with bad rows still imports its good
+ones; the bad rows are reported by line number and nothing is retried.
+"""
+
+import csv
+import io
+import json
+from typing import BinaryIO, Iterable, Iterator, Literal, Optional, Union
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.data.repositories.expense_repository import ExpenseRepository
+from app.schemas.expense import ExpenseCreate
+from app.services.expense_summary_service import dashboard_cache
+
+ImportFormat = Literal["csv", "ndjson"]
+
+_FIELDS = tuple(ExpenseCreate.model_fields)
+_REQUIRED = {name for name, field in ExpenseCreate.model_fields.items() if field.is_required()}
+
+# (line number, parsed record or a parse error message)
+Record = tuple[int, Union[dict, str]]
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> ImportFormat:
+    """Infer the upload format from its content type or file extension."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    name = (filename or "").lower()
+    if content_type in ("text/csv", "application/csv") or name.endswith(".csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/jsonl") or name.endswith(
+        (".ndjson", ".jsonl")
+    ):
+        return "ndjson"
+    raise ValueError("Cannot tell the file format; pass format=csv or format=ndjson")
+
+
+def iter_records(stream: BinaryIO, fmt: ImportFormat) -> Iterator[Record]:
+    """Yield ``(line, record)`` pairs from a UTF-8 CSV (with header) or NDJSON stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            yield from _csv_records(text)
+        else:
+            yield from _ndjson_records(text)
+    finally:
+        text.detach()  # leave the caller's stream open
+
+
+def _csv_records(text: io.TextIOWrapper) -> Iterator[Record]:
+    reader = csv.DictReader(text)
+    missing = _REQUIRED - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+    for row in reader:
+        # Blank cells mean "not given", so optional columns fall back to their defaults
+        yield reader.line_num, {k: row[k] for k in _FIELDS if row.get(k) not in (None, "")}
+
+
+def _ndjson_records(text: io.TextIOWrapper) -> Iterator[Record]:
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "expected a JSON object"
+            continue
+        yield line_no, record
+
+
+def validate_records(
+    records: Iterable[Record],
+) -> Iterator[tuple[int, Union[ExpenseCreate, list[str]]]]:
+    """Validate each record against ExpenseCreate, yielding the model or its error messages."""
+    for line_no, record in records:
+        if isinstance(record, str):
+            yield line_no, [record]
+            continue
+        try:
+            yield line_no, ExpenseCreate.model_validate(record)
+        except ValidationError as e:
+            yield line_no, [
+                f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+                for err in e.errors()
+            ]
+
+
+def import_expenses(
+    db: Session,
+    stream: BinaryIO,
+    fmt: ImportFormat,
+    batch_size: Optional[int] = None,
+) -> dict:
+    """
+    Import every valid row of ``stream`` and report the rest.
+
+    Raises ValueError when the upload as a whole is unusable (missing CSV
+    columns, not UTF-8); batches committed before that point stay committed.
+    """
+    repo = ExpenseRepository(db)
+    batch_size = batch_size or settings.EXPENSE_IMPORT_BATCH_SIZE
+    max_errors = settings.EXPENSE_IMPORT_MAX_ERRORS
+
+    inserted = failed = 0
+    errors: list[dict] = []
+    batch: list[ExpenseCreate] = []
+    try:
+        for line_no, result in validate_records(iter_records(stream, fmt)):
+            if isinstance(result, ExpenseCreate):
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    inserted += repo.bulk_create(batch)
+                    batch = []
+                continue
+            failed += 1
+            if len(errors) < max_errors:
+                errors.append({"line": line_no, "errors": result})
+        inserted += repo.bulk_create(batch)
+    finally:
+        # Batches commit as they go, also when the upload fails part-way
+        dashboard_cache.invalidate()
+
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
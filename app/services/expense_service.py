@@ -1,24 +1,55 @@
+from typing import Optional
+
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.pagination import decode_datetime_id_cursor, encode_cursor
 from app.data.models.expenses import Expense
+from app.data.repositories.expense_repository import ExpenseFilter, ExpenseRepository
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate
+from app.services.expense_summary_service import dashboard_cache
 
 
 class ExpenseService:
     def __init__(self, db: Session):
         self.db = db
+        self.repo = ExpenseRepository(db)
 
     def create_expense(self, expense_data: ExpenseCreate) -> Expense:
-        expense = Expense(**expense_data.dict())
-        self.db.add(expense)
-        self.db.commit()
-        self.db.refresh(expense)
+        expense = self.repo.create(expense_data)
+        # Only after the repository committed: a dashboard rebuilt earlier would miss the row
+        dashboard_cache.invalidate()
         return expense
 
     def get_all_expenses(self) -> list[Expense]:
         return self.db.query(Expense).all()
 
+    def list_expenses(
+        self,
+        filters: ExpenseFilter,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        skip: int = 0,
+        include_total: bool = False,
+    ) -> tuple[list[Expense], Optional[str], Optional[int]]:
+        """
+        One page of expenses (newest first) plus the next page's cursor and,
+        only when asked for, the total number of matching rows.
+        """
+        try:
+            after = decode_datetime_id_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        rows = self.repo.list_page(filters, after=after, offset=skip, limit=limit + 1)
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        total = self.repo.count(filters) if include_total else None
+        return items, next_cursor, total
+
     def get_expense_by_id(self, expense_id: int) -> Expense:
         expense = self.db.query(Expense).get(expense_id)
         if not expense:
@@ -26,14 +57,13 @@ class ExpenseService:
         return expense
 
     def update_expense(self, expense_id: int, data: ExpenseUpdate) -> Expense:
-        expense = self.get_expense_by_id(expense_id)
-        for key, value in data.dict().items():
-            setattr(expense, key, value)
-        self.db.commit()
-        self.db.refresh(expense)
+        expense = self.repo.update(expense_id, data)
+        if not expense:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        dashboard_cache.invalidate()
         return expense
 
     def delete_expense(self, expense_id: int) -> None:
-        expense = self.get_expense_by_id(expense_id)
-        self.db.delete(expense)
-        self.db.commit()
+        if not self.repo.delete(expense_id):
+            raise HTTPException(status_code=404, detail="Expense not found")
+        dashboard_cache.invalidate()
@@ -1,36 +1,56 @@
-from datetime import date
+import hashlib
+import json
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
 from typing import Optional
 
-from sqlalchemy import extract, func
+from sqlalchemy import case, extract, func
 from sqlalchemy.orm import Session
 
-from app.data.models.expenses import Expense
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.data.models.expenses import ExpenseDailyTotal
+
+# Summaries read the per-(date, category) rollup maintained by ExpenseRepository
+# and filter it with half-open date ranges, so every tile is an index range scan.
+Daily = ExpenseDailyTotal
+
+# (year, month) -> (dashboard payload, ETag); ExpenseService and the importer invalidate it
+# after their writes commit
+dashboard_cache: TTLCache[tuple[dict, str]] = TTLCache(
+    ttl_seconds=settings.EXPENSE_DASHBOARD_CACHE_TTL_SECONDS
+)
+
+
+def _month_range(year: int, month: int) -> tuple[date, date]:
+    start = date(year, month, 1)
+    return start, start + timedelta(days=monthrange(year, month)[1])
+
+
+def _in_range(start: date, end: date):
+    return (Daily.date >= start, Daily.date < end)
+
+
+def _sum_between(db: Session, start: date, end: date) -> float:
+    return db.query(func.sum(Daily.total_amount)).filter(*_in_range(start, end)).scalar() or 0.0
 
 
 def get_total_expenses(db: Session) -> float:
-    total = db.query(func.sum(Expense.amount)).scalar() or 0.0
+    total = db.query(func.sum(Daily.total_amount)).scalar() or 0.0
     return round(total, 2)
 
 
 def get_yearly_expenses(db: Session) -> dict:
     year = date.today().year
-    total = (
-        db.query(func.sum(Expense.amount)).filter(extract("year", Expense.date) == year).scalar()
-    ) or 0.0
+    total = _sum_between(db, date(year, 1, 1), date(year + 1, 1, 1))
 
     return {"year": year, "total_expenses_this_year": round(total, 2)}
 
 
 def get_monthly_expenses(db: Session) -> dict:
     today = date.today()
-    total = (
-        db.query(func.sum(Expense.amount))
-        .filter(
-            extract("year", Expense.date) == today.year,
-            extract("month", Expense.date) == today.month,
-        )
-        .scalar()
-    ) or 0.0
+    total = _sum_between(db, *_month_range(today.year, today.month))
 
     return {
         "year": today.year,
@@ -41,20 +61,13 @@ def get_monthly_expenses(db: Session) -> dict:
 
 def get_half_expenses(db: Session, year: int, half: str) -> dict:
     if half == "H1":
-        months = (1, 6)
+        start, end = date(year, 1, 1), date(year, 7, 1)
     elif half == "H2":
-        months = (7, 12)
+        start, end = date(year, 7, 1), date(year + 1, 1, 1)
     else:
         raise ValueError("Invalid half value. Must be 'H1' or 'H2'")
 
-    total = (
-        db.query(func.sum(Expense.amount))
-        .filter(
-            extract("year", Expense.date) == year,
-            extract("month", Expense.date).between(*months),
-        )
-        .scalar()
-    ) or 0.0
+    total = _sum_between(db, start, end)
 
     return {
         "year": year,
@@ -64,15 +77,18 @@ def get_half_expenses(db: Session, year: int, half: str) -> dict:
 
 
 def get_monthwise_expenses(db: Session, year: int, month: Optional[int] = None) -> dict:
-    query = db.query(
-        extract("month", Expense.date).label("month"),
-        func.sum(Expense.amount).label("total"),
-    ).filter(extract("year", Expense.date) == year)
-
     if month:
-        query = query.filter(extract("month", Expense.date) == month)
+        start, end = _month_range(year, month)
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
 
-    query = query.group_by("month").order_by("month")
+    month_col = extract("month", Daily.date).label("month")
+    query = (
+        db.query(month_col, func.sum(Daily.total_amount).label("total"))
+        .filter(*_in_range(start, end))
+        .group_by(month_col)
+        .order_by(month_col)
+    )
 
     results = query.all()
 
@@ -83,17 +99,14 @@ def get_monthwise_expenses(db: Session, year: int, month: Optional[int] = None)
 
 def get_weekly_expenses(db: Session, year: int, month: int) -> dict:
     # Calculate week of month: (day - 1) // 7 + 1
-    week_of_month = ((extract("day", Expense.date) - 1) // 7 + 1).label("week")
+    week_of_month = ((extract("day", Daily.date) - 1) // 7 + 1).label("week")
 
     query = (
         db.query(
             week_of_month,
-            func.sum(Expense.amount).label("total"),
-        )
-        .filter(
-            extract("year", Expense.date) == year,
-            extract("month", Expense.date) == month,
+            func.sum(Daily.total_amount).label("total"),
         )
+        .filter(*_in_range(*_month_range(year, month)))
         .group_by(week_of_month)
         .order_by(week_of_month)
     )
@@ -120,66 +133,48 @@ def get_half_month_expenses(
     if month is None:
         month = date.today().month
 
-    # First half: days 1-15
-    total1 = (
-        db.query(func.sum(Expense.amount))
-        .filter(
-            extract("year", Expense.date) == year,
-            extract("month", Expense.date) == month,
-            extract("day", Expense.date) <= 15,
-        )
-        .scalar()
-    ) or 0.0
-
-    # Second half: days 16-end
-    total2 = (
-        db.query(func.sum(Expense.amount))
-        .filter(
-            extract("year", Expense.date) == year,
-            extract("month", Expense.date) == month,
-            extract("day", Expense.date) > 15,
+    # First half: days 1-15, second half: days 16-end, in one pass over the month
+    start, end = _month_range(year, month)
+    mid = date(year, month, 16)
+    total1, total2 = (
+        db.query(
+            func.sum(case((Daily.date < mid, Daily.total_amount), else_=0.0)),
+            func.sum(case((Daily.date >= mid, Daily.total_amount), else_=0.0)),
         )
-        .scalar()
-    ) or 0.0
+        .filter(*_in_range(start, end))
+        .one()
+    )
 
     return {
         "year": year,
         "month": month,
-        "first_half_total": round(total1, 2),
-        "second_half_total": round(total2, 2),
+        "first_half_total": round(total1 or 0.0, 2),
+        "second_half_total": round(total2 or 0.0, 2),
     }
 
 
 def get_categorywise_expenses(
     db: Session, year: Optional[int] = None, month: Optional[int] = None
 ) -> dict:
-    from datetime import date
-    from calendar import monthrange
-
     if year is None:
         year = date.today().year
     if month is None:
         month = date.today().month
 
     # Calculate start and end dates for the month
-    start_date = date(year, month, 1)
-    _, last_day = monthrange(year, month)
-    end_date = date(year, month, last_day)
+    start_date, next_month = _month_range(year, month)
+    end_date = next_month - timedelta(days=1)
 
     # Query for category breakdown with transaction counts
     query = (
         db.query(
-            Expense.category.label("category"),
-            func.sum(Expense.amount).label("total_amount"),
-            func.count(Expense.id).label("transaction_count"),
-        )
-        .filter(
-            extract("year", Expense.date) == year,
-            extract("month", Expense.date) == month,
-            Expense.category.isnot(None),  # Exclude NULL categories
+            Daily.category.label("category"),
+            func.sum(Daily.total_amount).label("total_amount"),
+            func.sum(Daily.tx_count).label("transaction_count"),
         )
-        .group_by(Expense.category)
-        .order_by(Expense.category)
+        .filter(*_in_range(start_date, next_month))
+        .group_by(Daily.category)
+        .order_by(Daily.category)
     )
 
     results = query.all()
@@ -202,3 +197,89 @@ def get_categorywise_expenses(
         "end_date": end_date.strftime("%Y-%m-%d"),
         "breakdown": breakdown,
     }
+
+
+def get_dashboard(
+    db: Session, year: Optional[int] = None, month: Optional[int] = None
+) -> tuple[dict, str]:
+    """
+    Every summary tile for (year, month) plus an ETag of the payload.
+
+    Served from ``dashboard_cache`` while fresh; otherwise built from one pass
+    over the year's rollup rows and one all-time sum.
+    """
+    today = date.today()
+    year = year or today.year
+    month = month or today.month
+    return dashboard_cache.get_or_compute((year, month), lambda: _build_dashboard(db, year, month))
+
+
+def _build_dashboard(db: Session, year: int, month: int) -> tuple[dict, str]:
+    all_time = db.query(func.sum(Daily.total_amount)).scalar() or 0.0
+    rows = (
+        db.query(Daily.date, Daily.category, Daily.total_amount, Daily.tx_count)
+        .filter(*_in_range(date(year, 1, 1), date(year + 1, 1, 1)))
+        .all()
+    )
+
+    by_month: dict[int, float] = defaultdict(float)
+    by_week: dict[int, float] = defaultdict(float)
+    by_category: dict[str, list] = {}
+    halves = [0.0, 0.0]
+    for day, category, amount, count in rows:
+        by_month[day.month] += amount
+        if day.month != month:
+            continue
+        by_week[(day.day - 1) // 7 + 1] += amount
+        halves[0 if day.day <= 15 else 1] += amount
+        bucket = by_category.setdefault(category, [0.0, 0])
+        bucket[0] += amount
+        bucket[1] += count
+
+    half = "H1" if month <= 6 else "H2"
+    half_months = range(1, 7) if half == "H1" else range(7, 13)
+    start_date, next_month = _month_range(year, month)
+    payload = {
+        "year": year,
+        "month": month,
+        "total": {"total_expenses_all_time": round(all_time, 2)},
+        "yearly": {"year": year, "total_expenses_this_year": round(sum(by_month.values()), 2)},
+        "monthly": {
+            "year": year,
+            "month": month,
+            "total_expenses_this_month": round(by_month.get(month, 0.0), 2),
+        },
+        "half": {
+            "year": year,
+            "half": half,
+            "total_expenses": round(sum(by_month.get(m, 0.0) for m in half_months), 2),
+        },
+        "half_month": {
+            "year": year,
+            "month": month,
+            "first_half_total": round(halves[0], 2),
+            "second_half_total": round(halves[1], 2),
+        },
+        "monthwise": {
+            "year": year,
+            "monthly_totals": [{"month": m, "total": by_month[m]} for m in sorted(by_month)],
+        },
+        "weekly": {
+            "year": year,
+            "month": month,
+            "weekly_totals": [{"week": w, "total": by_week[w]} for w in sorted(by_week)],
+        },
+        "category": {
+            "currency": "INR",
+            "total_amount": round(sum(v[0] for v in by_category.values()), 2),
+            "total_tx": sum(v[1] for v in by_category.values()),
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": (next_month - timedelta(days=1)).strftime("%Y-%m-%d"),
+            "breakdown": [
+                {"category": c, "amount": by_category[c][0], "tx_count": by_category[c][1]}
+                for c in sorted(by_category)
+            ],
+        },
+    }
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    return payload, f'"{digest}"'
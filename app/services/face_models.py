@@ -0,0 +1,189 @@
+# app/services/face_models.py
+"""
+Shared registry of the OpenCV models used by face verification.
+
+Loading the Caffe face detector or the Haar cascade takes tens to hundreds of
+milliseconds, and ORB/BFMatcher were rebuilt on every comparison. The registry
+loads each model lazily, once per thread (OpenCV's Net and CascadeClassifier
+must not be used concurrently), and reuses it for every later request on that
+thread. ``warm()`` loads everything on the calling thread; the face
+verification pool calls it on each of its workers at startup.
+
+``track()`` times a unit of work and files it as *cold* when a model had to be
+loaded during it, *warm* otherwise, so ``metrics()`` shows what warming saves.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Model files for OpenCV DNN face detection, looked up next to this module
+FACE_DETECTOR_PROTO = "deploy.prototxt"
+FACE_DETECTOR_MODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+
+HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+
+ORB_FEATURES = 500
+
+MODEL_KINDS = ("dnn", "haar", "orb", "matcher")
+
+
+class _Latency:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class FaceModelRegistry:
+    """Lazily loaded, thread-local OpenCV detector/descriptor/matcher instances."""
+
+    def __init__(self, model_dir: Optional[str] = None):
+        self.model_dir = model_dir or os.path.dirname(os.path.abspath(__file__))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dnn_paths: Optional[Tuple[str, str]] = None
+        self._dnn_probed = False
+        self._loads = {kind: 0 for kind in MODEL_KINDS}
+        self._load_ms = {kind: 0.0 for kind in MODEL_KINDS}
+        self._hits = {kind: 0 for kind in MODEL_KINDS}
+        self._latency = {"cold": _Latency(), "warm": _Latency()}
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Models
+    # ──────────────────────────────────────────────────────────────────────────
+
+    @property
+    def dnn_available(self) -> bool:
+        return self._model_paths() is not None
+
+    def dnn(self) -> Optional[Any]:
+        """Caffe SSD face detector for this thread, or None if its files are missing/broken."""
+        paths = self._model_paths()
+        if paths is None:
+            return None
+        return self._get("dnn", lambda: cv2.dnn.readNetFromCaffe(*paths))
+
+    def haar(self) -> Any:
+        """Haar cascade face detector for this thread."""
+        cascade_path = cv2.data.haarcascades + HAAR_CASCADE  # type: ignore[attr-defined]
+        return self._get("haar", lambda: cv2.CascadeClassifier(cascade_path))
+
+    def orb(self) -> Any:
+        """ORB keypoint detector/descriptor for this thread."""
+        return self._get(
+            "orb", lambda: cv2.ORB_create(nfeatures=ORB_FEATURES)  # type: ignore[attr-defined]
+        )
+
+    def matcher(self) -> Any:
+        """Brute-force Hamming matcher (cross-checked) for this thread."""
+        return self._get("matcher", lambda: cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True))
+
+    def warm(self) -> Dict[str, bool]:
+        """Load every model on the calling thread; returns which ones are available."""
+        return {
+            "dnn": self.dnn() is not None,
+            "haar": self.haar() is not None,
+            "orb": self.orb() is not None,
+            "matcher": self.matcher() is not None,
+        }
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Metrics
+    # ──────────────────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def track(self):
+        """Time the block as cold (a model was loaded on this thread) or warm."""
+        loads_before = getattr(self._local, "load_count", 0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            cold = getattr(self._local, "load_count", 0) > loads_before
+            with self._lock:
+                self._latency["cold" if cold else "warm"].add(elapsed_ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "dnn_available": self._dnn_paths is not None if self._dnn_probed else None,
+                "models": {
+                    kind: {
+                        "loads": self._loads[kind],
+                        "hits": self._hits[kind],
+                        "avg_load_ms": (
+                            round(self._load_ms[kind] / self._loads[kind], 2)
+                            if self._loads[kind]
+                            else None
+                        ),
+                    }
+                    for kind in MODEL_KINDS
+                },
+                "latency": {name: stats.to_dict() for name, stats in self._latency.items()},
+            }
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Internals
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _model_paths(self) -> Optional[Tuple[str, str]]:
+        if not self._dnn_probed:
+            prototxt = os.path.join(self.model_dir, FACE_DETECTOR_PROTO)
+            caffemodel = os.path.join(self.model_dir, FACE_DETECTOR_MODEL)
+            found = os.path.exists(prototxt) and os.path.exists(caffemodel)
+            with self._lock:
+                self._dnn_paths = (prototxt, caffemodel) if found else None
+                self._dnn_probed = True
+            if not found:
+                logger.info("Using Haar Cascade fallback for face detection")
+        return self._dnn_paths
+
+    def _get(self, kind: str, load: Callable[[], Any]) -> Any:
+        models = self._local.__dict__.setdefault("models", {})
+        if kind in models:
+            with self._lock:
+                self._hits[kind] += 1
+            return models[kind]
+
+        started = time.perf_counter()
+        try:
+            model = load()
+        except Exception as e:
+            logger.warning(f"Could not load {kind} face model: {e}")
+            model = None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        models[kind] = model
+        self._local.load_count = getattr(self._local, "load_count", 0) + 1
+        with self._lock:
+            self._loads[kind] += 1
+            self._load_ms[kind] += elapsed_ms
+        if kind == "dnn" and model is not None:
+            logger.info("✅ Loaded OpenCV DNN face detector")
+        return model
+
+
+face_models = FaceModelRegistry()
@@ -0,0 +1,293 @@
+# app/services/face_verification_pool.py
+"""
+Bounded worker pool for face verification.
+
+Verification downloads the profile image, decodes, detects and matches faces:
+seconds of blocking I/O and CPU that must not run on the event loop. The async
+check-in/check-out endpoints await ``FaceVerificationPool.verify`` instead.
+
+Two executors are supported (``FACE_VERIFY_EXECUTOR``):
+
+* ``thread`` (default): workers call ``FaceVerificationService.verify_face`` with
+  the request's session. OpenCV releases the GIL in its heavy kernels, so a few
+  threads already keep the loop free. Models are thread-local (see
+  ``face_models``), so workers share one service.
+* ``process``: only the session-free ``verify_reference`` step runs in worker
+  processes; the profile lookup and feature backfill stay in the caller.
+
+Admission is bounded: once ``workers + max_queue`` verifications are in flight,
+``verify`` raises ``FaceVerificationBusy`` and the endpoint answers 503 with
+``Retry-After``. Per-stage timings are aggregated for ``metrics()``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.face_models import face_models
+from app.services.face_verification_service import (
+    VERIFICATION_STAGES,
+    FaceVerificationService,
+    ProfileReference,
+)
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per stage for percentiles
+METRIC_WINDOW = 500
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+class FaceVerificationBusy(Exception):
+    """Raised when the pool already holds its maximum number of verifications."""
+
+    def __init__(self, in_flight: int, retry_after: int):
+        super().__init__(f"{in_flight} face verifications are already in progress")
+        self.retry_after = retry_after
+
+
+# Service used by pool workers of this process (process mode)
+_process_service: Optional[FaceVerificationService] = None
+
+
+def _verify_in_process(
+    reference: ProfileReference, selfie_image_data: bytes
+) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """Process-pool entry point (module level so it can be pickled)."""
+    global _process_service
+    if _process_service is None:
+        _process_service = FaceVerificationService()
+    return _process_service.verify_reference(reference, selfie_image_data)
+
+
+def _warm_models(barrier: Optional[threading.Barrier] = None) -> Dict[str, bool]:
+    """Load the face models on the worker running this."""
+    loaded = face_models.warm()
+    if barrier is not None:
+        # Hold this thread until every worker has picked up a warm-up task
+        barrier.wait(timeout=30)
+    return loaded
+
+
+class _StageStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=METRIC_WINDOW)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples.append(ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class FaceVerificationPool:
+    """Runs face verifications on a bounded executor with admission control."""
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 8,
+        retry_after_seconds: int = 5,
+        service: Optional[FaceVerificationService] = None,
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown face verification executor {mode!r}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._service = service
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._stats: Dict[str, _StageStats] = {
+            name: _StageStats() for name in (*VERIFICATION_STAGES, "queue_wait", "total")
+        }
+
+    @classmethod
+    def from_settings(cls, service: Optional[FaceVerificationService] = None) -> "FaceVerificationPool":
+        return cls(
+            mode=settings.FACE_VERIFY_EXECUTOR,
+            max_workers=settings.FACE_VERIFY_WORKERS,
+            max_queue=settings.FACE_VERIFY_MAX_QUEUE,
+            retry_after_seconds=settings.FACE_VERIFY_RETRY_AFTER_SECONDS,
+            service=service,
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def verify(
+        self, db: Session, employee_id: str, selfie_image_data: bytes, selfie_mime: str
+    ) -> Dict[str, Any]:
+        """
+        Verify a selfie off the event loop; same result as ``verify_face``.
+
+        Raises:
+            FaceVerificationBusy: when ``capacity`` verifications are already in flight
+        """
+        self._admit()
+        submitted = time.perf_counter()
+        try:
+            if self.mode == "process":
+                result = await self._verify_process(db, employee_id, selfie_image_data, submitted)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(),
+                    self._verify_thread,
+                    db,
+                    employee_id,
+                    selfie_image_data,
+                    selfie_mime,
+                    submitted,
+                )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        self._record(result, submitted)
+        return result
+
+    def warm(self) -> None:
+        """Start every worker and load the face models on it (call once at startup)."""
+        executor = self._get_executor()
+        barrier = threading.Barrier(self.max_workers) if self.mode == "thread" else None
+        futures = [executor.submit(_warm_models, barrier) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executor": self.mode,
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "stages": {name: stats.to_dict() for name, stats in self._stats.items()},
+                # Model loads/hits and cold vs warm latency of this process's threads
+                "models": face_models.metrics(),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Internals
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise FaceVerificationBusy(self._in_flight, self.retry_after_seconds)
+            self._in_flight += 1
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="face-verify"
+                    )
+            return self._executor
+
+    def _local_service(self) -> FaceVerificationService:
+        if self._service is None:
+            self._service = FaceVerificationService()
+        return self._service
+
+    def _verify_thread(
+        self,
+        db: Session,
+        employee_id: str,
+        selfie_image_data: bytes,
+        selfie_mime: str,
+        submitted: float,
+    ) -> Dict[str, Any]:
+        self._observe("queue_wait", (time.perf_counter() - submitted) * 1000)
+        return self._local_service().verify_face(
+            db=db,
+            employee_id=employee_id,
+            selfie_image_data=selfie_image_data,
+            selfie_mime=selfie_mime,
+        )
+
+    async def _verify_process(
+        self, db: Session, employee_id: str, selfie_image_data: bytes, submitted: float
+    ) -> Dict[str, Any]:
+        service = self._local_service()
+        profile_row = await run_in_threadpool(service.profile_repo.get_by_employee_id, db, employee_id)
+        if not profile_row or not profile_row.profile_path:
+            return service._no_profile_result()
+        reference = service.profile_reference(profile_row)
+
+        queued = time.perf_counter()
+        future = self._get_executor().submit(_verify_in_process, reference, selfie_image_data)
+        result, backfill = await asyncio.wrap_future(future)
+        # Workers start instantly once free; anything beyond the worker's own stage
+        # timings is time spent waiting for one (plus pickling)
+        worked = sum(result.get("timings", {}).values())
+        self._observe("queue_wait", max(0.0, (time.perf_counter() - queued) * 1000 - worked))
+
+        if backfill is not None:
+            await run_in_threadpool(service.save_backfilled_features, db, reference, backfill)
+        return result
+
+    def _observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            self._stats[name].add(ms)
+
+    def _record(self, result: Dict[str, Any], submitted: float) -> None:
+        total_ms = (time.perf_counter() - submitted) * 1000
+        timings = (result.get("timings") if isinstance(result, dict) else None) or {}
+        with self._lock:
+            self._completed += 1
+            self._stats["total"].add(total_ms)
+            for stage in VERIFICATION_STAGES:
+                if timings.get(stage):
+                    self._stats[stage].add(float(timings[stage]))
@@ -5,19 +5,32 @@ Uses deep learning-based face detection and improved matching algorithm.
 """
 
 from __future__ import annotations
+import io
 import logging
-from typing import Optional, Tuple, Dict, Any
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Dict, Any, List, Sequence
 from datetime import datetime, timezone
-import os
 
 import cv2
 import numpy as np
+from PIL import Image
 from sqlalchemy.orm import Session
 
 from app.core.supabase_client import get_supabase
-from app.data.repositories.employee_profile_repository import EmployeeProfileRepo
+from app.data.repositories.employee_profile_repository import (
+    EmployeeProfileRepo,
+    profile_features_key,
+)
 from app.data.models.attendance_evidence import AttendanceEvidence, EvidenceType
 from app.data.repositories.attendance_repository import AttendanceRepository
+from app.services.face_models import (  # noqa: F401  (model file names re-exported)
+    FACE_DETECTOR_MODEL,
+    FACE_DETECTOR_PROTO,
+    FaceModelRegistry,
+    face_models,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,10 +42,205 @@ FACE_SIMILARITY_THRESHOLD = 0.50
 # Alias for backwards compatibility
 SIMILARITY_THRESHOLD = 0.35
 
-# Model paths for OpenCV DNN face detection
-# Using OpenCV's pre-trained face detection model
-FACE_DETECTOR_PROTO = "deploy.prototxt"
-FACE_DETECTOR_MODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+
+# Size every face crop is normalised to before comparison
+FACE_SIZE = (128, 128)
+
+# Longest side of the frame faces are detected on; larger images are decoded at
+# 1/2, 1/4 or 1/8 scale (libjpeg DCT scaling) and/or resized down to it
+DETECT_MAX_SIDE = 640
+
+_REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def _image_size(image_data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from the image header, without decoding pixels."""
+    try:
+        with Image.open(io.BytesIO(image_data)) as header:
+            return header.size
+    except Exception:
+        return None
+
+
+def _reduction_for(size: Optional[Tuple[int, int]]) -> int:
+    """Largest decode reduction (1/2/4/8) that keeps the longest side >= DETECT_MAX_SIDE."""
+    if size is None:
+        return 1
+    longest = max(size)
+    factor = 1
+    while factor < 8 and longest / (factor * 2) >= DETECT_MAX_SIDE:
+        factor *= 2
+    return factor
+
+
+def _decode(image_data: bytes, factor: int) -> Optional[np.ndarray]:
+    return cv2.imdecode(np.frombuffer(image_data, np.uint8), _REDUCED_DECODE_FLAGS[factor])
+
+
+def _oriented_size(
+    size: Optional[Tuple[int, int]], decoded_shape: Tuple[int, ...]
+) -> Optional[Tuple[int, int]]:
+    """Header (width, height) swapped if decoding applied a 90-degree EXIF rotation."""
+    if size is None:
+        return None
+    width, height = size
+    decoded_h, decoded_w = decoded_shape[:2]
+    if (width > height) != (decoded_w > decoded_h):
+        return height, width
+    return width, height
+
+
+# Stages reported in a verification result's ``timings`` (milliseconds)
+VERIFICATION_STAGES = ("download", "decode", "detect", "match")
+
+
+@contextmanager
+def _timed(timings: Optional[Dict[str, float]], stage: str):
+    """Add the wall time of the block to ``timings[stage]`` (ms), if collecting."""
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started) * 1000
+
+
+def _rounded(timings: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(ms, 2) for stage, ms in timings.items()}
+
+
+@dataclass(frozen=True)
+class ProfileReference:
+    """Session-free (picklable) view of an employee's profile image for verification."""
+
+    employee_id: str
+    bucket: str
+    path: str
+    features: Optional[bytes]  # stored features, only if computed from the current image
+
+
+def _unit_centered(values: np.ndarray) -> np.ndarray:
+    """Flatten to float32 once, subtract the mean and scale to unit L2 norm in place."""
+    vector = values.astype(np.float32).ravel()
+    vector -= vector.mean()
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+@dataclass
+class FaceFeatures:
+    """
+    Comparison features of one normalised (128x128) face crop.
+
+    Profile features are computed once at enrollment and persisted with
+    ``to_bytes``; only the selfie has to be decoded, detected and described at
+    check-in. The normalised vectors are pure functions of the crop, so they are
+    rebuilt on load instead of being stored (keeps the blob around 30 KB).
+
+    With zero-mean, unit-norm vectors both correlation scores reduce to a dot
+    product, which is what lets ``FaceGallery`` score one selfie against N
+    enrolled faces with a single matrix-vector product.
+    """
+
+    gray: np.ndarray  # uint8 (128, 128) grayscale crop
+    hist: np.ndarray  # float32 (256, 1) grayscale histogram
+    keypoint_count: int
+    descriptors: Optional[np.ndarray]  # uint8 (n, 32) ORB descriptors, None if no keypoints
+    vector: np.ndarray = field(init=False, repr=False)  # float32 zero-mean, unit-norm pixels
+    hist_vector: np.ndarray = field(init=False, repr=False)  # same for the histogram
+
+    def __post_init__(self) -> None:
+        self.vector = _unit_centered(self.gray)
+        self.hist_vector = _unit_centered(self.hist)
+
+    @classmethod
+    def from_face(
+        cls, face_img: np.ndarray, models: Optional[FaceModelRegistry] = None
+    ) -> "FaceFeatures":
+        """Describe a face crop already resized to FACE_SIZE (BGR or grayscale)."""
+        gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY) if len(face_img.shape) == 3 else face_img
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+        keypoints, descriptors = (models or face_models).orb().detectAndCompute(gray, None)
+        return cls(
+            gray=np.ascontiguousarray(gray, dtype=np.uint8),
+            hist=hist.astype(np.float32),
+            keypoint_count=len(keypoints),
+            descriptors=descriptors,
+        )
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            gray=self.gray,
+            hist=self.hist,
+            keypoint_count=np.array(self.keypoint_count),
+            descriptors=(
+                self.descriptors
+                if self.descriptors is not None
+                else np.empty((0, 32), dtype=np.uint8)
+            ),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "FaceFeatures":
+        with np.load(io.BytesIO(blob)) as data:
+            descriptors = data["descriptors"]
+            return cls(
+                gray=data["gray"],
+                hist=data["hist"],
+                keypoint_count=int(data["keypoint_count"]),
+                descriptors=descriptors if len(descriptors) else None,
+            )
+
+
+class FaceGallery:
+    """
+    Stacked features of N enrolled faces for one-to-many ("who is this?") scoring.
+
+    The histogram and pixel correlations of a selfie against every entry are two
+    float32 matrix-vector products; ORB matching, which cannot be batched, is only
+    run for the best ``top_k`` candidates by those dense scores.
+    """
+
+    def __init__(self, employee_ids: Sequence[str], features: Sequence[FaceFeatures]):
+        if len(employee_ids) != len(features):
+            raise ValueError("employee_ids and features must have the same length")
+        self.employee_ids = list(employee_ids)
+        self.features = list(features)
+        dims = (len(features), FACE_SIZE[0] * FACE_SIZE[1])
+        self.vectors = (
+            np.stack([f.vector for f in features]) if features else np.empty(dims, np.float32)
+        )
+        self.hist_vectors = (
+            np.stack([f.hist_vector for f in features])
+            if features
+            else np.empty((0, 256), np.float32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.employee_ids)
+
+    def dense_scores(self, selfie: FaceFeatures) -> np.ndarray:
+        """Histogram + normalised-correlation part of the similarity, for every entry."""
+        hist_corr = self.hist_vectors @ selfie.hist_vector
+        norm_corr = self.vectors @ selfie.vector
+        return _dense_similarity(hist_corr, norm_corr)
+
+
+def _dense_similarity(hist_corr, norm_corr):
+    """Weighted histogram (35%) and normalised correlation (35%) terms; scalar or array."""
+    return 0.35 * np.maximum(0, hist_corr) + 0.35 * np.maximum(0, (norm_corr + 1) / 2)
 
 
 class FaceVerificationService:
@@ -41,41 +249,16 @@ class FaceVerificationService:
     Uses OpenCV DNN for deep learning-based face detection and improved feature matching.
     """
 
-    def __init__(self):
+    def __init__(self, models: Optional[FaceModelRegistry] = None):
         self.profile_repo = EmployeeProfileRepo()
         self.attendance_repo = AttendanceRepository()
 
-        # Try to load OpenCV DNN face detector
-        self.face_net = None
-        self.face_detector_loaded = False
+        # Detectors, ORB and the matcher are shared, lazily loaded and thread-local
+        self.models = models or face_models
 
-        # Try loading the DNN face detector
-        # First check if model files exist locally
-        model_paths = self._get_model_paths()
-        if model_paths and all(os.path.exists(p) for p in model_paths):
-            try:
-                self.face_net = cv2.dnn.readNetFromCaffe(model_paths[0], model_paths[1])
-                self.face_detector_loaded = True
-                logger.info("✅ Loaded OpenCV DNN face detector")
-            except Exception as e:
-                logger.warning(f"Could not load DNN face detector: {e}")
-
-        # Fallback to Haar Cascade
-        if not self.face_detector_loaded:
-            cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-            self.face_cascade = cv2.CascadeClassifier(cascade_path)
-            logger.info("Using Haar Cascade fallback for face detection")
-
-    def _get_model_paths(self) -> Optional[Tuple[str, str]]:
-        """Get paths to face detection model files."""
-        # Check in current directory
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        prototxt = os.path.join(base_dir, FACE_DETECTOR_PROTO)
-        caffemodel = os.path.join(base_dir, FACE_DETECTOR_MODEL)
-
-        if os.path.exists(prototxt) and os.path.exists(caffemodel):
-            return (prototxt, caffemodel)
-        return None
+    @property
+    def face_detector_loaded(self) -> bool:
+        return self.models.dnn_available
 
     def verify_face(
         self,
@@ -107,44 +290,99 @@ class FaceVerificationService:
         try:
             logger.info(f"🔍 Starting face verification for {employee_id}")
 
-            # 1) Load employee's profile image from storage
+            # 1) Load employee's profile row
             profile_row = self.profile_repo.get_by_employee_id(db, employee_id)
             if not profile_row or not profile_row.profile_path:
-                debug_note = "Employee has not enrolled profile image"
-                logger.warning(f"❌ {debug_note}")
-                return {
-                    "verified": False,
-                    "confidence_score": 0.0,
-                    "message": "No profile image found",
-                    "profile_path": None,
-                    "error": "Employee has not enrolled profile image",
-                    "debug_note": debug_note,
-                }
+                return self._no_profile_result()
 
             logger.info(f"Found profile image: {profile_row.profile_path}")
 
-            # 2) Download profile image from Supabase
-            try:
-                profile_image_data = self._download_image_from_storage(
-                    profile_row.profile_bucket, profile_row.profile_path
-                )
-                logger.info(f"Downloaded profile image: {len(profile_image_data)} bytes")
-            except Exception as e:
-                debug_note = f"Failed to download profile image: {str(e)}"
-                logger.error(f"❌ {debug_note}")
-                return {
-                    "verified": False,
-                    "confidence_score": 0.0,
-                    "message": "Failed to retrieve profile image",
-                    "profile_path": None,
-                    "error": str(e),
-                    "debug_note": debug_note,
-                }
+            # 2-3) Download/extract profile features if needed, then match the selfie
+            result, backfill = self.verify_reference(
+                self.profile_reference(profile_row), selfie_image_data
+            )
+            if backfill is not None:
+                # Backfill so later verifications skip the download
+                self.profile_repo.save_face_features(db, profile_row, backfill)
+            return result
+
+        except Exception as e:
+            logger.exception(f"❌ Face verification error for {employee_id}: {str(e)}")
+            return self._error_result(e)
+
+    def profile_reference(self, profile_row) -> ProfileReference:
+        """Capture what verification needs from a profile row, detached from the session."""
+        return ProfileReference(
+            employee_id=profile_row.employee_id,
+            bucket=profile_row.profile_bucket,
+            path=profile_row.profile_path,
+            features=self._stored_profile_blob(profile_row),
+        )
+
+    def verify_reference(
+        self, reference: ProfileReference, selfie_image_data: bytes
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        Verify a selfie against a profile reference without touching the database.
+
+        This is the CPU/network-bound part of ``verify_face`` and is what the
+        verification pool runs on its workers.
+
+        Returns:
+            (result dict as described in ``verify_face`` plus per-stage ``timings``,
+             freshly extracted profile features to persist, or None)
+        """
+        with self.models.track():
+            return self._verify_reference(reference, selfie_image_data)
+
+    def _verify_reference(
+        self, reference: ProfileReference, selfie_image_data: bytes
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        timings = {stage: 0.0 for stage in VERIFICATION_STAGES}
+        backfill: Optional[bytes] = None
+        try:
+            # 2) Profile features: stored at enrollment, else download + extract once
+            profile_features = None
+            if reference.features is not None:
+                try:
+                    profile_features = FaceFeatures.from_bytes(reference.features)
+                    logger.info("Using stored profile face features")
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable stored face features: {e}")
+
+            if profile_features is None:
+                try:
+                    with _timed(timings, "download"):
+                        profile_image_data = self._download_image_from_storage(
+                            reference.bucket, reference.path
+                        )
+                    logger.info(f"Downloaded profile image: {len(profile_image_data)} bytes")
+                except Exception as e:
+                    debug_note = f"Failed to download profile image: {str(e)}"
+                    logger.error(f"❌ {debug_note}")
+                    return {
+                        "verified": False,
+                        "confidence_score": 0.0,
+                        "message": "Failed to retrieve profile image",
+                        "profile_path": None,
+                        "error": str(e),
+                        "debug_note": debug_note,
+                        "timings": _rounded(timings),
+                    }, None
+                profile_features = self.extract_face_features(profile_image_data, timings)
+                if profile_features is not None:
+                    backfill = profile_features.to_bytes()
+                else:
+                    logger.warning("❌ No face detected in profile image")
 
             logger.info(f"Selfie image: {len(selfie_image_data)} bytes")
 
-            # 3) Perform face verification using improved algorithm
-            is_match, similarity_score = self._compare_faces(profile_image_data, selfie_image_data)
+            # 3) Only the selfie is decoded, detected and described here
+            is_match, similarity_score = False, 0.0
+            if profile_features is not None:
+                is_match, similarity_score = self._match_selfie(
+                    profile_features, selfie_image_data, timings
+                )
 
             # Confidence score is the similarity score
             confidence_score = similarity_score
@@ -164,28 +402,54 @@ class FaceVerificationService:
                 "confidence_score": float(confidence_score),
                 "distance": float(1.0 - confidence_score),
                 "message": "Face verified successfully" if is_match else "Face verification failed",
-                "profile_path": profile_row.profile_path,
+                "profile_path": reference.path,
                 "error": None,
                 "debug_note": debug_note,
+                "timings": _rounded(timings),
             }
 
             logger.info(
-                f"✅ Verification result for {employee_id}: verified={result['verified']}, "
+                f"✅ Verification result for {reference.employee_id}: verified={result['verified']}, "
                 f"score={confidence_score:.4f}, note={debug_note}"
             )
 
-            return result
+            return result, backfill
 
         except Exception as e:
-            logger.exception(f"❌ Face verification error for {employee_id}: {str(e)}")
-            return {
-                "verified": False,
-                "confidence_score": 0.0,
-                "message": "Face verification error",
-                "profile_path": None,
-                "error": str(e),
-                "debug_note": f"Verification error: {str(e)}",
-            }
+            logger.exception(f"❌ Face verification error for {reference.employee_id}: {str(e)}")
+            return self._error_result(e), None
+
+    def save_backfilled_features(
+        self, db: Session, reference: ProfileReference, face_features: bytes
+    ) -> None:
+        """Persist features extracted during verification if the profile image is unchanged."""
+        profile_row = self.profile_repo.get_by_employee_id(db, reference.employee_id)
+        if profile_row is not None and profile_row.profile_path == reference.path:
+            self.profile_repo.save_face_features(db, profile_row, face_features)
+
+    @staticmethod
+    def _no_profile_result() -> Dict[str, Any]:
+        debug_note = "Employee has not enrolled profile image"
+        logger.warning(f"❌ {debug_note}")
+        return {
+            "verified": False,
+            "confidence_score": 0.0,
+            "message": "No profile image found",
+            "profile_path": None,
+            "error": "Employee has not enrolled profile image",
+            "debug_note": debug_note,
+        }
+
+    @staticmethod
+    def _error_result(e: Exception) -> Dict[str, Any]:
+        return {
+            "verified": False,
+            "confidence_score": 0.0,
+            "message": "Face verification error",
+            "profile_path": None,
+            "error": str(e),
+            "debug_note": f"Verification error: {str(e)}",
+        }
 
     def _download_image_from_storage(self, bucket: str, path: str) -> bytes:
         """Download image from Supabase storage."""
@@ -197,7 +461,8 @@ class FaceVerificationService:
 
     def _detect_faces_dnn(self, img: np.ndarray) -> list:
         """Detect faces using OpenCV DNN with pre-trained model."""
-        if self.face_net is None:
+        face_net = self.models.dnn()
+        if face_net is None:
             return []
 
         h, w = img.shape[:2]
@@ -207,8 +472,8 @@ class FaceVerificationService:
             cv2.resize(img, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0)
         )
 
-        self.face_net.setInput(blob)
-        detections = self.face_net.forward()
+        face_net.setInput(blob)
+        detections = face_net.forward()
 
         faces = []
         for i in range(detections.shape[2]):
@@ -229,7 +494,7 @@ class FaceVerificationService:
             gray = img
 
         # Detect faces with multiple parameters for better detection
-        faces = self.face_cascade.detectMultiScale(
+        faces = self.models.haar().detectMultiScale(
             gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30), flags=cv2.CASCADE_SCALE_IMAGE
         )
 
@@ -238,7 +503,7 @@ class FaceVerificationService:
     def _detect_faces(self, img: np.ndarray) -> list:
         """Detect faces using best available method."""
         # Try DNN first
-        if self.face_detector_loaded and self.face_net is not None:
+        if self.face_detector_loaded:
             faces = self._detect_faces_dnn(img)
             if len(faces) > 0:
                 logger.info(f"DNN detected {len(faces)} faces")
@@ -249,6 +514,100 @@ class FaceVerificationService:
         logger.info(f"Haar cascade detected {len(faces)} faces")
         return faces
 
+    def _stored_profile_blob(self, profile_row) -> Optional[bytes]:
+        """Return persisted features if they were computed from the current profile image."""
+        blob = getattr(profile_row, "face_features", None)
+        if not isinstance(blob, (bytes, bytearray, memoryview)) or not blob:
+            return None
+        expected_key = profile_features_key(
+            profile_row.profile_path, profile_row.profile_updated_at
+        )
+        if profile_row.face_features_key != expected_key:
+            return None
+        return bytes(blob)
+
+    def extract_face_features(
+        self, image_data: bytes, timings: Optional[Dict[str, float]] = None
+    ) -> Optional[FaceFeatures]:
+        """
+        Decode an image, detect the largest face and describe its normalised crop.
+
+        Returns None when the image cannot be decoded or contains no face. Time
+        spent decoding, detecting and describing is added to ``timings``.
+        """
+        with _timed(timings, "decode"):
+            full_size = _image_size(image_data)
+            factor = _reduction_for(full_size)
+            img = _decode(image_data, factor)
+        if img is None:
+            logger.error("Failed to decode image data - corrupted or invalid format")
+            return None
+
+        # Detect on a bounded frame; box coordinates are mapped back afterwards
+        with _timed(timings, "detect"):
+            frame = img
+            longest = max(img.shape[:2])
+            if longest > DETECT_MAX_SIDE:
+                ratio = DETECT_MAX_SIDE / longest
+                frame = cv2.resize(img, None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+            faces = self._detect_faces(frame)
+        if len(faces) == 0:
+            return None
+
+        # Get the largest face (most likely the main face), in full-resolution pixels
+        frame_h, frame_w = frame.shape[:2]
+        full_w, full_h = _oriented_size(full_size, frame.shape) or (img.shape[1], img.shape[0])
+        sx, sy = full_w / frame_w, full_h / frame_h
+        fx, fy, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+        x, y, w, h = int(fx * sx), int(fy * sy), int(fw * sx), int(fh * sy)
+        logger.info(f"Face region: {w}x{h}")
+
+        # Crop from the lowest-resolution decode in which the face still spans FACE_SIZE
+        crop_factor = factor
+        while crop_factor > 1 and min(w, h) / crop_factor < FACE_SIZE[0]:
+            crop_factor //= 2
+        if crop_factor != factor:
+            with _timed(timings, "decode"):
+                img = _decode(image_data, crop_factor)
+            if img is None:
+                return None
+        img_h, img_w = img.shape[:2]
+        cx, cy = img_w / full_w, img_h / full_h
+        x0, y0 = max(int(x * cx), 0), max(int(y * cy), 0)
+        region = img[y0 : int((y + h) * cy), x0 : int((x + w) * cx)]
+        if region.size == 0:
+            return None
+
+        with _timed(timings, "match"):
+            return FaceFeatures.from_face(cv2.resize(region, FACE_SIZE), self.models)
+
+    def _match_selfie(
+        self,
+        profile_features: FaceFeatures,
+        selfie_image: bytes,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> Tuple[bool, float]:
+        """Compare a selfie against already-computed profile features."""
+        try:
+            selfie_features = self.extract_face_features(selfie_image, timings)
+            if selfie_features is None:
+                logger.warning("❌ No face detected in selfie image")
+                return False, 0.0
+
+            with _timed(timings, "match"):
+                similarity = self._score_features(profile_features, selfie_features)
+            is_match = similarity >= FACE_SIMILARITY_THRESHOLD
+
+            logger.info(
+                f"Similarity score: {similarity:.4f} (threshold: {FACE_SIMILARITY_THRESHOLD})"
+            )
+
+            return is_match, min(1.0, similarity)
+
+        except Exception as e:
+            logger.error(f"❌ Face comparison error: {str(e)}")
+            return False, 0.0
+
     def _compare_faces(self, profile_image: bytes, selfie_image: bytes) -> Tuple[bool, float]:
         """
         Compare two face images using improved algorithm.
@@ -266,65 +625,17 @@ class FaceVerificationService:
             (is_match: bool, similarity_score: float 0.0-1.0)
         """
         try:
-            # Convert bytes to numpy arrays
-            nparr_profile = np.frombuffer(profile_image, np.uint8)
-            img_profile = cv2.imdecode(nparr_profile, cv2.IMREAD_COLOR)
-
-            nparr_selfie = np.frombuffer(selfie_image, np.uint8)
-            img_selfie = cv2.imdecode(nparr_selfie, cv2.IMREAD_COLOR)
-
-            if img_profile is None or img_selfie is None:
-                logger.error("Failed to decode image data - corrupted or invalid format")
-                return False, 0.0
-
-            # Detect faces using best available method
-            profile_faces = self._detect_faces(img_profile)
-            selfie_faces = self._detect_faces(img_selfie)
-
-            logger.info(f"Profile image: {len(profile_faces)} faces detected")
-            logger.info(f"Selfie image: {len(selfie_faces)} faces detected")
-
-            if len(profile_faces) == 0:
-                logger.warning("❌ No face detected in profile image")
-                return False, 0.0
-
-            if len(selfie_faces) == 0:
-                logger.warning("❌ No face detected in selfie image")
-                return False, 0.0
-
-            # Get the largest face (most likely the main face)
-            profile_face = max(profile_faces, key=lambda f: f[2] * f[3])
-            selfie_face = max(selfie_faces, key=lambda f: f[2] * f[3])
-
-            # Extract face regions
-            x1, y1, w1, h1 = profile_face
-            profile_face_region = img_profile[y1 : y1 + h1, x1 : x1 + w1]
-
-            x2, y2, w2, h2 = selfie_face
-            selfie_face_region = img_selfie[y2 : y2 + h2, x2 : x2 + w2]
-
-            logger.info(f"Profile face region: {w1}x{h1}, Selfie face region: {w2}x{h2}")
-
-            # Resize to same size for comparison
-            size = (128, 128)
-            profile_resized = cv2.resize(profile_face_region, size)
-            selfie_resized = cv2.resize(selfie_face_region, size)
-
-            # Calculate similarity using multiple methods
-            similarity = self._calculate_similarity(profile_resized, selfie_resized)
-
-            is_match = similarity >= FACE_SIMILARITY_THRESHOLD
-
-            logger.info(
-                f"Similarity score: {similarity:.4f} (threshold: {FACE_SIMILARITY_THRESHOLD})"
-            )
-
-            return is_match, min(1.0, similarity)
-
+            profile_features = self.extract_face_features(profile_image)
         except Exception as e:
             logger.error(f"❌ Face comparison error: {str(e)}")
             return False, 0.0
 
+        if profile_features is None:
+            logger.warning("❌ No face detected in profile image")
+            return False, 0.0
+
+        return self._match_selfie(profile_features, selfie_image)
+
     def _calculate_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
         """
         Calculate similarity between two face images using multiple methods.
@@ -334,52 +645,24 @@ class FaceVerificationService:
         2. Structural similarity (SSIM-like)
         3. ORB feature matching
         """
-        # Convert to grayscale for some comparisons
-        gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY) if len(img1.shape) == 3 else img1
-        gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY) if len(img2.shape) == 3 else img2
+        return self._score_features(
+            FaceFeatures.from_face(img1, self.models), FaceFeatures.from_face(img2, self.models)
+        )
 
+    def _score_features(self, first: FaceFeatures, second: FaceFeatures) -> float:
+        """Combine histogram, normalised correlation and ORB scores of two described faces."""
         # Method 1: Histogram correlation (0-1, higher is better)
-        hist1 = cv2.calcHist([gray1], [0], None, [256], [0, 256])
-        hist2 = cv2.calcHist([gray2], [0], None, [256], [0, 256])
-        hist_corr = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
+        hist_corr = float(np.dot(first.hist_vector, second.hist_vector))
 
         # Method 2: Template matching / normalized correlation
-        norm_corr = np.sum(
-            (gray1.astype(float) - gray1.mean()) * (gray2.astype(float) - gray2.mean())
-        ) / (
-            np.sqrt(
-                np.sum((gray1.astype(float) - gray1.mean()) ** 2)
-                * np.sum((gray2.astype(float) - gray2.mean()) ** 2)
-            )
-            + 1e-10
-        )
+        norm_corr = float(np.dot(first.vector, second.vector))
 
         # Method 3: ORB feature matching (robust to rotations/scale)
-        orb = cv2.ORB_create(nfeatures=500)  # type: ignore[attr-defined]
-        kp1, des1 = orb.detectAndCompute(gray1, None)
-        kp2, des2 = orb.detectAndCompute(gray2, None)
-
-        feature_sim = 0.0
-        if des1 is not None and des2 is not None and len(des1) > 0 and len(des2) > 0:
-            # Use BFMatcher with Hamming distance (good for binary descriptors)
-            bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-            matches = bf.match(des1, des2)
-
-            if len(matches) > 0:
-                # Good matches ratio
-                feature_sim = len(matches) / max(len(kp1), len(kp2))
-                # Scale to 0-1
-                feature_sim = min(
-                    1.0, feature_sim * 2
-                )  # Boost since ORB typically has lower ratios
+        feature_sim = self._feature_similarity(first, second)
 
         # Combine scores with weights
         # Histogram and normalized correlation are more reliable for faces
-        combined_similarity = (
-            0.35 * max(0, hist_corr)  # Histogram: 35%
-            + 0.35 * max(0, (norm_corr + 1) / 2)  # Normalized correlation: 35%
-            + 0.30 * feature_sim  # ORB features: 30%
-        )
+        combined_similarity = float(_dense_similarity(hist_corr, norm_corr)) + 0.30 * feature_sim
 
         logger.info(
             f"Similarity breakdown: hist={hist_corr:.4f}, norm_corr={norm_corr:.4f}, features={feature_sim:.4f}"
@@ -387,6 +670,72 @@ class FaceVerificationService:
 
         return combined_similarity
 
+    def _feature_similarity(self, first: FaceFeatures, second: FaceFeatures) -> float:
+        """ORB match ratio of two faces, boosted and capped to 0-1."""
+        des1, des2 = first.descriptors, second.descriptors
+        if des1 is None or des2 is None or len(des1) == 0 or len(des2) == 0:
+            return 0.0
+
+        # BFMatcher with Hamming distance (good for binary descriptors)
+        matches = self.models.matcher().match(des1, des2)
+        if len(matches) == 0:
+            return 0.0
+
+        # Good matches ratio, boosted since ORB typically has lower ratios
+        ratio = len(matches) / max(first.keypoint_count, second.keypoint_count)
+        return min(1.0, ratio * 2)
+
+    def identify(
+        self, selfie_image_data: bytes, gallery: FaceGallery, top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank the enrolled faces in ``gallery`` by similarity to a selfie.
+
+        Returns up to ``top_k`` candidates, best first, as
+        ``{"employee_id", "confidence_score", "verified"}``; empty when no face
+        is found in the selfie or the gallery is empty.
+        """
+        selfie = self.extract_face_features(selfie_image_data)
+        if selfie is None or len(gallery) == 0:
+            return []
+
+        dense = gallery.dense_scores(selfie)
+        k = min(top_k, len(gallery))
+        shortlist = np.argpartition(-dense, k - 1)[:k]
+
+        ranked = []
+        for index in shortlist:
+            score = min(
+                1.0,
+                float(dense[index])
+                + 0.30 * self._feature_similarity(selfie, gallery.features[index]),
+            )
+            ranked.append(
+                {
+                    "employee_id": gallery.employee_ids[index],
+                    "confidence_score": score,
+                    "verified": score >= FACE_SIMILARITY_THRESHOLD,
+                }
+            )
+        ranked.sort(key=lambda c: c["confidence_score"], reverse=True)
+        return ranked
+
+    def load_gallery(self, db: Session, employee_ids: Optional[Sequence[str]] = None) -> FaceGallery:
+        """Build a gallery from the stored (still current) features of enrolled profiles."""
+        ids: List[str] = []
+        features: List[FaceFeatures] = []
+        for row in self.profile_repo.list_with_face_features(db, employee_ids):
+            blob = self._stored_profile_blob(row)
+            if blob is None:
+                continue
+            try:
+                features.append(FaceFeatures.from_bytes(blob))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable face features of {row.employee_id}: {e}")
+                continue
+            ids.append(str(row.employee_id))
+        return FaceGallery(ids, features)
+
     def save_evidence(
         self,
         db: Session,
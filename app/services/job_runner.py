@@ -0,0 +1,239 @@
+# app/services/job_runner.py
+"""
+In-process background jobs for long-running month-end operations.
+
+Work is executed on a bounded thread pool. Each job gets its own DB session
+(never the request's), reports progress through a ``JobContext`` and commits in
+chunks, so a failure only loses the chunk in flight. Job state lives in memory
+and is served by ``GET /jobs/{id}``; it does not survive a restart. Jobs still
+queued at shutdown are marked cancelled; running ones finish their chunk loop.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.data.db import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+# Errors kept per job; the counters stay exact beyond this.
+MAX_RECORDED_ERRORS = 500
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobQueueFull(Exception):
+    """Raised when the runner already holds its maximum number of unfinished jobs."""
+
+
+class Job:
+    """State and progress of a single background job."""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = JobStatus.QUEUED
+        self.total: Optional[int] = None
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._started_monotonic: Optional[float] = None
+        self._finished_monotonic: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = 0.0
+            if self._started_monotonic is not None:
+                end = self._finished_monotonic or time.monotonic()
+                elapsed = end - self._started_monotonic
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status.value,
+                "progress": {
+                    "total": self.total,
+                    "processed": self.processed,
+                    "succeeded": self.succeeded,
+                    "failed": self.failed,
+                    "percent": (
+                        round(self.processed * 100 / self.total, 1) if self.total else None
+                    ),
+                },
+                "elapsed_seconds": round(elapsed, 3),
+                "throughput_per_second": round(self.processed / elapsed, 2) if elapsed else None,
+                "errors": list(self.errors),
+                "error": self.error,
+                "result": dict(self.result),
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
+
+
+class JobContext:
+    """Handle given to job functions to report progress on their Job."""
+
+    def __init__(self, job: Job, chunk_size: int):
+        self.job = job
+        self.chunk_size = chunk_size
+
+    def set_total(self, total: int) -> None:
+        with self.job._lock:
+            self.job.total = total
+
+    def record_success(self, count: int = 1) -> None:
+        with self.job._lock:
+            self.job.processed += count
+            self.job.succeeded += count
+
+    def record_error(self, employee_id: Any, error: str) -> None:
+        with self.job._lock:
+            self.job.processed += 1
+            self.job.failed += 1
+            if len(self.job.errors) < MAX_RECORDED_ERRORS:
+                self.job.errors.append({"employee_id": employee_id, "error": error})
+
+    def set_result(self, **values: Any) -> None:
+        with self.job._lock:
+            self.job.result.update(values)
+
+    def chunks(self, items: List[Any]):
+        """Yield ``items`` in slices of ``chunk_size`` (one commit per slice)."""
+        for start in range(0, len(items), self.chunk_size):
+            yield items[start : start + self.chunk_size]
+
+
+JobFunction = Callable[..., None]  # fn(db: Session, ctx: JobContext, **params)
+
+
+class JobRunner:
+    """Bounded worker pool plus an in-memory registry of recent jobs."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        chunk_size: int,
+        session_factory: sessionmaker = SessionLocal,
+        history: int = 200,
+    ):
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+        self.history = history
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: JobFunction, **params: Any) -> Job:
+        """Queue ``fn(db, ctx, **params)`` as a new job; raises JobQueueFull when saturated."""
+        job = Job(kind, {k: _jsonable(v) for k, v in params.items()})
+        with self._lock:
+            unfinished = sum(1 for j in self._jobs.values() if not j.finished)
+            if unfinished >= self.max_pending:
+                raise JobQueueFull(f"{unfinished} jobs are already queued or running")
+            self._jobs[job.id] = job
+            self._trim()
+            if self._executor is None:  # first job, or first since shutdown()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="job"
+                )
+            self._executor.submit(self._run, job, fn, params)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel queued jobs and stop the workers; a later submit starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            jobs = list(self._jobs.values())
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        for job in jobs:
+            with job._lock:
+                if job.status is JobStatus.QUEUED:
+                    job.status = JobStatus.CANCELLED
+                    job.error = "Cancelled: the server shut down before the job started"
+                    job.finished_at = datetime.now(timezone.utc)
+
+    def _run(self, job: Job, fn: JobFunction, params: Dict[str, Any]) -> None:
+        with job._lock:
+            if job.status is JobStatus.CANCELLED:
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now(timezone.utc)
+            job._started_monotonic = time.monotonic()
+
+        db = self.session_factory()
+        try:
+            fn(db, JobContext(job, self.chunk_size), **params)
+            status, error = JobStatus.SUCCEEDED, None
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            db.rollback()
+            status, error = JobStatus.FAILED, str(e)
+        finally:
+            db.close()
+
+        with job._lock:
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.now(timezone.utc)
+            job._finished_monotonic = time.monotonic()
+
+    def _trim(self) -> None:
+        # Forget the oldest finished jobs beyond the history limit
+        excess = len(self._jobs) - self.history
+        for job_id in [j.id for j in self._jobs.values() if j.finished][: max(excess, 0)]:
+            del self._jobs[job_id]
+
+
+def _jsonable(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+# SQLite allows a single writer, so jobs are serialised on the local fallback.
+job_runner = JobRunner(
+    max_workers=1 if engine.dialect.name == "sqlite" else settings.JOB_MAX_WORKERS,
+    max_pending=settings.JOB_MAX_PENDING,
+    chunk_size=settings.JOB_CHUNK_SIZE,
+)
@@ -4,10 +4,15 @@ from datetime import datetime
 from typing import Optional, List
 
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.data.repositories.leave_employee_repository import LeaveMeRepository
+from app.data.repositories.leave_employee_repository import (
+    AsyncLeaveMeRepository,
+    LeaveMeRepository,
+)
 from app.data.models.leave import LeaveReqUnit, LeaveStatus
+from app.data.employee_identity import employee_identity
 from app.schemas.leave_employee_schema import (
     LeaveTypeOut,
     LeaveBalanceOut,
@@ -20,6 +25,29 @@ from app.schemas.leave_employee_schema import (
 )
 
 
+def _calendar_out(holidays, leaves) -> CalendarOut:
+    h_out = [
+        CalendarHolidayOut(date=h.holiday_date, name=h.name, is_paid=bool(h.is_paid))
+        for h in holidays
+    ]
+    l_out = [
+        CalendarLeaveOut(
+            id=r.id,
+            leave_type_code=lt.code,
+            start=r.start_datetime,
+            end=r.end_datetime,
+            requested_unit=(
+                r.requested_unit.value
+                if hasattr(r.requested_unit, "value")
+                else str(r.requested_unit)
+            ),
+            approved=(r.status == LeaveStatus.APPROVED),
+        )
+        for r, lt in leaves
+    ]
+    return CalendarOut(holidays=h_out, leaves=l_out)
+
+
 class LeaveMeService:
     def __init__(self, repo: Optional[LeaveMeRepository] = None):
         self.repo = repo or LeaveMeRepository()
@@ -73,33 +101,12 @@ class LeaveMeService:
         if start_dt > end_dt:
             raise HTTPException(400, "start > end")
 
-        region = self.repo.get_employee_region(db, employee_id)
+        emp = employee_identity.get(db, employee_id)
+        region = emp.region if emp else None
 
-        # holidays (by date range)
         holidays = self.repo.list_holidays_in_range(db, start_dt.date(), end_dt.date(), region)
-        h_out = [
-            CalendarHolidayOut(date=h.holiday_date, name=h.name, is_paid=bool(h.is_paid))
-            for h in holidays
-        ]
-
-        # approved leaves in range
         leaves = self.repo.list_my_approved_leaves_in_range(db, employee_id, start_dt, end_dt)
-        l_out = [
-            CalendarLeaveOut(
-                id=r.id,
-                leave_type_code=lt.code,
-                start=r.start_datetime,
-                end=r.end_datetime,
-                requested_unit=(
-                    r.requested_unit.value
-                    if hasattr(r.requested_unit, "value")
-                    else str(r.requested_unit)
-                ),
-                approved=(r.status == LeaveStatus.APPROVED),
-            )
-            for r, lt in leaves
-        ]
-        return CalendarOut(holidays=h_out, leaves=l_out)
+        return _calendar_out(holidays, leaves)
 
     # --------- Requests ----------
     def apply(self, db: Session, employee_id: str, payload: LeaveApplyIn) -> LeaveRequestOut:
@@ -235,3 +242,26 @@ class LeaveMeService:
             pending_leaves=pending_leaves,
             billable_leaves=billable_leaves,
         )
+
+
+class AsyncLeaveMeService:
+    """Async read paths (calendar) on an AsyncSession."""
+
+    def __init__(self, repo: Optional[AsyncLeaveMeRepository] = None):
+        self.repo = repo or AsyncLeaveMeRepository()
+
+    async def get_calendar(
+        self, db: AsyncSession, employee_id: str, start_dt: datetime, end_dt: datetime
+    ) -> CalendarOut:
+        if start_dt > end_dt:
+            raise HTTPException(400, "start > end")
+
+        emp = await employee_identity.get_async(db, employee_id)
+        region = emp.region if emp else None
+        holidays = await self.repo.list_holidays_in_range(
+            db, start_dt.date(), end_dt.date(), region
+        )
+        leaves = await self.repo.list_my_approved_leaves_in_range(
+            db, employee_id, start_dt, end_dt
+        )
+        return _calendar_out(holidays, leaves)
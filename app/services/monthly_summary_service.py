@@ -1,25 +1,101 @@
 from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.data.repositories.monthly_summary_repo import upsert_summary
+from app.data.repositories.monthly_summary_repo import bulk_upsert_summaries, upsert_summary
+from app.data.models.add_employee import Employee
 from app.data.models.attendance import AttendanceDay
 from app.data.models.leave import LeaveRequest
-from app.data.models.policy import HolidayCalendar
+from app.data.calendar_index import DayKind, calendar_index
+from app.services.job_runner import JobContext
+
+
+def _month_end(month_start: date) -> date:
+    return (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _attendance_columns():
+    return (
+        func.count().filter(AttendanceDay.status == "Present").label("present_days"),
+        func.count().filter(AttendanceDay.status == "Leave").label("leave_days"),
+        func.sum(AttendanceDay.seconds_worked).label("worked_seconds"),
+        func.sum(AttendanceDay.expected_seconds).label("expected_seconds"),
+        func.sum(AttendanceDay.overtime_seconds).label("overtime_seconds"),
+        func.sum(AttendanceDay.underwork_seconds).label("underwork_seconds"),
+    )
+
+
+def _leave_columns():
+    return (
+        func.sum(func.coalesce(LeaveRequest.requested_hours, 0))
+        .filter(LeaveRequest.status == "APPROVED")
+        .label("approved_hours"),
+        func.sum(func.coalesce(LeaveRequest.requested_hours, 0))
+        .filter(LeaveRequest.status == "PENDING")
+        .label("pending_hours"),
+        func.sum(func.coalesce(LeaveRequest.requested_hours, 0))
+        .filter(LeaveRequest.status == "REJECTED")
+        .label("unpaid_hours"),
+        func.count().filter(LeaveRequest.status == "APPROVED").label("approved_days"),
+        func.count().filter(LeaveRequest.status == "REJECTED").label("unpaid_days"),
+        func.count().filter(LeaveRequest.status == "PENDING").label("pending_days"),
+    )
+
+
+def _calendar_days_by_region(
+    db: Session, regions: Iterable[Optional[str]], month_start: date, month_end: date
+) -> Dict[Optional[str], Tuple[int, int]]:
+    """(holiday days, weekend days) in the month per region, from the calendar index."""
+    last_day = month_end - timedelta(days=1)
+    calendars = calendar_index.get_many(db, regions, month_start.year)
+    return {
+        region: (
+            calendar.count(DayKind.PAID_HOLIDAY, month_start, last_day)
+            + calendar.count(DayKind.UNPAID_HOLIDAY, month_start, last_day),
+            calendar.count(DayKind.WEEKEND, month_start, last_day),
+        )
+        for region, calendar in calendars.items()
+    }
+
+
+def _summary_dict(
+    employee_id: str,
+    month_start: date,
+    attendance: Any,
+    calendar_days: Tuple[int, int],
+    leave: Any,
+    leave_breakdown: Dict[int, float],
+) -> dict:
+    holiday_days, weekend_days = calendar_days
+    present_days = (attendance.present_days or 0) if attendance else 0
+    leave_days = (attendance.leave_days or 0) if attendance else 0
+    return {
+        "employee_id": employee_id,
+        "month_start": month_start,
+        "total_work_days": present_days + leave_days,
+        "present_days": present_days,
+        "holiday_days": holiday_days,
+        "weekend_days": weekend_days,
+        "leave_days": leave_days,
+        "paid_leave_hours": float((leave.approved_hours if leave else None) or 0),
+        "unpaid_leave_hours": float((leave.unpaid_hours if leave else None) or 0),
+        "pending_leave_hours": float((leave.pending_hours if leave else None) or 0),
+        "total_worked_hours": float(((attendance.worked_seconds if attendance else None) or 0) / 3600),
+        "expected_hours": float(((attendance.expected_seconds if attendance else None) or 0) / 3600),
+        "overtime_hours": float(((attendance.overtime_seconds if attendance else None) or 0) / 3600),
+        "underwork_hours": float(
+            ((attendance.underwork_seconds if attendance else None) or 0) / 3600
+        ),
+        "leave_type_breakdown": leave_breakdown,
+    }
 
 
 def aggregate_employee_month(db: Session, employee_id: str, month_start: date) -> dict:
-    month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    month_end = _month_end(month_start)
 
     # Attendance rollup
     attendance = (
-        db.query(
-            func.count().filter(AttendanceDay.status == "Present").label("present_days"),
-            func.count().filter(AttendanceDay.status == "Leave").label("leave_days"),
-            func.sum(AttendanceDay.seconds_worked).label("worked_seconds"),
-            func.sum(AttendanceDay.expected_seconds).label("expected_seconds"),
-            func.sum(AttendanceDay.overtime_seconds).label("overtime_seconds"),
-            func.sum(AttendanceDay.underwork_seconds).label("underwork_seconds"),
-        )
+        db.query(*_attendance_columns())
         .filter(
             AttendanceDay.employee_id == employee_id,  # must be str
             AttendanceDay.work_date_local >= month_start,
@@ -28,32 +104,13 @@ def aggregate_employee_month(db: Session, employee_id: str, month_start: date) -
         .one()
     )
 
-    # Holidays
-    holiday_days = (
-        db.query(func.count(HolidayCalendar.id))
-        .filter(
-            HolidayCalendar.holiday_date >= month_start,
-            HolidayCalendar.holiday_date < month_end,
-        )
-        .scalar()
-    )
+    # Holidays (global + the employee's region) and weekends
+    region = db.query(Employee.region).filter(Employee.employee_id == employee_id).scalar()
+    calendar_days = _calendar_days_by_region(db, [region], month_start, month_end)[region]
 
     # Leave requests
     leave = (
-        db.query(
-            func.sum(func.coalesce(LeaveRequest.requested_hours, 0))
-            .filter(LeaveRequest.status == "APPROVED")
-            .label("approved_hours"),
-            func.sum(func.coalesce(LeaveRequest.requested_hours, 0))
-            .filter(LeaveRequest.status == "PENDING")
-            .label("pending_hours"),
-            func.sum(func.coalesce(LeaveRequest.requested_hours, 0))
-            .filter(LeaveRequest.status == "REJECTED")
-            .label("unpaid_hours"),
-            func.count().filter(LeaveRequest.status == "APPROVED").label("approved_days"),
-            func.count().filter(LeaveRequest.status == "REJECTED").label("unpaid_days"),
-            func.count().filter(LeaveRequest.status == "PENDING").label("pending_days"),
-        )
+        db.query(*_leave_columns())
         .filter(
             LeaveRequest.employee_id == employee_id,
             LeaveRequest.start_datetime >= month_start,
@@ -78,25 +135,108 @@ def aggregate_employee_month(db: Session, employee_id: str, month_start: date) -
         .all()
     }
 
-    return {
-        "employee_id": employee_id,
-        "month_start": month_start,
-        "total_work_days": (attendance.present_days or 0) + (attendance.leave_days or 0),
-        "present_days": attendance.present_days or 0,
-        "holiday_days": holiday_days or 0,
-        "weekend_days": 0,  # TODO: calculate from workweek_policies
-        "leave_days": attendance.leave_days or 0,
-        "paid_leave_hours": float(leave.approved_hours or 0),
-        "unpaid_leave_hours": float(leave.unpaid_hours or 0),
-        "pending_leave_hours": float(leave.pending_hours or 0),
-        "total_worked_hours": float((attendance.worked_seconds or 0) / 3600),
-        "expected_hours": float((attendance.expected_seconds or 0) / 3600),
-        "overtime_hours": float((attendance.overtime_seconds or 0) / 3600),
-        "underwork_hours": float((attendance.underwork_seconds or 0) / 3600),
-        "leave_type_breakdown": leave_breakdown,
+    return _summary_dict(
+        employee_id, month_start, attendance, calendar_days, leave, leave_breakdown
+    )
+
+
+def aggregate_month(
+    db: Session, month_start: date, employee_ids: Optional[Sequence[str]] = None
+) -> List[dict]:
+    """
+    Month-wide variant of ``aggregate_employee_month``.
+
+    Produces the same dict for every employee (or the given subset) with one
+    GROUP BY employee_id query per metric and the calendar index, so the
+    number of round trips does not grow with headcount.
+    """
+    month_end = _month_end(month_start)
+
+    employee_query = db.query(Employee.employee_id, Employee.region)
+    if employee_ids is not None:
+        employee_query = employee_query.filter(Employee.employee_id.in_(list(employee_ids)))
+    regions: Dict[str, Optional[str]] = {code: region for code, region in employee_query}
+    if employee_ids is not None:
+        # Codes without an Employee row are still summarised (with global holidays)
+        regions = {code: regions.get(code) for code in employee_ids}
+    if not regions:
+        return []
+
+    def for_employees(query, column):
+        return query if employee_ids is None else query.filter(column.in_(list(regions)))
+
+    attendance = {
+        row.employee_id: row
+        for row in for_employees(
+            db.query(AttendanceDay.employee_id, *_attendance_columns()).filter(
+                AttendanceDay.work_date_local >= month_start,
+                AttendanceDay.work_date_local < month_end,
+            ),
+            AttendanceDay.employee_id,
+        ).group_by(AttendanceDay.employee_id)
+    }
+
+    calendar_days = _calendar_days_by_region(db, regions.values(), month_start, month_end)
+
+    leave_filters = (
+        LeaveRequest.start_datetime >= month_start,
+        LeaveRequest.start_datetime < month_end,
+    )
+    leave = {
+        row.employee_id: row
+        for row in for_employees(
+            db.query(LeaveRequest.employee_id, *_leave_columns()).filter(*leave_filters),
+            LeaveRequest.employee_id,
+        ).group_by(LeaveRequest.employee_id)
     }
 
+    breakdowns: Dict[str, Dict[int, float]] = {}
+    for employee_id, leave_type_id, total_hours in (
+        for_employees(
+            db.query(
+                LeaveRequest.employee_id,
+                LeaveRequest.leave_type_id,
+                func.sum(LeaveRequest.requested_hours),
+            ).filter(*leave_filters, LeaveRequest.status == "APPROVED"),
+            LeaveRequest.employee_id,
+        )
+        .group_by(LeaveRequest.employee_id, LeaveRequest.leave_type_id)
+        .all()
+    ):
+        breakdowns.setdefault(employee_id, {})[leave_type_id] = (
+            float(total_hours) if total_hours is not None else 0.0
+        )
+
+    return [
+        _summary_dict(
+            employee_id,
+            month_start,
+            attendance.get(employee_id),
+            calendar_days[region],
+            leave.get(employee_id),
+            breakdowns.get(employee_id, {}),
+        )
+        for employee_id, region in regions.items()
+    ]
+
 
 def generate_monthly_summary(db: Session, employee_id: str, month_start: date):
     summary_data = aggregate_employee_month(db, employee_id, month_start)
     return upsert_summary(db, summary_data)
+
+
+def rollup_month_job(db: Session, ctx: JobContext, month_start: date) -> None:
+    """Background-job body: roll up every employee's summary, committing per chunk."""
+    employees = [code for (code,) in db.query(Employee.employee_id).order_by(Employee.employee_id)]
+    ctx.set_total(len(employees))
+
+    for chunk in ctx.chunks(employees):
+        try:
+            bulk_upsert_summaries(db, aggregate_month(db, month_start, chunk), commit=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for employee_id in chunk:
+                ctx.record_error(employee_id, str(e))
+            continue
+        ctx.record_success(len(chunk))
@@ -7,16 +7,20 @@ Comprehensive payroll calculation service that integrates:
 - Monthly summary metrics
 """
 
+import time
+from contextlib import contextmanager
 from datetime import date
-from typing import Optional, Dict, List, cast
-from sqlalchemy import inspect
+from typing import Optional, Dict, Iterator, List, Sequence
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.data.models.add_employee import Employee
 from app.data.models.employee_salary import EmployeeSalary
-from app.data.models.payroll_policy import PayrollPolicy
+from app.data.models.payroll_policy_rule import Ruletypes
 from app.data.models.salary_breakdown import SalaryBreakdown
 from app.data.models.monthly_summary import MonthlyEmployeeSummary
+from app.services.job_runner import JobContext
+from app.services.payroll_policy_cache import CompiledPolicy, policy_cache
 
 
 class PayrollCalculation:
@@ -87,10 +91,8 @@ class PayrollCalculation:
 
 
 def _payroll_policy_tables_exist(db: Session) -> bool:
-    """Return True when the payroll policy tables are present in the current database."""
-    bind = db.get_bind()
-    inspector = inspect(bind)
-    return inspector.has_table("payroll_policies") and inspector.has_table("payroll_policy_rules")
+    """Return True when the payroll policy tables are present (probed once per process)."""
+    return policy_cache.tables_exist(db)
 
 
 def get_payroll_for_employee(
@@ -139,25 +141,34 @@ def get_payroll_for_employee(
         .first()
     )
 
-    # 4. Fetch policy
+    # 4. Fetch compiled policy (cached process-wide)
     policy = None
     if salary_record.payroll_policy_id and _payroll_policy_tables_exist(db):
-        policy = (
-            db.query(PayrollPolicy)
-            .filter(PayrollPolicy.id == salary_record.payroll_policy_id)
-            .first()
-        )
+        policy = policy_cache.get(db, salary_record.payroll_policy_id)
+
+    return _build_payroll_calculation(
+        str(employee.id), employee.employee_id, month_start, salary_record, summary, policy
+    )
 
-    # Create calculation object
+
+def _build_payroll_calculation(
+    employee_id: str,
+    employee_code: str,
+    month_start: date,
+    salary_record: EmployeeSalary,
+    summary: Optional[MonthlyEmployeeSummary],
+    policy: Optional[CompiledPolicy],
+) -> PayrollCalculation:
+    """Compute a PayrollCalculation from already-loaded rows (no queries)."""
     calc = PayrollCalculation(
-        employee_id=str(employee.id),
-        employee_code=employee.employee_id,
+        employee_id=employee_id,
+        employee_code=employee_code,
         month_start=month_start,
     )
 
     calc.base_salary = float(salary_record.base_salary or 0.0)
-    calc.policy_id = cast(Optional[int], policy.id) if policy else None
-    calc.policy_name = cast(Optional[str], policy.name) if policy else None
+    calc.policy_id = policy.id if policy else None
+    calc.policy_name = policy.name if policy else None
 
     # Populate attendance metrics from summary
     if summary:
@@ -187,21 +198,131 @@ def get_payroll_for_all_employees(
     """
     Calculate payroll for all employees for a given month.
     """
-    employees = db.query(Employee).all()
-    results: List[PayrollCalculation] = []
+    return calculate_payroll_batch(db, month_start).calculations
 
-    for employee in employees:
-        payroll = get_payroll_for_employee(db, employee.employee_id, month_start)
-        if payroll:
-            results.append(payroll)
 
-    return results
+# ──────────────────────────────────────────────────────────────────────────────
+# Set-based batch engine
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class PayrollBatch:
+    """Result of a set-based payroll run over many employees for one month."""
+
+    def __init__(self, month_start: date):
+        self.month_start = month_start
+        self.calculations: List[PayrollCalculation] = []
+        # employee_code -> id of the EmployeeSalary row the calculation was based on
+        self.salary_ids: Dict[str, int] = {}
+        # Employees that could not be calculated: {"employee_id", "employee_code", "error"}
+        self.errors: List[Dict] = []
+        # Phase name -> elapsed milliseconds
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the wall-clock duration of a block under ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 2)
+
+
+def calculate_payroll_batch(
+    db: Session,
+    month_start: date,
+    employee_codes: Optional[Sequence[str]] = None,
+) -> PayrollBatch:
+    """
+    Calculate payroll for many employees using a constant number of queries.
+
+    Employees, their latest salary records, the month's summaries and the referenced
+    policies (with rules) are each loaded in one set-based query; every
+    PayrollCalculation is then computed in memory.
+
+    Args:
+        db: Database session
+        month_start: First day of the month to calculate
+        employee_codes: Restrict the run to these employee codes (all employees if None)
+
+    Returns:
+        PayrollBatch with calculations, per-employee errors and phase timings
+    """
+    batch = PayrollBatch(month_start)
+
+    with batch.phase("load_employees"):
+        employee_query = db.query(Employee.id, Employee.employee_id)
+        if employee_codes is not None:
+            employee_query = employee_query.filter(Employee.employee_id.in_(list(employee_codes)))
+        employees = employee_query.order_by(Employee.id).all()
+
+    if not employees:
+        return batch
+
+    with batch.phase("load_salaries"):
+        # Latest salary record per employee (highest id wins, as in the per-employee path)
+        latest_ids = select(func.max(EmployeeSalary.id)).group_by(EmployeeSalary.employee_id)
+        if employee_codes is not None:
+            latest_ids = latest_ids.where(
+                EmployeeSalary.employee_id.in_([emp_id for emp_id, _ in employees])
+            )
+        salaries = {
+            str(s.employee_id): s
+            for s in db.query(EmployeeSalary).filter(EmployeeSalary.id.in_(latest_ids))
+        }
+
+    with batch.phase("load_summaries"):
+        summary_query = db.query(MonthlyEmployeeSummary).filter(
+            MonthlyEmployeeSummary.month_start == month_start
+        )
+        if employee_codes is not None:
+            summary_query = summary_query.filter(
+                MonthlyEmployeeSummary.employee_id.in_([code for _, code in employees])
+            )
+        summaries = {s.employee_id: s for s in summary_query}
+
+    with batch.phase("load_policies"):
+        policies: Dict[int, CompiledPolicy] = {}
+        policy_ids = {s.payroll_policy_id for s in salaries.values() if s.payroll_policy_id}
+        if policy_ids and _payroll_policy_tables_exist(db):
+            policies = policy_cache.get_many(db, policy_ids)
+
+    with batch.phase("compute"):
+        for emp_id, code in employees:
+            salary_record = salaries.get(str(emp_id))
+            if not salary_record:
+                batch.errors.append(
+                    {
+                        "employee_id": emp_id,
+                        "employee_code": code,
+                        "error": "Salary record not found",
+                    }
+                )
+                continue
+            try:
+                calc = _build_payroll_calculation(
+                    str(emp_id),
+                    code,
+                    month_start,
+                    salary_record,
+                    summaries.get(code),
+                    policies.get(salary_record.payroll_policy_id),
+                )
+            except Exception as e:
+                batch.errors.append({"employee_id": emp_id, "employee_code": code, "error": str(e)})
+                continue
+            batch.calculations.append(calc)
+            batch.salary_ids[code] = salary_record.id
+
+    return batch
 
 
 def _apply_policy_rules(
     calc: PayrollCalculation,
     base_salary: float,
-    policy: PayrollPolicy,
+    policy: CompiledPolicy,
     summary: Optional[MonthlyEmployeeSummary],
 ) -> None:
     """
@@ -215,51 +336,48 @@ def _apply_policy_rules(
         return
 
     for rule in policy.rules:
-        if not rule.is_enabled:
-            continue
-
         amount = 0.0
-        applies_to = (rule.applies_to or "").lower()
+        applies_to = rule.target
 
         # Determine amount based on rule type and attendance
         if summary and applies_to == "overtime":
             overtime_hours = float(summary.overtime_hours or 0.0)
-            amount = float(rule.value) * overtime_hours
+            amount = rule.value * overtime_hours
             if amount > 0:
                 calc.attendance_adjustments.append(
                     {
                         "name": rule.rule_name,
                         "type": "overtime",
                         "hours": overtime_hours,
-                        "rate": float(rule.value),
+                        "rate": rule.value,
                         "amount": round(amount, 2),
                     }
                 )
 
         elif summary and applies_to == "unpaid_leave":
             unpaid_hours = float(summary.unpaid_leave_hours or 0.0)
-            amount = float(rule.value) * unpaid_hours
+            amount = rule.value * unpaid_hours
             if amount > 0:
                 calc.attendance_adjustments.append(
                     {
                         "name": rule.rule_name,
                         "type": "unpaid_leave_deduction",
                         "hours": unpaid_hours,
-                        "rate": float(rule.value),
+                        "rate": rule.value,
                         "amount": round(amount, 2),
                     }
                 )
 
         elif summary and applies_to == "underwork":
             underwork_hours = float(summary.underwork_hours or 0.0)
-            amount = float(rule.value) * underwork_hours
+            amount = rule.value * underwork_hours
             if amount > 0:
                 calc.attendance_adjustments.append(
                     {
                         "name": rule.rule_name,
                         "type": "underwork_deduction",
                         "hours": underwork_hours,
-                        "rate": float(rule.value),
+                        "rate": rule.value,
                         "amount": round(amount, 2),
                     }
                 )
@@ -267,9 +385,9 @@ def _apply_policy_rules(
         elif summary and applies_to == "attendance_bonus":
             present_days = int(summary.present_days or 0)
             amount = (
-                (base_salary * float(rule.value) / 100)
+                (base_salary * rule.value / 100)
                 if rule.is_percentage
-                else (float(rule.value) * present_days)
+                else (rule.value * present_days)
             )
             if amount > 0:
                 calc.attendance_adjustments.append(
@@ -282,34 +400,28 @@ def _apply_policy_rules(
                 )
 
         else:
-            amount = (
-                (base_salary * float(rule.value) / 100)
-                if rule.is_percentage
-                else float(rule.value)
-            )
+            amount = rule.amount_for(base_salary)
 
         # Update gross salary and track in lists
-        rule_type_str = str(rule.rule_type)
-
-        if "ALLOWANCE" in rule_type_str:
+        if rule.rule_type is Ruletypes.ALLOWANCE:
             gross += amount
             calc.allowances.append(
                 {
                     "rule_name": rule.rule_name,
                     "is_percentage": rule.is_percentage,
-                    "value": float(rule.value),
+                    "value": rule.value,
                     "amount": round(amount, 2),
                     "applies_to": rule.applies_to,
                 }
             )
 
-        elif "DEDUCTION" in rule_type_str:
+        elif rule.rule_type is Ruletypes.DEDUCTION:
             gross -= amount
             calc.deductions.append(
                 {
                     "rule_name": rule.rule_name,
                     "is_percentage": rule.is_percentage,
-                    "value": float(rule.value),
+                    "value": rule.value,
                     "amount": round(amount, 2),
                     "applies_to": rule.applies_to,
                 }
@@ -362,26 +474,120 @@ def generate_salary_breakdown(
 
     # Clear and regenerate breakdowns
     salary.breakdowns.clear()
+    for row in _breakdown_rows(salary.id, payroll):
+        salary.breakdowns.append(SalaryBreakdown(**row))
+
+    db.commit()
+    db.refresh(salary)
+    return salary
+
+
+def generate_salary_breakdowns_batch(
+    db: Session,
+    month_start: date,
+    employee_codes: Optional[Sequence[str]] = None,
+    commit: bool = True,
+) -> PayrollBatch:
+    """
+    Generate/update salary records and breakdowns for many employees at once.
+
+    Calculation goes through ``calculate_payroll_batch``; the writes are one bulk
+    UPDATE of EmployeeSalary, one DELETE of the previous breakdowns and one bulk
+    INSERT of the new SalaryBreakdown rows, all in a single transaction.
+
+    Args:
+        db: Database session
+        month_start: First day of month to generate salaries for
+        employee_codes: Restrict the run to these employee codes (all employees if None)
+        commit: Commit the transaction (callers batching several chunks may pass False)
+
+    Returns:
+        PayrollBatch describing what was written, including phase timings
+    """
+    batch = calculate_payroll_batch(db, month_start, employee_codes)
+    if not batch.calculations:
+        return batch
+
+    with batch.phase("write"):
+        salary_ids = [batch.salary_ids[c.employee_code] for c in batch.calculations]
+        db.execute(
+            update(EmployeeSalary),
+            [
+                {
+                    "id": batch.salary_ids[c.employee_code],
+                    "base_salary": c.base_salary,
+                    "gross_salary": c.gross_salary,
+                }
+                for c in batch.calculations
+            ],
+        )
+        db.execute(
+            delete(SalaryBreakdown).where(SalaryBreakdown.employee_salary_id.in_(salary_ids))
+        )
+        rows = [
+            row
+            for c in batch.calculations
+            for row in _breakdown_rows(batch.salary_ids[c.employee_code], c)
+        ]
+        if rows:
+            db.execute(insert(SalaryBreakdown), rows)
+
+    if commit:
+        with batch.phase("commit"):
+            db.commit()
+
+    return batch
+
+
+def generate_salaries_job(db: Session, ctx: JobContext, month_start: date) -> None:
+    """Background-job body: run the batch engine over all employees, one commit per chunk."""
+    codes = [code for (code,) in db.query(Employee.employee_id).order_by(Employee.employee_id)]
+    ctx.set_total(len(codes))
+    timings: Dict[str, float] = {}
+
+    for chunk in ctx.chunks(codes):
+        try:
+            batch = generate_salary_breakdowns_batch(db, month_start, employee_codes=chunk)
+        except Exception as e:
+            db.rollback()
+            for code in chunk:
+                ctx.record_error(code, str(e))
+            continue
+
+        ctx.record_success(len(batch.calculations))
+        for error in batch.errors:
+            ctx.record_error(error["employee_code"], error["error"])
+        for name, elapsed in batch.timings.items():
+            timings[name] = round(timings.get(name, 0.0) + elapsed, 2)
+
+    ctx.set_result(timings=timings)
+
+
+def _breakdown_rows(salary_id: int, payroll: PayrollCalculation) -> List[Dict]:
+    """Build SalaryBreakdown column dicts for a calculated payroll."""
+    rows: List[Dict] = []
 
     for allowance in payroll.allowances:
-        breakdown = SalaryBreakdown(
-            employee_salary_id=salary.id,
-            rule_name=allowance["rule_name"],
-            rule_type="ALLOWANCE",
-            applies_to=allowance["applies_to"],
-            amount=allowance["amount"],
+        rows.append(
+            {
+                "employee_salary_id": salary_id,
+                "rule_name": allowance["rule_name"],
+                "rule_type": "ALLOWANCE",
+                "applies_to": allowance["applies_to"],
+                "amount": allowance["amount"],
+            }
         )
-        salary.breakdowns.append(breakdown)
 
     for deduction in payroll.deductions:
-        breakdown = SalaryBreakdown(
-            employee_salary_id=salary.id,
-            rule_name=deduction["rule_name"],
-            rule_type="DEDUCTION",
-            applies_to=deduction["applies_to"],
-            amount=deduction["amount"],
+        rows.append(
+            {
+                "employee_salary_id": salary_id,
+                "rule_name": deduction["rule_name"],
+                "rule_type": "DEDUCTION",
+                "applies_to": deduction["applies_to"],
+                "amount": deduction["amount"],
+            }
         )
-        salary.breakdowns.append(breakdown)
 
     for adjustment in payroll.attendance_adjustments:
         rule_type = (
@@ -389,15 +595,14 @@ def generate_salary_breakdown(
             if adjustment.get("type") in ["overtime", "attendance_bonus"]
             else "DEDUCTION"
         )
-        breakdown = SalaryBreakdown(
-            employee_salary_id=salary.id,
-            rule_name=adjustment["name"],
-            rule_type=rule_type,
-            applies_to=adjustment.get("type", "attendance"),
-            amount=adjustment["amount"],
+        rows.append(
+            {
+                "employee_salary_id": salary_id,
+                "rule_name": adjustment["name"],
+                "rule_type": rule_type,
+                "applies_to": adjustment.get("type", "attendance"),
+                "amount": adjustment["amount"],
+            }
         )
-        salary.breakdowns.append(breakdown)
 
-    db.commit()
-    db.refresh(salary)
-    return salary
+    return rows
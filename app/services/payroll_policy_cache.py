@@ -0,0 +1,161 @@
+# app/services/payroll_policy_cache.py
+"""
+Process-wide cache of compiled payroll policies.
+
+Payroll calculation runs once per employee, so it must not probe the schema or
+walk lazy ``policy.rules`` relationships in its loop. Each PayrollPolicy is
+compiled once into an immutable ``CompiledPolicy`` (enabled rules only, with
+rule type, percentage flag and ``applies_to`` already parsed) and shared by every
+request in the process.
+
+The cache is invalidated by payroll_policy_service on create/update/delete.
+Entries also expire after PAYROLL_POLICY_CACHE_TTL_SECONDS so that other worker
+processes, which never see those invalidations, converge on the same data.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.data.models.payroll_policy import PayrollPolicy
+from app.data.models.payroll_policy_rule import Ruletypes
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A single enabled policy rule with all string parsing done up front."""
+
+    rule_name: str
+    rule_type: Optional[Ruletypes]
+    is_percentage: bool
+    value: float
+    # applies_to as stored (reported in breakdowns) and its normalised form (matched on)
+    applies_to: Optional[str]
+    target: str
+
+    def amount_for(self, base_salary: float) -> float:
+        """Amount of a flat/percentage rule that does not depend on attendance."""
+        return (base_salary * self.value / 100) if self.is_percentage else self.value
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """Immutable rule plan for one PayrollPolicy."""
+
+    id: int
+    name: str
+    rules: Tuple[CompiledRule, ...]
+
+
+def _parse_rule_type(raw) -> Optional[Ruletypes]:
+    if isinstance(raw, Ruletypes):
+        return raw
+    text = str(getattr(raw, "value", raw) or "").upper()
+    if "ALLOWANCE" in text:
+        return Ruletypes.ALLOWANCE
+    if "DEDUCTION" in text:
+        return Ruletypes.DEDUCTION
+    return None
+
+
+def compile_policy(policy: PayrollPolicy) -> CompiledPolicy:
+    """Compile a loaded PayrollPolicy (rules must be loadable) into a rule plan."""
+    rules = tuple(
+        CompiledRule(
+            rule_name=rule.rule_name,
+            rule_type=_parse_rule_type(rule.rule_type),
+            is_percentage=bool(rule.is_percentage),
+            value=float(rule.value),
+            applies_to=rule.applies_to,
+            target=(rule.applies_to or "").strip().lower(),
+        )
+        for rule in sorted(policy.rules, key=lambda r: r.id or 0)
+        if rule.is_enabled
+    )
+    return CompiledPolicy(id=int(policy.id), name=str(policy.name), rules=rules)
+
+
+class PayrollPolicyCache:
+    """Thread-safe cache of CompiledPolicy objects keyed by policy id."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._tables_exist: Optional[bool] = None
+        # policy_id -> (expires_at, compiled policy or None when the id does not exist)
+        self._entries: Dict[int, Tuple[float, Optional[CompiledPolicy]]] = {}
+
+    def tables_exist(self, db: Session) -> bool:
+        """Return True when the payroll policy tables exist (probed once per process)."""
+        if self._tables_exist is None:
+            inspector = inspect(db.get_bind())
+            exists = inspector.has_table("payroll_policies") and inspector.has_table(
+                "payroll_policy_rules"
+            )
+            with self._lock:
+                self._tables_exist = exists
+        return bool(self._tables_exist)
+
+    def get(self, db: Session, policy_id: Optional[int]) -> Optional[CompiledPolicy]:
+        """Return the compiled policy for ``policy_id`` or None if it does not exist."""
+        if not policy_id:
+            return None
+        return self.get_many(db, [policy_id]).get(policy_id)
+
+    def get_many(self, db: Session, policy_ids: Iterable[int]) -> Dict[int, CompiledPolicy]:
+        """Return compiled policies for the given ids, loading all misses in one query."""
+        now = time.monotonic()
+        found: Dict[int, CompiledPolicy] = {}
+        missing = set()
+
+        with self._lock:
+            for policy_id in set(policy_ids):
+                entry = self._entries.get(policy_id)
+                if entry is None or entry[0] <= now:
+                    missing.add(policy_id)
+                elif entry[1] is not None:
+                    found[policy_id] = entry[1]
+
+        if missing:
+            loaded = {
+                int(p.id): compile_policy(p)
+                for p in db.query(PayrollPolicy)
+                .options(selectinload(PayrollPolicy.rules))
+                .filter(PayrollPolicy.id.in_(missing))
+            }
+            expires_at = now + self.ttl_seconds
+            with self._lock:
+                for policy_id in missing:
+                    self._entries[policy_id] = (expires_at, loaded.get(policy_id))
+            found.update(loaded)
+
+        return found
+
+    def warm(self, db: Session) -> int:
+        """Probe the schema and compile every policy. Returns the number cached."""
+        if not self.tables_exist(db):
+            return 0
+        ids = [policy_id for (policy_id,) in db.query(PayrollPolicy.id)]
+        return len(self.get_many(db, ids))
+
+    def invalidate(self, policy_id: Optional[int] = None) -> None:
+        """Drop one policy, or everything (including the schema probe) when no id is given."""
+        with self._lock:
+            if policy_id is None:
+                self._entries.clear()
+                self._tables_exist = None
+            else:
+                self._entries.pop(policy_id, None)
+
+
+policy_cache = PayrollPolicyCache(ttl_seconds=settings.PAYROLL_POLICY_CACHE_TTL_SECONDS)
@@ -4,6 +4,7 @@ from app.schemas.payroll_policy import PayrollPolicyCreate, PayrollPolicyUpdate
 from app.data.models.payroll_policy import PayrollPolicy
 from app.data.models.payroll_policy_rule import PayrollPolicyRule
 from app.data.repositories import payroll_policy_repository
+from app.services.payroll_policy_cache import policy_cache
 
 
 def create_policy(db: Session, data: PayrollPolicyCreate):
@@ -16,7 +17,9 @@ def create_policy(db: Session, data: PayrollPolicyCreate):
     )
     # create rules list
     rules = [PayrollPolicyRule(**rule.dict()) for rule in data.rules]
-    return payroll_policy_repository.create_policy(db, policy, rules)
+    policy = payroll_policy_repository.create_policy(db, policy, rules)
+    policy_cache.invalidate(policy.id)
+    return policy
 
 
 def update_policy(db: Session, policy_id: int, updates: PayrollPolicyUpdate):
@@ -37,6 +40,7 @@ def update_policy(db: Session, policy_id: int, updates: PayrollPolicyUpdate):
             policy.rules.append(rule)
 
     db.commit()
+    policy_cache.invalidate(policy_id)
     db.refresh(policy)
     return policy
 
@@ -54,5 +58,6 @@ def delete_policy(db: Session, policy_id: int):
     if policy:
         db.delete(policy)  # ✅ cascade deletes rules
         db.commit()
+        policy_cache.invalidate(policy_id)
         return True
     return False
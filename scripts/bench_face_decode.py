@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# scripts/bench_face_decode.py
+"""
+Benchmark selfie decode + face detection time against input size.
+
+Compares the previous path (full-resolution ``IMREAD_COLOR`` decode, Haar
+detection on the full frame) with ``FaceVerificationService.extract_face_features``
+(header-driven ``IMREAD_REDUCED_COLOR_*`` decode, detection on a frame bounded
+by ``DETECT_MAX_SIDE``). Inputs are synthetic JPEGs, so no face is found and
+both paths stop after detection; the figures are decode/detect cost only.
+
+Usage:
+    python -m scripts.bench_face_decode [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from app.services.face_models import face_models
+from app.services.face_verification_service import (
+    FaceVerificationService,
+    _decode,
+    _reduction_for,
+)
+
+SIZES = [(640, 480), (1280, 960), (1920, 1080), (3264, 2448), (4032, 3024), (4624, 3472)]
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(width * height)
+    noise = rng.integers(0, 40, (height // 8, width // 8), dtype=np.uint8)
+    base = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    y, x = np.mgrid[0:height, 0:width]
+    img = (base + 90 + 50 * np.sin(x / 150.0) * np.cos(y / 110.0)).astype(np.uint8)
+    ok, encoded = cv2.imencode(".jpg", cv2.merge([img, img, img]), [cv2.IMWRITE_JPEG_QUALITY, 90])
+    assert ok
+    return encoded.tobytes()
+
+
+def full_resolution(data: bytes) -> dict:
+    t0 = time.perf_counter()
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    t1 = time.perf_counter()
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    face_models.haar().detectMultiScale(
+        gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30), flags=cv2.CASCADE_SCALE_IMAGE
+    )
+    t2 = time.perf_counter()
+    return {"decode": (t1 - t0) * 1000, "detect": (t2 - t1) * 1000, "frame_bytes": img.nbytes}
+
+
+def downscale_first(service: FaceVerificationService, data: bytes) -> dict:
+    timings: dict = {}
+    service.extract_face_features(data, timings)
+    return {"decode": timings.get("decode", 0.0), "detect": timings.get("detect", 0.0)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    service = FaceVerificationService()
+    face_models.warm()
+
+    header = (
+        f"{'size':>11} {'jpeg KB':>8} | {'full decode':>11} {'detect':>8} {'frame MB':>8} | "
+        f"{'reduced decode':>14} {'detect':>8} {'frame MB':>8} | {'speedup':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for width, height in SIZES:
+        data = make_jpeg(width, height)
+        old = [full_resolution(data) for _ in range(args.repeat)]
+        new = [downscale_first(service, data) for _ in range(args.repeat)]
+
+        old_decode = statistics.median(r["decode"] for r in old)
+        old_detect = statistics.median(r["detect"] for r in old)
+        new_decode = statistics.median(r["decode"] for r in new)
+        new_detect = statistics.median(r["detect"] for r in new)
+        reduced = _decode(data, _reduction_for((width, height)))
+        assert reduced is not None
+        speedup = (old_decode + old_detect) / max(new_decode + new_detect, 1e-6)
+        print(
+            f"{width:>5}x{height:<5} {len(data) / 1024:>8.0f} | "
+            f"{old_decode:>9.1f}ms {old_detect:>6.1f}ms {old[0]['frame_bytes'] / 2**20:>8.1f} | "
+            f"{new_decode:>12.1f}ms {new_detect:>6.1f}ms {reduced.nbytes / 2**20:>8.1f} | "
+            f"{speedup:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ from datetime import datetime, date
 
 import numpy as np
 import cv2
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # =============================================================================
 # Mock Image Generators
@@ -178,6 +181,78 @@ def create_mock_evidence(
     return mock
 
 
+# =============================================================================
+# In-memory SQLite Sessions
+# =============================================================================
+
+
+def create_sqlite_session(*models):
+    """
+    Create a session bound to a fresh in-memory SQLite database.
+
+    Only the tables of the given models are created, so tests do not depend on
+    Postgres-only DDL elsewhere in the schema.
+    """
+    import app.data.models  # noqa: F401  (registers every mapper for relationships)
+    from app.data.db import Base
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[m.__table__ for m in models])
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+
+
+def create_sqlite_sessions(path, *models):
+    """
+    Create a sync session and an async session factory on one SQLite file.
+
+    Sync code seeds the data; the async factory (aiosqlite) serves the ported
+    read paths, so both must see the same database rather than a private
+    in-memory one.
+    """
+    import app.data.models  # noqa: F401  (registers every mapper for relationships)
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.data.db import Base
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[m.__table__ for m in models])
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    return (
+        sessionmaker(bind=engine, autocommit=False, autoflush=False)(),
+        async_sessionmaker(bind=async_engine, expire_on_commit=False),
+    )
+
+
+def create_test_employee(db, employee_code: str, **overrides):
+    """Insert a minimal Employee row and return it."""
+    from app.data.models.add_employee import Department, Employee, MaritalStatus
+
+    fields = dict(
+        id=employee_code,
+        name=f"Employee {employee_code}",
+        father_name="Father",
+        employee_id=employee_code,
+        date_of_joining=date(2024, 1, 1),
+        email=f"{employee_code.lower()}@example.com",
+        mobile_number=employee_code[-10:].rjust(10, "0"),
+        marital_status=MaritalStatus.SINGLE,
+        date_of_birth=date(1995, 1, 1),
+        permanent_address="Address",
+        designation="Engineer",
+        department=Department.IT,
+        password="x",
+    )
+    fields.update(overrides)
+    employee = Employee(**fields)
+    db.add(employee)
+    db.flush()
+    return employee
+
+
 # Pytest
 
 
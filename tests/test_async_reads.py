@@ -0,0 +1,148 @@
+"""
+Tests for the read paths served from the async session (attendance today/month/
+days and the leave calendar), checked against the sync implementations.
+"""
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.timeutils import now_utc, to_local_date_ist
+from app.data.db import get_async_db
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import AttendanceDay, AttendanceSession, DayStatus
+from app.data.models.leave import LeaveRequest, LeaveRequestUnit, LeaveStatus, LeaveType, LeaveUnit
+from app.data.models.policy import HolidayCalendar
+from app.routes import attendance_router, leave_employee_router
+from app.services.attendance_service import AsyncAttendanceService, AttendanceService
+from tests.conftest import create_sqlite_sessions, create_test_employee
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    db, async_factory = create_sqlite_sessions(
+        tmp_path / "reads.db",
+        Employee,
+        AttendanceDay,
+        AttendanceSession,
+        HolidayCalendar,
+        LeaveType,
+        LeaveRequest,
+    )
+    create_test_employee(db, "E001", region="KA")
+    today = to_local_date_ist(now_utc())
+    cl = LeaveType(code="CL", name="Casual", unit=LeaveUnit.DAY)
+    db.add(cl)
+    db.flush()
+    db.add_all(
+        [
+            AttendanceDay(employee_id="E001", work_date_local=today, seconds_worked=3600),
+            AttendanceDay(
+                employee_id="E001",
+                work_date_local=date(2026, 2, 2),
+                seconds_worked=30600,
+                status=DayStatus.PRESENT,
+            ),
+            HolidayCalendar(holiday_date=date(2026, 2, 5), name="Regional", region="KA"),
+            HolidayCalendar(holiday_date=date(2026, 2, 6), name="Elsewhere", region="TN"),
+            HolidayCalendar(holiday_date=date(2026, 2, 9), name="National"),
+            LeaveRequest(
+                employee_id="E001",
+                leave_type_id=cl.id,
+                start_datetime=datetime(2026, 2, 10, 9),
+                end_datetime=datetime(2026, 2, 10, 18),
+                requested_unit=LeaveRequestUnit.DAY,
+                status=LeaveStatus.APPROVED,
+            ),
+            LeaveRequest(
+                employee_id="E001",
+                leave_type_id=cl.id,
+                start_datetime=datetime(2026, 2, 12, 9),
+                end_datetime=datetime(2026, 2, 12, 18),
+                requested_unit=LeaveRequestUnit.DAY,
+                status=LeaveStatus.PENDING,
+            ),
+        ]
+    )
+    db.commit()
+    yield db, async_factory
+    db.close()
+
+
+@pytest.fixture
+def client(sessions):
+    async def async_db():
+        async with sessions[1]() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(attendance_router.router)
+    app.include_router(leave_employee_router.router)
+    app.dependency_overrides[get_async_db] = async_db
+    return TestClient(app)
+
+
+def _run_async(factory, method, *args):
+    async def go():
+        async with factory() as session:
+            return await method(session, *args)
+
+    return asyncio.run(go())
+
+
+def test_async_service_matches_sync_service(sessions):
+    db, factory = sessions
+    sync, async_ = AttendanceService(), AsyncAttendanceService()
+
+    assert _run_async(factory, async_.month_view, "E001", 2026, 2) == sync.month_view(
+        db, "E001", 2026, 2
+    )
+    range_args = ("E001", date(2026, 2, 1), date(2026, 2, 7))
+    assert _run_async(
+        factory, async_.get_employee_attendance, *range_args
+    ) == sync.get_employee_attendance(db, *range_args)
+
+
+def test_attendance_endpoints(client):
+    today = client.get("/api/today", params={"employeeId": "E001"})
+    assert today.status_code == 200
+    assert today.json()["secondsWorkedSoFar"] == 3600
+    assert today.json()["present"] is True
+
+    month = client.get("/api/month", params={"employeeId": "E001", "year": 2026, "month": 2})
+    assert [d["date"] for d in month.json()] == ["2026-02-02"]
+
+    days = client.get(
+        "/api/E001/days", params={"date_from": "2026-02-01", "date_to": "2026-02-03"}
+    )
+    assert days.status_code == 200
+    assert [d["status"] for d in days.json()["items"]] == ["Absent", "Present", "Absent"]
+
+    assert client.get("/api/today", params={"employeeId": "NOPE"}).status_code == 404
+    assert (
+        client.get(
+            "/api/NOPE/days", params={"date_from": "2026-02-01", "date_to": "2026-02-03"}
+        ).status_code
+        == 404
+    )
+
+
+def test_leave_calendar_endpoint(client):
+    response = client.get(
+        "/api/leave/calendar",
+        params={"employeeId": "E001", "start": "01-02-2026", "end": "2026-02-28"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [h["name"] for h in body["holidays"]] == ["Regional", "National"]
+    assert [(lv["leave_type_code"], lv["approved"]) for lv in body["leaves"]] == [("CL", True)]
+
+    reversed_range = client.get(
+        "/api/leave/calendar",
+        params={"employeeId": "E001", "start": "2026-02-28", "end": "2026-02-01"},
+    )
+    assert reversed_range.status_code == 400
@@ -0,0 +1,117 @@
+"""
+Tests for the atomic ON CONFLICT rollup in AttendanceRepository.upsert_day_add_work.
+"""
+
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.data.db import Base
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import AttendanceDay, AttendanceSession, DayStatus
+from app.data.repositories.attendance_repository import AttendanceRepository
+from tests.conftest import create_sqlite_session, create_test_employee
+
+WORK_DATE = date(2026, 3, 2)
+BASE = datetime(2026, 3, 2, 3, 30, tzinfo=timezone.utc)
+
+
+def _naive(value):
+    return value.replace(tzinfo=None)
+
+
+def test_adds_to_existing_day_and_widens_punch_bounds():
+    db = create_sqlite_session(Employee, AttendanceDay)
+    create_test_employee(db, "E001")
+    repo = AttendanceRepository()
+
+    day = repo.upsert_day_add_work(
+        db, "E001", WORK_DATE, BASE + timedelta(hours=1), BASE + timedelta(hours=2), 3600
+    )
+    assert (day.seconds_worked, day.status) == (3600, DayStatus.PRESENT)
+
+    # A loaded copy of the row is refreshed, not left stale
+    same = repo.upsert_day_add_work(db, "E001", WORK_DATE, BASE, BASE + timedelta(minutes=30), -5)
+    assert same is day and day.seconds_worked == 3600
+    repo.upsert_day_add_work(
+        db, "E001", WORK_DATE, BASE + timedelta(hours=3), BASE + timedelta(hours=4), 1800
+    )
+
+    db.commit()
+    assert day.seconds_worked == 5400
+    assert _naive(day.first_check_in_utc) == _naive(BASE)
+    assert _naive(day.last_check_out_utc) == _naive(BASE + timedelta(hours=4))
+    assert db.query(AttendanceDay).count() == 1
+
+
+def test_concurrent_check_outs_do_not_lose_updates(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'days.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(
+        engine, tables=[m.__table__ for m in (Employee, AttendanceDay, AttendanceSession)]
+    )
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as db:
+        create_test_employee(db, "E001")
+        db.commit()
+
+    repo = AttendanceRepository()
+    threads, per_thread = 8, 20
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def check_out_repeatedly(worker: int):
+        barrier.wait()
+        try:
+            for i in range(per_thread):
+                start = BASE + timedelta(minutes=worker * per_thread + i)
+                with factory() as db:
+                    # Mirrors AttendanceService.check_out for a same-day session
+                    sess = repo.create_session(db, "E001", start, WORK_DATE)
+                    repo.close_session(db, sess, start + timedelta(seconds=60))
+                    repo.upsert_day_add_work(
+                        db, "E001", WORK_DATE, start, start + timedelta(seconds=60), 60
+                    )
+                    db.commit()
+        except Exception as exc:  # surfaced below; a thread cannot fail the test
+            errors.append(exc)
+
+    workers = [threading.Thread(target=check_out_repeatedly, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert errors == []
+    with factory() as db:
+        day = db.query(AttendanceDay).one()
+        assert day.seconds_worked == threads * per_thread * 60
+        assert _naive(day.first_check_in_utc) == _naive(BASE)
+        last_start = BASE + timedelta(minutes=threads * per_thread - 1)
+        assert _naive(day.last_check_out_utc) == _naive(last_start + timedelta(seconds=60))
+    engine.dispose()
+
+
+def test_postgres_statement_is_a_single_upsert():
+    db = Session(bind=create_engine("postgresql+psycopg://user@localhost/db"))
+    captured = []
+
+    def capture(stmt, **kwargs):
+        captured.append(stmt)
+        raise RuntimeError("stop before touching the database")
+
+    db.scalars = capture  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError):
+        AttendanceRepository().upsert_day_add_work(
+            db, "E001", WORK_DATE, BASE, BASE + timedelta(hours=1), 3600
+        )
+
+    sql = str(captured[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_attendance_day_emp_date DO UPDATE" in sql
+    assert "seconds_worked = (attendance_days.seconds_worked + excluded.seconds_worked)" in sql
+    assert "least(coalesce(attendance_days.first_check_in_utc" in sql
+    assert "greatest(coalesce(attendance_days.last_check_out_utc" in sql
+    assert "RETURNING" in sql
@@ -0,0 +1,123 @@
+"""
+Tests for keyset-paginated and streamed attendance evidence queries.
+"""
+
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.controllers.attandence_controller import AttendanceController
+from app.data.db import get_db
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import AttendanceSession
+from app.data.models.attendance_evidence import AttendanceEvidence, EvidenceType
+from app.routes import attendance_router
+from tests.conftest import create_sqlite_session, create_test_employee
+
+BASE = datetime(2026, 3, 2, 4, 0)
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(Employee, AttendanceSession, AttendanceEvidence)
+    create_test_employee(session, "E001")
+    create_test_employee(session, "E002")
+    for n in range(10):
+        for emp in ("E001", "E002"):
+            sess = AttendanceSession(
+                employee_id=emp,
+                work_date_local=date(2026, 3, 2) + timedelta(days=n),
+                check_in_utc=BASE + timedelta(days=n),
+            )
+            session.add(sess)
+            session.flush()
+            for kind in (EvidenceType.CHECK_IN, EvidenceType.CHECK_OUT):
+                session.add(
+                    AttendanceEvidence(
+                        session_id=sess.id,
+                        evidence_type=kind,
+                        verified=True,
+                        # Pairs share a timestamp so the id tiebreak is exercised
+                        created_at=BASE + timedelta(days=n),
+                        updated_at=BASE + timedelta(days=n),
+                    )
+                )
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def controller():
+    return AttendanceController(face_service=object(), face_pool=object())
+
+
+def _expected_ids(db, employee_id):
+    rows = (
+        db.query(AttendanceEvidence.id, AttendanceEvidence.created_at)
+        .join(AttendanceSession, AttendanceEvidence.session_id == AttendanceSession.id)
+        .filter(AttendanceSession.employee_id == employee_id)
+        .all()
+    )
+    return [r.id for r in sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True)]
+
+
+def test_cursor_pages_cover_history_once_in_order(db, controller):
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = controller.get_employee_evidence(db, "E001", cursor=cursor, limit=3)
+        seen.extend(item["id"] for item in items)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert seen == _expected_ids(db, "E001")
+    assert pages == 7  # 20 rows, 3 per page
+    assert {item["evidence_type"] for item in items} <= {"check_in", "check_out"}
+
+
+def test_session_and_date_filters(db, controller):
+    items, cursor = controller.get_session_evidence(db, 1)
+    assert [i["session_id"] for i in items] == [1, 1] and cursor is None
+
+    items, _ = controller.get_employee_evidence(
+        db, "E002", date_from=date(2026, 3, 4), date_to=date(2026, 3, 5)
+    )
+    assert len(items) == 4
+
+
+def test_router_sets_next_page_headers_and_rejects_bad_cursor(db):
+    app = FastAPI()
+    app.include_router(attendance_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    first = client.get("/api/evidence/employee/E001", params={"limit": 5})
+    assert first.status_code == 200 and len(first.json()) == 5
+    cursor = first.headers["X-Next-Cursor"]
+    assert 'rel="next"' in first.headers["Link"] and f"cursor={cursor}" in first.headers["Link"]
+
+    second = client.get("/api/evidence/employee/E001", params={"limit": 5, "cursor": cursor})
+    assert [e["id"] for e in first.json() + second.json()] == _expected_ids(db, "E001")[:10]
+
+    last = client.get("/api/evidence/employee/E001", params={"limit": 500})
+    assert "X-Next-Cursor" not in last.headers
+
+    assert client.get("/api/evidence/employee/E001", params={"cursor": "nope"}).status_code == 400
+
+
+def test_ndjson_export_streams_in_batches_on_its_own_session(db, controller):
+    factory = sessionmaker(bind=db.get_bind())
+    chunks = list(
+        controller.export_employee_evidence("E001", session_factory=factory, batch_size=6)
+    )
+
+    assert len(chunks) == 4  # 6 + 6 + 6 + 2
+    lines = b"".join(chunks).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["id"] for r in records] == _expected_ids(db, "E001")
+    assert records[0]["created_at"].startswith("2026-03-11")
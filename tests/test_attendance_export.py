@@ -0,0 +1,143 @@
+"""
+Tests for the streamed company-wide month attendance export.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.controllers.attandence_controller import AttendanceController
+from app.data.calendar_index import calendar_index
+from app.data.models.add_employee import Department, Employee
+from app.data.models.attendance import AttendanceDay, DayStatus
+from app.data.models.policy import HolidayCalendar, WorkweekPolicy
+from app.routes import attendance_router
+from tests.conftest import create_sqlite_session, create_test_employee
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(Employee, AttendanceDay, WorkweekPolicy, HolidayCalendar)
+    calendar_index.invalidate()
+    create_test_employee(session, "E001")
+    create_test_employee(session, "E002", department=Department.HR)
+    # Joined mid-month: earlier days must not be reported as absent
+    create_test_employee(session, "E003", date_of_joining=date(2026, 2, 20))
+    # Left before the month: not exported at all
+    create_test_employee(
+        session, "E004", date_of_joining=date(2024, 1, 1), date_of_leaving=date(2026, 1, 31)
+    )
+    session.add_all(
+        [
+            AttendanceDay(
+                employee_id="E001",
+                work_date_local=date(2026, 2, 2),
+                seconds_worked=30600,
+                status=DayStatus.PRESENT,
+                first_check_in_utc=datetime(2026, 2, 2, 3, 30),
+                last_check_out_utc=datetime(2026, 2, 2, 12, 0),
+            ),
+            AttendanceDay(
+                employee_id="E002",
+                work_date_local=date(2026, 2, 3),
+                seconds_worked=3600,
+                status=DayStatus.LEAVE,
+            ),
+            # Outside the month
+            AttendanceDay(employee_id="E001", work_date_local=date(2026, 3, 1)),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    calendar_index.invalidate()
+
+
+@pytest.fixture
+def controller():
+    return AttendanceController(face_service=object(), face_pool=object())
+
+
+def _csv_rows(chunks):
+    return list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+
+
+def test_csv_export_fills_absent_days_per_employee(db, controller):
+    factory = sessionmaker(bind=db.get_bind())
+    rows = _csv_rows(controller.export_month_report(2026, 2, session_factory=factory))
+
+    by_employee = {}
+    for row in rows:
+        by_employee.setdefault(row["employee_id"], []).append(row)
+    assert list(by_employee) == ["E001", "E002", "E003"]
+    assert len(by_employee["E001"]) == 28
+    assert len(by_employee["E003"]) == 9  # 20..28 Feb
+    assert by_employee["E003"][0]["work_date_local"] == "2026-02-20"
+
+    present = by_employee["E001"][1]
+    assert present["work_date_local"] == "2026-02-02"
+    assert present["status"] == "Present"
+    assert present["hours_worked"] == "08:30"
+    assert present["first_check_in_utc"].startswith("2026-02-02T03:30")
+    assert by_employee["E001"][0]["status"] == "Absent"
+    assert by_employee["E002"][2]["status"] == "Leave"
+
+
+def test_department_and_working_day_filters(db, controller):
+    factory = sessionmaker(bind=db.get_bind())
+    rows = _csv_rows(
+        controller.export_month_report(
+            2026,
+            2,
+            department=Department.HR,
+            working_days_only=True,
+            include_absent=False,
+            session_factory=factory,
+        )
+    )
+    assert [(r["employee_id"], r["work_date_local"]) for r in rows] == [("E002", "2026-02-03")]
+
+    rows = _csv_rows(
+        controller.export_month_report(
+            2026, 2, department=Department.HR, working_days_only=True, session_factory=factory
+        )
+    )
+    assert len(rows) == 20  # Mon-Fri in February 2026
+
+
+def test_xlsx_export(db, controller):
+    openpyxl = pytest.importorskip("openpyxl")
+    factory = sessionmaker(bind=db.get_bind())
+    data = b"".join(controller.export_month_report(2026, 2, "xlsx", session_factory=factory))
+
+    sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True)["Attendance"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][0] == "employee_id"
+    assert len(rows) == 1 + 28 + 28 + 9
+
+
+def test_endpoint_streams_with_attachment_headers(db, controller, monkeypatch):
+    factory = sessionmaker(bind=db.get_bind())
+    original = controller.export_month_report
+    monkeypatch.setattr(attendance_router, "controller", controller)
+    monkeypatch.setattr(
+        controller,
+        "export_month_report",
+        lambda *args, **kwargs: original(*args, session_factory=factory, **kwargs),
+    )
+    app = FastAPI()
+    app.include_router(attendance_router.router)
+    client = TestClient(app)
+
+    response = client.get(
+        "/api/attendance/export", params={"year": 2026, "month": 2, "department": "IT"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="attendance_2026-02_IT.csv"' in response.headers["content-disposition"]
+    assert {r["employee_id"] for r in _csv_rows([response.content])} == {"E001", "E003"}
@@ -0,0 +1,97 @@
+"""
+Regression tests for the batched ``recompute_range`` against per-day ``rollup_day``.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.data.calendar_index import calendar_index
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import (
+    AttendanceDay,
+    AttendanceSession,
+    recompute_range,
+    rollup_day,
+)
+from app.data.models.policy import HolidayCalendar, WorkweekPolicy
+from tests.conftest import create_sqlite_session, create_test_employee
+
+START = date(2026, 3, 1)
+END = date(2026, 3, 31)
+EMPLOYEES = ("E001", "E002", "E003")
+
+COLUMNS = [
+    c.name
+    for c in AttendanceDay.__table__.columns
+    if c.name not in ("id", "created_at", "updated_at")
+]
+
+
+def _seed():
+    db = create_sqlite_session(
+        Employee, AttendanceSession, AttendanceDay, WorkweekPolicy, HolidayCalendar
+    )
+    create_test_employee(db, "E001", region="TN")
+    create_test_employee(db, "E002", region="KA")
+    create_test_employee(db, "E003", region=None)
+    db.add(WorkweekPolicy(region="TN", policy_json={"sat": "1st,3rd", "sun": False}))
+    db.add(HolidayCalendar(holiday_date=date(2026, 3, 4), name="Global", is_paid=True))
+    db.add(HolidayCalendar(holiday_date=date(2026, 3, 4), name="TN", is_paid=False, region="TN"))
+    db.add(HolidayCalendar(holiday_date=date(2026, 3, 19), name="KA", is_paid=True, region="KA"))
+
+    for i, emp in enumerate(EMPLOYEES):
+        for offset in range(0, 31, 2 + i):
+            day = START + timedelta(days=offset)
+            check_in = datetime(day.year, day.month, day.day, 3, 30, tzinfo=timezone.utc)
+            hours = 6 + (offset % 5)
+            db.add(
+                AttendanceSession(
+                    employee_id=emp,
+                    work_date_local=day,
+                    check_in_utc=check_in,
+                    check_out_utc=check_in + timedelta(hours=hours),
+                )
+            )
+    # Stale row that the recompute must overwrite
+    db.add(AttendanceDay(employee_id="E001", work_date_local=START, seconds_worked=1))
+    db.commit()
+    calendar_index.invalidate()
+    return db
+
+
+def _snapshot(db):
+    rows = db.query(AttendanceDay).order_by(
+        AttendanceDay.employee_id, AttendanceDay.work_date_local
+    )
+    return [tuple(getattr(r, c) for c in COLUMNS) for r in rows]
+
+
+def test_recompute_range_matches_per_day_rollup():
+    expected_db = _seed()
+    for emp in EMPLOYEES:
+        d = START
+        while d <= END:
+            rollup_day(expected_db, emp, d)
+            d += timedelta(days=1)
+    expected_db.commit()
+
+    db = _seed()
+    assert recompute_range(db, EMPLOYEES, START, END) == len(EMPLOYEES) * 31
+    db.commit()
+
+    assert _snapshot(db) == _snapshot(expected_db)
+    assert len(_snapshot(db)) == len(EMPLOYEES) * 31
+
+
+def test_recompute_range_uses_a_fixed_number_of_statements():
+    db = _seed()
+    statements = []
+    event.listen(
+        db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    recompute_range(db, EMPLOYEES, START, END)
+
+    # regions, sessions, policies, holidays, one multi-row upsert
+    assert len(statements) == 5
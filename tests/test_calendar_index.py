@@ -0,0 +1,98 @@
+"""
+Tests for the compiled per-region working calendar index.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.data.calendar_index import (
+    CalendarIndex,
+    DayKind,
+    HolidayEntry,
+    calendar_index,
+    compile_calendar,
+)
+from app.data.models.policy import HolidayCalendar, WorkweekPolicy
+from app.data.repositories.leave_repository import LeaveRepository
+from app.data.repositories.policy_repository import PolicyRepository
+from tests.conftest import create_sqlite_session
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(WorkweekPolicy, HolidayCalendar)
+    session.add(WorkweekPolicy(region="TN", policy_json={"sat": "1st,3rd", "sun": False}))
+    session.add(
+        HolidayCalendar(holiday_date=date(2020, 1, 26), name="Republic Day", recurs_annually=True)
+    )
+    session.add(HolidayCalendar(holiday_date=date(2026, 4, 14), name="Puthandu", region="TN"))
+    session.commit()
+    calendar_index.invalidate()
+    yield session
+    calendar_index.invalidate()
+    session.close()
+
+
+def test_compile_calendar_applies_workweek_and_holiday_precedence():
+    holidays = [
+        HolidayEntry(None, date(2026, 3, 5), True, False),
+        HolidayEntry("TN", date(2026, 3, 5), False, False),  # regional beats global
+        HolidayEntry(None, date(2024, 8, 15), True, True),  # recurs from 2024
+        HolidayEntry(None, date(2026, 8, 15), False, False),  # dated entry beats recurring
+        HolidayEntry(None, date(2024, 2, 29), True, True),  # no 29 February in 2026
+        HolidayEntry("KA", date(2026, 3, 6), True, False),  # other region
+    ]
+    cal = compile_calendar("TN", 2026, {"sat": "1st,3rd"}, holidays)
+
+    assert len(cal.kinds) == 365
+    assert cal.kind(date(2026, 3, 7)) == DayKind.WORKING  # 1st Saturday
+    assert cal.kind(date(2026, 3, 14)) == DayKind.WEEKEND  # 2nd Saturday
+    assert cal.kind(date(2026, 3, 8)) == DayKind.WEEKEND  # Sunday
+    assert cal.holiday_paid(date(2026, 3, 5)) is False
+    assert cal.holiday_paid(date(2026, 8, 15)) is False
+    assert cal.holiday_paid(date(2026, 3, 6)) is None
+    assert cal.count(DayKind.UNPAID_HOLIDAY, date(2026, 1, 1), date(2026, 12, 31)) == 2
+    assert compile_calendar(None, 2025, None, holidays).holiday_paid(date(2025, 8, 15)) is True
+    assert compile_calendar(None, 2023, None, holidays).holiday_paid(date(2023, 8, 15)) is None
+
+
+def test_calendar_is_built_once_per_region_and_year(db):
+    index = CalendarIndex(ttl_seconds=60)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    cals = index.get_many(db, ["TN", None], 2026)
+    assert len(statements) == 2  # workweek policies + holidays
+    assert cals["TN"].holiday_paid(date(2026, 1, 26)) is True  # recurring global holiday
+    assert cals["TN"].is_working(date(2026, 4, 14)) is False
+    assert cals[None].is_working(date(2026, 4, 14)) is True
+
+    assert index.get(db, "TN", 2026) is cals["TN"]
+    assert len(statements) == 2
+    index.get(db, "TN", 2027)
+    assert len(statements) == 4
+
+
+def test_policy_and_holiday_writes_invalidate_the_shared_index(db):
+    saturday = date(2026, 3, 14)  # 2nd Saturday
+    assert calendar_index.get(db, "TN", 2026).is_working(saturday) is False
+
+    PolicyRepository().upsert_workweek(db, "TN", {"sat": True})
+    assert calendar_index.get(db, "TN", 2026).is_working(saturday) is True
+
+    repo = LeaveRepository()
+    holiday = repo.create_holiday(
+        db, {"holiday_date": saturday, "name": "Local", "is_paid": False, "region": "TN"}
+    )
+    db.commit()
+    assert calendar_index.get(db, "TN", 2026).holiday_paid(saturday) is False
+
+    repo.update_holiday(db, holiday.id, {"is_paid": True})
+    db.commit()
+    assert calendar_index.get(db, "TN", 2026).holiday_paid(saturday) is True
+
+    repo.delete_holiday(db, holiday.id)
+    db.commit()
+    assert calendar_index.get(db, "TN", 2026).holiday_paid(saturday) is None
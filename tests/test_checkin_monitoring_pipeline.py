@@ -0,0 +1,82 @@
+"""
+Tests for the asynchronous check-in monitoring pipeline.
+"""
+
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.orm import sessionmaker
+
+from app.data.models.attendance import AttendanceSession, CheckInMonitoring
+from app.services.attendance_service import AttendanceService
+from app.services.checkin_monitoring_pipeline import MonitoringCapturePipeline
+from tests.conftest import create_sqlite_session
+
+
+def _session_factory():
+    db = create_sqlite_session(AttendanceSession, CheckInMonitoring)
+    for session_id in (1, 2, 3):
+        db.add(
+            AttendanceSession(
+                id=session_id,
+                employee_id=f"E{session_id}",
+                work_date_local=date(2026, 3, 2),
+                check_in_utc=datetime(2026, 3, 2, 3, 30, tzinfo=timezone.utc),
+            )
+        )
+    db.commit()
+    return db, sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False)
+
+
+def test_queued_captures_are_written_in_one_batch_with_one_snapshot():
+    db, factory = _session_factory()
+    snapshot = MagicMock(
+        return_value={
+            "cpu_percent": 12.5,
+            "memory_percent": 40.0,
+            "active_apps": ["python"],
+            "visited_sites": [{"url": "https://example.com"}],
+        }
+    )
+    pipeline = MonitoringCapturePipeline(
+        snapshot=snapshot, on_start=None, session_factory=factory, batch_size=10, flush_seconds=5
+    )
+    at = datetime(2026, 3, 2, 3, 30, tzinfo=timezone.utc)
+
+    for session_id in (1, 2, 3):
+        assert pipeline.enqueue(session_id, at) is True
+    pipeline.stop()
+
+    rows = db.query(CheckInMonitoring).order_by(CheckInMonitoring.session_id).all()
+    assert [r.session_id for r in rows] == [1, 2, 3]
+    assert all(r.cpu_percent == 12.5 and r.active_apps == ["python"] for r in rows)
+    assert snapshot.call_count == 1
+    assert pipeline.stats["batches"] == 1 and pipeline.stats["written"] == 3
+
+
+def test_full_queue_drops_instead_of_blocking():
+    pipeline = MonitoringCapturePipeline(snapshot=dict, on_start=None, max_queue=1)
+    with patch.object(pipeline, "_ensure_started"):  # no worker draining the queue
+        assert pipeline.enqueue(1, datetime.now(timezone.utc)) is True
+        assert pipeline.enqueue(2, datetime.now(timezone.utc)) is False
+    assert pipeline.stats["dropped"] == 1
+
+
+def test_check_in_enqueues_after_commit_without_capturing_inline():
+    repo = MagicMock()
+    repo.get_open_session.return_value = None
+    repo.create_session.return_value = MagicMock(id=7)
+    db = MagicMock()
+    service = AttendanceService(repo=repo)
+
+    with patch.object(service, "_ensure_employee_exists"), patch.object(
+        service, "collect_monitoring_snapshot"
+    ) as capture, patch(
+        "app.services.attendance_service.monitoring_pipeline"
+    ) as pipeline:
+        pipeline.enqueue.side_effect = lambda *args: db.commit.assert_called_once()
+        service.check_in(db, "E1")
+
+    capture.assert_not_called()
+    pipeline.enqueue.assert_called_once()
+    assert pipeline.enqueue.call_args.args[0] == 7
@@ -0,0 +1,84 @@
+"""
+Tests for DB_POOL_* driven engine options and pool checkout metrics.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.data.pool import (
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    PoolConfig,
+    engine_options,
+    instrument,
+    pool_metrics,
+    pool_status,
+)
+
+
+def test_mode_defaults_follow_the_backend():
+    config = PoolConfig()
+    assert config.resolve_mode("sqlite") == "null"
+    assert config.resolve_mode("postgresql", "db.example.com", 5432) == "queue"
+    assert config.resolve_mode("postgresql", "aws-0.pooler.supabase.com", 5432) == "queue"
+    assert config.resolve_mode("postgresql", "aws-0.pooler.supabase.com", 6543) == "transaction"
+    assert PoolConfig(mode="pgbouncer").resolve_mode("postgresql", "db", 6543) == "pgbouncer"
+
+
+def test_engine_options_per_mode():
+    config = PoolConfig(size=3, max_overflow=2, timeout=5, recycle=60, lifo=False)
+
+    queue = engine_options("queue", config)
+    assert queue["poolclass"] is InstrumentedQueuePool
+    assert (queue["pool_size"], queue["max_overflow"], queue["pool_use_lifo"]) == (3, 2, False)
+    assert "connect_args" not in queue
+
+    transaction = engine_options("transaction", config)
+    assert transaction["poolclass"] is InstrumentedQueuePool
+    assert transaction["connect_args"] == {"prepare_threshold": None}
+
+    pgbouncer = engine_options("pgbouncer", config)
+    assert pgbouncer["poolclass"] is InstrumentedNullPool
+    assert pgbouncer["connect_args"] == {"prepare_threshold": None}
+
+    assert "connect_args" not in engine_options("transaction", config, driver="pysqlite")
+
+
+def test_from_env_rejects_unknown_modes(monkeypatch):
+    monkeypatch.setenv("DB_POOL_MODE", "session")
+    with pytest.raises(ValueError, match="DB_POOL_MODE"):
+        PoolConfig.from_env()
+
+    monkeypatch.setenv("DB_POOL_MODE", "Transaction")
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_LIFO", "false")
+    config = PoolConfig.from_env()
+    assert (config.mode, config.size, config.lifo) == ("transaction", 12, False)
+
+
+def test_queue_pool_reuses_connections_and_records_waits(tmp_path):
+    config = PoolConfig(size=1, max_overflow=0, timeout=0.05)
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", **engine_options("queue", config, driver="pysqlite")
+    )
+    instrument(engine)
+    pool_metrics.reset()
+
+    for _ in range(5):
+        with engine.connect() as conn:
+            conn.execute(text("select 1"))
+
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    held.close()
+
+    status = pool_status(engine, "queue")
+    assert status["pool_class"] == "InstrumentedQueuePool"
+    assert status["checkouts"] == 6
+    assert status["connects"] == 1  # one physical connection, reused
+    assert status["timeouts"] == 1
+    assert status["checked_out"] == 0
+    assert status["wait_ms_max"] >= status["wait_ms_p50"] >= 0
+    engine.dispose()
@@ -0,0 +1,106 @@
+"""
+Tests for the request- and process-level employee identity cache.
+"""
+
+import re
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.data.calendar_index import calendar_index
+from app.data.employee_identity import EmployeeIdentity, employee_identity
+from app.data.models.add_employee import Department, Employee
+from app.data.models.attendance import AttendanceDay, AttendanceSession
+from app.data.models.employee_bank_detail import EmployeeBankDetail
+from app.data.models.employee_salary import EmployeeSalary
+from app.data.models.policy import HolidayCalendar, WorkweekPolicy
+from app.schemas.add_employee import EmployeeUpdate
+from app.services.add_employee_service import EmployeeService
+from app.services.attendance_service import AttendanceService
+from tests.conftest import create_sqlite_session, create_test_employee
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "CHECKIN_MONITORING_ENABLED", False)
+    session = create_sqlite_session(
+        Employee,
+        EmployeeBankDetail,
+        EmployeeSalary,
+        AttendanceSession,
+        AttendanceDay,
+        WorkweekPolicy,
+        HolidayCalendar,
+    )
+    create_test_employee(session, "E001", region="KA", department=Department.HR)
+    session.commit()
+    employee_identity.invalidate()
+    calendar_index.invalidate()
+    yield session
+    session.close()
+    employee_identity.invalidate()
+    calendar_index.invalidate()
+
+
+@pytest.fixture
+def statements(db):
+    seen = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: seen.append(args[2]))
+    return seen
+
+
+def _employee_queries(statements):
+    return sum(bool(re.search(r"\bFROM employees\b", s)) for s in statements)
+
+
+def test_one_employee_lookup_per_request_and_none_on_the_next(db, statements):
+    service = AttendanceService()
+
+    sess = service.check_in(db, "E001")
+    service.get_employee_month_report(db, "E001", 2026, 2, True, False, True)
+    service.get_employee_attendance(db, "E001", date(2026, 2, 1), date(2026, 2, 3))
+    assert _employee_queries(statements) == 1
+
+    # save_evidence re-reads the session it was handed: served from the identity map
+    statements.clear()
+    assert service.repo.get_session_by_id(db, sess.id) is sess
+    assert statements == []
+
+    with sessionmaker(bind=db.get_bind())() as next_request:
+        service.get_employee_attendance_monthly(next_request, "E001", 2026)
+        with pytest.raises(HTTPException):  # already checked in
+            service.check_in(next_request, "E001")
+    assert _employee_queries(statements) == 0
+
+
+def test_unknown_employee_is_only_remembered_per_request(db, statements):
+    service = AttendanceService()
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            service.check_in(db, "NOPE")
+        assert exc.value.status_code == 404
+    assert _employee_queries(statements) == 1
+
+    with sessionmaker(bind=db.get_bind())() as next_request:
+        assert employee_identity.get(next_request, "NOPE") is None
+    assert _employee_queries(statements) == 2
+
+
+def test_employee_writes_invalidate(db):
+    assert employee_identity.get(db, "E001") == EmployeeIdentity(
+        "E001", "Employee E001", "KA", Department.HR
+    )
+
+    EmployeeService().update_employee(db, "E001", EmployeeUpdate(name="Renamed"))
+    with sessionmaker(bind=db.get_bind())() as other:
+        assert employee_identity.get(other, "E001").name == "Renamed"
+    assert employee_identity.get(db, "E001").name == "Renamed"
+
+    EmployeeService().delete_employee(db, "E001")
+    assert employee_identity.get(db, "E001") is None
+    with sessionmaker(bind=db.get_bind())() as other:
+        assert employee_identity.get(other, "E001") is None
@@ -0,0 +1,111 @@
+"""
+Tests for the incrementally maintained expense_daily_totals rollup and the
+summaries that read it.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import func
+
+from app.data.models.expenses import Expense, ExpenseCategory, ExpenseDailyTotal
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate
+from app.services import expense_summary_service as summary
+from app.services.expense_service import ExpenseService
+from tests.conftest import create_sqlite_session
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(Expense, ExpenseDailyTotal)
+    yield session
+    session.close()
+
+
+def _payload(amount, day, category=ExpenseCategory.FOOD, **extra):
+    return dict(
+        title="Item", amount=amount, category=category, date=day, added_by="alice", **extra
+    )
+
+
+def _rollup(db):
+    return {
+        (r.date, r.category): (round(r.total_amount, 2), r.tx_count)
+        for r in db.query(ExpenseDailyTotal)
+    }
+
+
+def _recomputed(db):
+    return {
+        (d, c.value): (round(total, 2), n)
+        for d, c, total, n in db.query(
+            Expense.date, Expense.category, func.sum(Expense.amount), func.count()
+        ).group_by(Expense.date, Expense.category)
+    }
+
+
+def test_create_update_delete_keep_rollup_in_step(db):
+    service = ExpenseService(db)
+    a = service.create_expense(ExpenseCreate(**_payload(100.0, date(2026, 3, 3))))
+    service.create_expense(ExpenseCreate(**_payload(50.5, date(2026, 3, 3))))
+    c = service.create_expense(
+        ExpenseCreate(**_payload(20.0, date(2026, 3, 20), ExpenseCategory.SOFTWARE))
+    )
+    assert _rollup(db) == _recomputed(db)
+    assert _rollup(db)[(date(2026, 3, 3), "FOOD")] == (150.5, 2)
+
+    # Moving an expense to another day/category debits the old bucket
+    service.update_expense(
+        a.id, ExpenseUpdate(**_payload(80.0, date(2026, 3, 20), ExpenseCategory.SOFTWARE))
+    )
+    assert _rollup(db) == _recomputed(db)
+
+    service.delete_expense(c.id)
+    assert _rollup(db) == _recomputed(db)
+    assert (date(2026, 3, 20), "SOFTWARE") in _rollup(db)
+
+    service.delete_expense(a.id)
+    assert _rollup(db) == _recomputed(db)
+    assert (date(2026, 3, 20), "SOFTWARE") not in _rollup(db)  # emptied bucket removed
+
+
+def test_summaries_read_the_rollup(db):
+    service = ExpenseService(db)
+    for amount, day, category in [
+        (10.0, date(2026, 1, 31), ExpenseCategory.FOOD),
+        (20.0, date(2026, 3, 1), ExpenseCategory.FOOD),
+        (30.0, date(2026, 3, 15), ExpenseCategory.TRANSPORT),
+        (40.0, date(2026, 3, 16), ExpenseCategory.FOOD),
+        (50.0, date(2026, 3, 31), ExpenseCategory.SOFTWARE),
+        (60.0, date(2026, 7, 1), ExpenseCategory.FOOD),
+        (70.0, date(2025, 12, 31), ExpenseCategory.FOOD),
+    ]:
+        service.create_expense(ExpenseCreate(**_payload(amount, day, category)))
+    # Raw rows are no longer read by the summaries
+    db.query(Expense).delete()
+    db.commit()
+
+    assert summary.get_total_expenses(db) == 280.0
+    assert summary.get_half_expenses(db, 2026, "H1")["total_expenses"] == 150.0
+    assert summary.get_half_expenses(db, 2026, "H2")["total_expenses"] == 60.0
+    assert summary.get_monthwise_expenses(db, 2026)["monthly_totals"] == [
+        {"month": 1, "total": 10.0},
+        {"month": 3, "total": 140.0},
+        {"month": 7, "total": 60.0},
+    ]
+    assert summary.get_weekly_expenses(db, 2026, 3)["weekly_totals"] == [
+        {"week": 1, "total": 20.0},
+        {"week": 3, "total": 70.0},
+        {"week": 5, "total": 50.0},
+    ]
+    half = summary.get_half_month_expenses(db, 2026, 3)
+    assert (half["first_half_total"], half["second_half_total"]) == (50.0, 90.0)
+
+    categories = summary.get_categorywise_expenses(db, 2026, 3)
+    assert categories["total_amount"] == 140.0 and categories["total_tx"] == 4
+    assert categories["end_date"] == "2026-03-31"
+    assert [(b["category"], b["tx_count"]) for b in categories["breakdown"]] == [
+        ("FOOD", 2),
+        ("SOFTWARE", 1),
+        ("TRANSPORT", 1),
+    ]
@@ -0,0 +1,114 @@
+"""
+Tests for the cached one-call expense dashboard and its ETag handling.
+"""
+
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.data.db import get_async_db
+from app.data.models.expenses import Expense, ExpenseCategory, ExpenseDailyTotal
+from app.routes import expenses_router
+from app.schemas.expense import ExpenseCreate
+from app.services import expense_summary_service as summary
+from app.services.expense_service import ExpenseService
+from tests.conftest import create_sqlite_sessions
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    return create_sqlite_sessions(tmp_path / "expenses.db", Expense, ExpenseDailyTotal)
+
+
+@pytest.fixture
+def db(sessions):
+    session = sessions[0]
+    summary.dashboard_cache.invalidate()
+    service = ExpenseService(session)
+    for amount, day, category in [
+        (100.0, date(2026, 3, 3), ExpenseCategory.FOOD),
+        (50.5, date(2026, 3, 16), ExpenseCategory.FOOD),
+        (20.0, date(2026, 3, 29), ExpenseCategory.SOFTWARE),
+        (70.0, date(2026, 8, 1), ExpenseCategory.FOOD),
+        (9.0, date(2025, 12, 31), ExpenseCategory.FOOD),
+    ]:
+        service.create_expense(
+            ExpenseCreate(
+                title="Item", amount=amount, category=category, date=day, added_by="alice"
+            )
+        )
+    yield session
+    session.close()
+    summary.dashboard_cache.invalidate()
+
+
+@pytest.fixture
+def client(db, sessions):
+    async def async_db():
+        async with sessions[1]() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(expenses_router.router)
+    app.dependency_overrides[get_async_db] = async_db
+    return TestClient(app)
+
+
+def test_dashboard_matches_individual_summaries(db):
+    payload, etag = summary.get_dashboard(db, 2026, 3)
+
+    assert payload["total"]["total_expenses_all_time"] == summary.get_total_expenses(db)
+    assert payload["half"] == summary.get_half_expenses(db, 2026, "H1")
+    assert payload["half_month"] == summary.get_half_month_expenses(db, 2026, 3)
+    assert payload["monthwise"] == summary.get_monthwise_expenses(db, 2026)
+    assert payload["weekly"] == summary.get_weekly_expenses(db, 2026, 3)
+    assert payload["category"] == summary.get_categorywise_expenses(db, 2026, 3)
+    assert payload["yearly"]["total_expenses_this_year"] == 240.5
+    assert payload["monthly"]["total_expenses_this_month"] == 170.5
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_cache_hit_issues_no_queries_and_writes_invalidate(db):
+    first, etag = summary.get_dashboard(db, 2026, 3)
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert summary.get_dashboard(db, 2026, 3) == (first, etag)
+    assert statements == []
+
+    ExpenseService(db).create_expense(
+        ExpenseCreate(
+            title="Late", amount=5.0, category=ExpenseCategory.FOOD,
+            date=date(2026, 3, 5), added_by="bob",
+        )
+    )
+    updated, new_etag = summary.get_dashboard(db, 2026, 3)
+    assert updated["monthly"]["total_expenses_this_month"] == 175.5
+    assert new_etag != etag
+
+
+def test_endpoint_honours_if_none_match(client):
+    response = client.get("/expenses/summary/dashboard", params={"year": 2026, "month": 3})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.json()["category"]["total_tx"] == 3
+
+    not_modified = client.get(
+        "/expenses/summary/dashboard",
+        params={"year": 2026, "month": 3},
+        headers={"If-None-Match": f'W/"other", {etag}'},
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+    other_month = client.get(
+        "/expenses/summary/dashboard",
+        params={"year": 2026, "month": 8},
+        headers={"If-None-Match": etag},
+    )
+    assert other_month.status_code == 200
+    assert other_month.json()["half"]["half"] == "H2"
@@ -0,0 +1,128 @@
+"""
+Tests for the streaming CSV/NDJSON expense import.
+"""
+
+import io
+import json
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func
+
+from app.data.db import get_db
+from app.data.models.expenses import Expense, ExpenseDailyTotal
+from app.routes import expenses_router
+from app.services import expense_summary_service as summary
+from app.services.expense_import_service import import_expenses
+from tests.conftest import create_sqlite_session
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(Expense, ExpenseDailyTotal)
+    summary.dashboard_cache.invalidate()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(expenses_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def _rollup(db):
+    return {
+        (r.date, r.category): (round(r.total_amount, 2), r.tx_count)
+        for r in db.query(ExpenseDailyTotal)
+    }
+
+
+def test_csv_import_batches_rows_and_reports_bad_lines(db):
+    csv_data = (
+        "title,amount,category,date,description,added_by\n"
+        "Lunch,120.5,FOOD,2026-03-03,,alice\n"
+        "Cab,abc,TRANSPORT,2026-03-03,,alice\n"
+        "IDE,40,SOFTWARE,2026-03-04,licence,bob\n"
+        "Dinner,80,FOOD,2026-03-03,,bob\n"
+        "Gift,10,PRESENTS,2026-03-05,,bob\n"
+        "Snack,9.5,FOOD,2026-03-03,,carol\n"
+    )
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    report = import_expenses(db, io.BytesIO(csv_data.encode()), "csv", batch_size=2)
+
+    assert report["inserted"] == 4
+    assert report["failed"] == 2
+    assert [e["line"] for e in report["errors"]] == [3, 6]
+    assert report["errors"][0]["errors"][0].startswith("amount:")
+    assert report["errors"][1]["errors"][0].startswith("category:")
+    assert not report["errors_truncated"]
+
+    # One INSERT per batch of two, not one per row
+    assert sum(s.startswith("INSERT INTO expenses") for s in statements) == 2
+    assert db.query(func.count(Expense.id)).scalar() == 4
+    assert db.query(Expense).filter_by(title="IDE").one().description == "licence"
+    assert _rollup(db) == {
+        (date(2026, 3, 3), "FOOD"): (210.0, 3),
+        (date(2026, 3, 4), "SOFTWARE"): (40.0, 1),
+    }
+
+
+def test_import_invalidates_the_cached_dashboard(db):
+    before, etag = summary.get_dashboard(db, 2026, 3)
+    csv_data = "title,amount,category,date,description,added_by\nLunch,12,FOOD,2026-03-03,,al\n"
+
+    import_expenses(db, io.BytesIO(csv_data.encode()), "csv")
+
+    after, new_etag = summary.get_dashboard(db, 2026, 3)
+    assert new_etag != etag
+    assert after["monthly"]["total_expenses_this_month"] == before["monthly"][
+        "total_expenses_this_month"
+    ] + 12
+
+
+def test_csv_without_required_columns_is_rejected(db):
+    with pytest.raises(ValueError, match="added_by"):
+        import_expenses(db, io.BytesIO(b"title,amount,category,date\n"), "csv")
+
+
+def test_ndjson_upload_through_the_endpoint(client, db):
+    lines = [
+        json.dumps({"title": "Tea", "amount": 3, "category": "FOOD",
+                    "date": "2026-04-01", "added_by": "alice"}),
+        "",
+        "{not json",
+        json.dumps(["FOOD"]),
+        json.dumps({"title": "Bus", "amount": 2, "category": "TRANSPORT",
+                    "date": "2026-04-02", "added_by": "alice"}),
+    ]
+    response = client.post(
+        "/expenses/import",
+        files={"file": ("statement.ndjson", "\n".join(lines).encode(), "application/x-ndjson")},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 2
+    assert [(e["line"], e["errors"][0][:12]) for e in body["errors"]] == [
+        (3, "invalid JSON"),
+        (4, "expected a J"),
+    ]
+    assert db.query(func.count(Expense.id)).scalar() == 2
+
+
+def test_unknown_file_type_needs_an_explicit_format(client):
+    response = client.post("/expenses/import", files={"file": ("dump.txt", b"", "text/plain")})
+    assert response.status_code == 400
+
+    response = client.post(
+        "/expenses/import?format=csv",
+        files={"file": ("dump.txt", b"title,amount,category,date,added_by\n", "text/plain")},
+    )
+    assert response.json() == {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
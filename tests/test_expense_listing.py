@@ -0,0 +1,105 @@
+"""
+Tests for keyset-paginated, filtered expense listings.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.data.db import get_db
+from app.data.models.expenses import Expense, ExpenseCategory
+from app.data.repositories.expense_repository import ExpenseFilter, ExpenseRepository
+from app.routes import expenses_router
+from tests.conftest import create_sqlite_session
+
+CATEGORIES = [ExpenseCategory.FOOD, ExpenseCategory.TRANSPORT, ExpenseCategory.SOFTWARE]
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(Expense)
+    created = datetime(2026, 3, 1, 9, 0)
+    for n in range(30):
+        session.add(
+            Expense(
+                title=f"Expense {n}",
+                amount=10.0 + n,
+                category=CATEGORIES[n % 3],
+                date=date(2026, 3, 1) + timedelta(days=n),
+                added_by="alice" if n % 2 else "bob",
+                # Every other row shares a timestamp with its neighbour (id breaks the tie)
+                created_at=created + timedelta(hours=n // 2),
+            )
+        )
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(expenses_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_keyset_pages_walk_every_row_once_newest_first(db):
+    repo = ExpenseRepository(db)
+    seen, after = [], None
+    while True:
+        page = repo.list_page(after=after, limit=7)
+        if not page:
+            break
+        seen.extend(page)
+        after = (page[-1].created_at, page[-1].id)
+
+    assert len(seen) == 30 and len({e.id for e in seen}) == 30
+    keys = [(e.created_at, e.id) for e in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_are_applied_in_sql_and_count_matches(db):
+    repo = ExpenseRepository(db)
+    filters = ExpenseFilter(
+        category=ExpenseCategory.FOOD,
+        added_by="bob",
+        date_from=date(2026, 3, 5),
+        date_to=date(2026, 3, 25),
+    )
+    rows = repo.list_page(filters, limit=100)
+
+    assert [e.title for e in rows] == ["Expense 24", "Expense 18", "Expense 12", "Expense 6"]
+    assert repo.count(filters) == 4
+
+
+def test_list_endpoint_pages_with_cursor_headers(client):
+    first = client.get("/expenses/", params={"limit": 4, "category": "TRANSPORT"})
+    assert first.status_code == 200
+    assert [e["category"] for e in first.json()] == ["TRANSPORT"] * 4
+    assert "X-Total-Count" not in first.headers
+    cursor = first.headers["X-Next-Cursor"]
+    assert f"cursor={cursor}" in first.headers["Link"]
+
+    rest = client.get(
+        "/expenses/",
+        params={"limit": 10, "category": "TRANSPORT", "cursor": cursor, "include_total": True},
+    )
+    assert len(rest.json()) == 6 and "X-Next-Cursor" not in rest.headers
+    assert rest.headers["X-Total-Count"] == "10"
+    assert not {e["id"] for e in first.json()} & {e["id"] for e in rest.json()}
+
+    assert client.get("/expenses/", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_total_is_only_counted_when_requested(client, db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    client.get("/expenses/", params={"limit": 5})
+    assert len(statements) == 1
+    client.get("/expenses/", params={"limit": 5, "include_total": True})
+    assert len(statements) == 3
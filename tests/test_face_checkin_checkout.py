@@ -37,7 +37,7 @@ class TestCheckInWithFace:
     @pytest.fixture
     def mock_face_service(self):
         """Mock FaceVerificationService."""
-        with patch("app.controllers.attandence_controller.FaceVerificationService") as mock:
+        with patch("app.services.face_verification_service.FaceVerificationService") as mock:
             from app.data.models.attendance_evidence import EvidenceType
 
             svc = MagicMock()
@@ -165,7 +165,7 @@ class TestCheckOutWithFace:
     @pytest.fixture
     def mock_face_service(self):
         """Mock FaceVerificationService."""
-        with patch("app.controllers.attandence_controller.FaceVerificationService") as mock:
+        with patch("app.services.face_verification_service.FaceVerificationService") as mock:
             from app.data.models.attendance_evidence import EvidenceType
 
             svc = MagicMock()
@@ -0,0 +1,50 @@
+"""
+Tests for the shared, thread-local face model registry.
+"""
+
+import threading
+
+from app.services.face_models import FaceModelRegistry
+
+
+def test_models_are_loaded_once_per_thread_and_reused(tmp_path):
+    registry = FaceModelRegistry(model_dir=str(tmp_path))  # no Caffe files here
+
+    assert registry.orb() is registry.orb()
+    assert registry.matcher() is registry.matcher()
+    assert registry.dnn() is None and registry.dnn_available is False
+
+    other = {}
+    thread = threading.Thread(target=lambda: other.setdefault("orb", registry.orb()))
+    thread.start()
+    thread.join()
+
+    assert other["orb"] is not registry.orb()
+    models = registry.metrics()["models"]
+    assert models["orb"]["loads"] == 2
+    assert models["orb"]["hits"] == 2
+    assert models["matcher"]["loads"] == 1
+
+
+def test_track_separates_cold_and_warm_latency(tmp_path):
+    registry = FaceModelRegistry(model_dir=str(tmp_path))
+
+    with registry.track():
+        registry.haar()
+    with registry.track():
+        registry.haar()
+    with registry.track():
+        registry.haar()
+
+    latency = registry.metrics()["latency"]
+    assert latency["cold"]["count"] == 1
+    assert latency["warm"]["count"] == 2
+
+
+def test_warm_loads_every_available_model(tmp_path):
+    registry = FaceModelRegistry(model_dir=str(tmp_path))
+
+    assert registry.warm() == {"dnn": False, "haar": True, "orb": True, "matcher": True}
+    with registry.track():
+        registry.warm()
+    assert registry.metrics()["latency"]["warm"]["count"] == 1
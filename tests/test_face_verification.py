@@ -9,6 +9,8 @@ import pytest
 from unittest.mock import MagicMock, patch
 
 from app.services.face_verification_service import (
+    FaceFeatures,
+    FaceGallery,
     FaceVerificationService,
     SIMILARITY_THRESHOLD,
 )
@@ -329,3 +331,211 @@ class TestEdgeCases:
 
         # Should return failure
         assert result["verified"] is False
+
+
+# =============================================================================
+# Test: Precomputed profile face features
+# =============================================================================
+
+
+def _face_features(seed: int) -> FaceFeatures:
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return FaceFeatures.from_face(rng.integers(0, 255, (128, 128), dtype=np.uint8))
+
+
+class TestStoredFaceFeatures:
+    """Tests for face features persisted at enrollment."""
+
+    def test_features_round_trip_through_bytes(self):
+        import numpy as np
+
+        original = _face_features(1)
+        restored = FaceFeatures.from_bytes(original.to_bytes())
+
+        assert np.array_equal(restored.gray, original.gray)
+        assert np.array_equal(restored.hist, original.hist)
+        assert np.allclose(restored.vector, original.vector)
+        assert restored.keypoint_count == original.keypoint_count
+        assert np.array_equal(restored.descriptors, original.descriptors)
+
+    def test_normalised_correlation_matches_pixel_formula(self, service):
+        import numpy as np
+
+        first, second = _face_features(1), _face_features(2)
+        g1, g2 = first.gray.astype(float), second.gray.astype(float)
+        expected = np.sum((g1 - g1.mean()) * (g2 - g2.mean())) / np.sqrt(
+            np.sum((g1 - g1.mean()) ** 2) * np.sum((g2 - g2.mean()) ** 2)
+        )
+
+        assert first.vector.dtype == np.float32
+        assert float(np.dot(first.vector, second.vector)) == pytest.approx(expected, abs=1e-5)
+        assert service._score_features(first, first) == pytest.approx(1.0, abs=1e-5)
+
+    def test_histogram_correlation_matches_compare_hist(self):
+        import cv2
+        import numpy as np
+
+        first, second = _face_features(1), _face_features(2)
+        expected = cv2.compareHist(first.hist, second.hist, cv2.HISTCMP_CORREL)
+
+        assert float(np.dot(first.hist_vector, second.hist_vector)) == pytest.approx(
+            expected, abs=1e-5
+        )
+
+    def test_verify_face_uses_stored_features_without_download(
+        self, service, mock_profile_repo, mock_db
+    ):
+        from datetime import datetime, timezone
+
+        from app.data.repositories.employee_profile_repository import profile_features_key
+        from tests.conftest import create_mock_profile_row, create_test_image
+
+        features = _face_features(1)
+        mock_profile = create_mock_profile_row()
+        mock_profile.profile_updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        mock_profile.face_features = features.to_bytes()
+        mock_profile.face_features_key = profile_features_key(
+            mock_profile.profile_path, mock_profile.profile_updated_at
+        )
+        mock_profile_repo.get_by_employee_id.return_value = mock_profile
+
+        with patch.object(
+            service, "_download_image_from_storage", side_effect=AssertionError("downloaded")
+        ), patch.object(service, "extract_face_features", return_value=features):
+            result = service.verify_face(
+                db=mock_db,
+                employee_id="TEST001",
+                selfie_image_data=create_test_image(),
+                selfie_mime="image/jpeg",
+            )
+
+        assert result["verified"] is True
+        assert result["confidence_score"] == pytest.approx(1.0, abs=1e-5)
+        mock_profile_repo.save_face_features.assert_not_called()
+
+    def test_stale_features_are_recomputed_and_backfilled(
+        self, service, mock_profile_repo, mock_db
+    ):
+        from datetime import datetime, timezone
+
+        from tests.conftest import create_mock_profile_row, create_test_image
+
+        features = _face_features(1)
+        mock_profile = create_mock_profile_row()
+        mock_profile.profile_updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        mock_profile.face_features = features.to_bytes()
+        mock_profile.face_features_key = "employees/TEST001/old.jpg@2025-01-01T00:00:00+00:00"
+        mock_profile_repo.get_by_employee_id.return_value = mock_profile
+
+        with patch.object(
+            service, "_download_image_from_storage", return_value=create_test_image()
+        ) as download, patch.object(service, "extract_face_features", return_value=features):
+            result = service.verify_face(
+                db=mock_db,
+                employee_id="TEST001",
+                selfie_image_data=create_test_image(),
+                selfie_mime="image/jpeg",
+            )
+
+        download.assert_called_once()
+        mock_profile_repo.save_face_features.assert_called_once()
+        assert result["verified"] is True
+
+
+# =============================================================================
+# Test: One-to-many identification
+# =============================================================================
+
+
+class TestFaceGallery:
+    """Tests for batch scoring of a selfie against enrolled faces."""
+
+    def test_dense_scores_match_pairwise_scoring(self, service):
+        import numpy as np
+
+        enrolled = [_face_features(seed) for seed in (1, 2, 3)]
+        gallery = FaceGallery(["E1", "E2", "E3"], enrolled)
+        selfie = _face_features(2)
+
+        dense = gallery.dense_scores(selfie)
+
+        with patch.object(service, "_feature_similarity", return_value=0.0):
+            pairwise = [service._score_features(f, selfie) for f in enrolled]
+        assert dense.shape == (3,)
+        assert np.allclose(dense, pairwise, atol=1e-5)
+
+    def test_identify_ranks_matching_employee_first(self, service):
+        enrolled = [_face_features(seed) for seed in (1, 2, 3, 4)]
+        gallery = FaceGallery(["E1", "E2", "E3", "E4"], enrolled)
+
+        with patch.object(service, "extract_face_features", return_value=_face_features(3)):
+            ranked = service.identify(b"selfie", gallery, top_k=2)
+
+        assert [c["employee_id"] for c in ranked][0] == "E3"
+        assert len(ranked) == 2
+        assert ranked[0]["verified"] is True
+        assert ranked[0]["confidence_score"] == pytest.approx(1.0, abs=1e-5)
+
+    def test_identify_with_empty_gallery(self, service):
+        with patch.object(service, "extract_face_features", return_value=_face_features(1)):
+            assert service.identify(b"selfie", FaceGallery([], [])) == []
+
+
+# =============================================================================
+# Test: Downscale-first decode
+# =============================================================================
+
+
+def _smooth_jpeg(width: int, height: int) -> bytes:
+    import cv2
+    import numpy as np
+
+    y, x = np.mgrid[0:height, 0:width]
+    img = (127 + 60 * np.sin(x / 97.0) + 60 * np.cos(y / 71.0)).astype(np.uint8)
+    _, encoded = cv2.imencode(".jpg", cv2.merge([img, img, img]), [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return encoded.tobytes()
+
+
+class TestReducedDecode:
+    """Tests for header-driven reduced decoding and box mapping."""
+
+    def test_reduction_keeps_detection_frame_at_least_max_side(self):
+        from app.services.face_verification_service import DETECT_MAX_SIDE, _reduction_for
+
+        assert _reduction_for(None) == 1
+        assert _reduction_for((640, 480)) == 1
+        assert _reduction_for((1920, 1080)) == 2
+        assert _reduction_for((4032, 3024)) == 4
+        assert _reduction_for((12000, 9000)) == 8
+        assert max(4032, 3024) / _reduction_for((4032, 3024)) >= DETECT_MAX_SIDE
+
+    def test_oriented_size_follows_exif_rotation(self):
+        from app.services.face_verification_service import _oriented_size
+
+        assert _oriented_size((4000, 3000), (750, 1000, 3)) == (4000, 3000)
+        assert _oriented_size((4000, 3000), (1000, 750, 3)) == (3000, 4000)
+
+    def test_large_image_is_detected_small_and_cropped_at_the_same_place(self, service):
+        import cv2
+        import numpy as np
+
+        data = _smooth_jpeg(4000, 3000)
+        frames = []
+
+        def detect(frame):
+            frames.append(frame.shape)
+            h, w = frame.shape[:2]
+            return [(w // 4, h // 4, w // 2, h // 2)]
+
+        with patch.object(service, "_detect_faces", side_effect=detect):
+            features = service.extract_face_features(data)
+
+        assert max(frames[0][:2]) <= 640
+        full = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        expected = FaceFeatures.from_face(
+            cv2.resize(full[750:2250, 1000:3000], (128, 128)), service.models
+        )
+        assert features is not None
+        assert float(np.dot(features.vector, expected.vector)) > 0.99
@@ -0,0 +1,120 @@
+"""
+Tests for the bounded face verification worker pool.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.face_verification_pool import FaceVerificationBusy, FaceVerificationPool
+from app.services.face_verification_service import ProfileReference
+
+RESULT = {
+    "verified": True,
+    "confidence_score": 0.8,
+    "distance": 0.2,
+    "message": "Face verified successfully",
+    "profile_path": "employees/TEST001/profile.jpg",
+    "error": None,
+    "debug_note": "Face matched with 80% similarity",
+    "timings": {"download": 0.0, "decode": 3.0, "detect": 12.0, "match": 4.0},
+}
+
+
+def test_verification_runs_on_worker_thread_and_records_stage_timings(mock_db):
+    service = MagicMock()
+    seen = {}
+
+    def verify_face(**kwargs):
+        seen["thread"] = threading.current_thread().name
+        return dict(RESULT)
+
+    service.verify_face.side_effect = verify_face
+    pool = FaceVerificationPool(max_workers=1, max_queue=0, service=service)
+    try:
+        result = asyncio.run(pool.verify(mock_db, "TEST001", b"selfie", "image/jpeg"))
+    finally:
+        pool.shutdown()
+
+    assert result["verified"] is True
+    assert seen["thread"].startswith("face-verify")
+    metrics = pool.metrics()
+    assert metrics["completed"] == 1 and metrics["in_flight"] == 0
+    assert metrics["stages"]["detect"]["count"] == 1
+    assert metrics["stages"]["detect"]["max_ms"] == 12.0
+    assert metrics["stages"]["download"]["count"] == 0  # skipped stages are not sampled
+    assert metrics["stages"]["total"]["count"] == 1
+
+
+def test_saturated_pool_rejects_with_retry_after(mock_db):
+    service = MagicMock()
+    release = threading.Event()
+    service.verify_face.side_effect = lambda **kwargs: release.wait(5) and dict(RESULT)
+    pool = FaceVerificationPool(max_workers=1, max_queue=1, retry_after_seconds=7, service=service)
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.verify(mock_db, "A", b"", "image/jpeg"))
+        second = asyncio.ensure_future(pool.verify(mock_db, "B", b"", "image/jpeg"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(FaceVerificationBusy) as busy:
+            await pool.verify(mock_db, "C", b"", "image/jpeg")
+        release.set()
+        await asyncio.gather(first, second)
+        return busy.value
+
+    try:
+        busy = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert busy.retry_after == 7
+    metrics = pool.metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["completed"] == 2
+
+
+def test_controller_maps_busy_pool_to_503(mock_db):
+    from app.controllers.attandence_controller import AttendanceController
+    from tests.conftest import MockUploadFile
+
+    pool = MagicMock()
+    pool.verify.side_effect = FaceVerificationBusy(in_flight=10, retry_after=5)
+    controller = AttendanceController(
+        service=MagicMock(), face_service=MagicMock(), face_pool=pool
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(controller.check_in_with_face(mock_db, "TEST001", MockUploadFile()))
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "5"}
+    controller.service.check_in.assert_not_called()
+
+
+def test_process_mode_keeps_db_work_in_caller_and_backfills(mock_db):
+    service = MagicMock()
+    profile_row = MagicMock(profile_path="employees/TEST001/profile.jpg")
+    service.profile_repo.get_by_employee_id.return_value = profile_row
+    reference = ProfileReference("TEST001", "profiles", profile_row.profile_path, None)
+    service.profile_reference.return_value = reference
+
+    pool = FaceVerificationPool(mode="process", max_workers=1, service=service)
+    pool._executor = ThreadPoolExecutor(max_workers=1)  # stand-in for worker processes
+    with patch(
+        "app.services.face_verification_pool._verify_in_process",
+        return_value=(dict(RESULT), b"features"),
+    ) as worker:
+        try:
+            result = asyncio.run(pool.verify(mock_db, "TEST001", b"selfie", "image/jpeg"))
+        finally:
+            pool.shutdown()
+
+    worker.assert_called_once_with(reference, b"selfie")
+    service.save_backfilled_features.assert_called_once_with(mock_db, reference, b"features")
+    service.verify_face.assert_not_called()
+    assert result["verified"] is True
+    assert pool.metrics()["stages"]["queue_wait"]["count"] == 1
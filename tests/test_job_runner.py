@@ -0,0 +1,152 @@
+"""
+Tests for the background job runner and the month-end job bodies.
+"""
+
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import AttendanceDay
+from app.data.models.leave import LeaveRequest
+from app.data.models.monthly_summary import MonthlyEmployeeSummary
+from app.data.models.policy import HolidayCalendar
+from app.services.job_runner import JobQueueFull, JobRunner, JobStatus
+from app.services.monthly_summary_service import rollup_month_job
+from tests.conftest import create_sqlite_session, create_test_employee
+
+
+def _wait(job, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.finished, f"job still {job.status}"
+
+
+@pytest.fixture
+def session_factory():
+    db = create_sqlite_session(
+        Employee, AttendanceDay, LeaveRequest, HolidayCalendar, MonthlyEmployeeSummary
+    )
+    factory = sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False)
+    db.close()
+    return factory
+
+
+def test_job_reports_progress_errors_and_throughput(session_factory):
+    runner = JobRunner(max_workers=1, max_pending=2, chunk_size=2, session_factory=session_factory)
+
+    def work(db, ctx, items):
+        ctx.set_total(len(items))
+        for chunk in ctx.chunks(items):
+            for item in chunk:
+                if item == "bad":
+                    ctx.record_error(item, "boom")
+                else:
+                    ctx.record_success()
+        ctx.set_result(chunks=len(list(ctx.chunks(items))))
+
+    job = runner.submit("demo", work, items=["a", "b", "bad", "c", "d"])
+    _wait(job)
+
+    state = job.to_dict()
+    assert state["status"] == JobStatus.SUCCEEDED.value
+    assert state["progress"] == {
+        "total": 5,
+        "processed": 5,
+        "succeeded": 4,
+        "failed": 1,
+        "percent": 100.0,
+    }
+    assert state["errors"] == [{"employee_id": "bad", "error": "boom"}]
+    assert state["result"] == {"chunks": 3}
+    assert state["throughput_per_second"] is not None
+    assert runner.get(job.id) is job
+
+
+def test_unhandled_exception_fails_the_job(session_factory):
+    runner = JobRunner(max_workers=1, max_pending=2, chunk_size=10, session_factory=session_factory)
+
+    def work(db, ctx):
+        raise RuntimeError("database went away")
+
+    job = runner.submit("demo", work)
+    _wait(job)
+
+    assert job.status is JobStatus.FAILED
+    assert job.to_dict()["error"] == "database went away"
+
+
+def test_runner_rejects_work_beyond_max_pending(session_factory):
+    runner = JobRunner(max_workers=1, max_pending=1, chunk_size=10, session_factory=session_factory)
+    release = threading.Event()
+
+    job = runner.submit("blocker", lambda db, ctx: release.wait(5))
+    with pytest.raises(JobQueueFull):
+        runner.submit("second", lambda db, ctx: None)
+
+    release.set()
+    _wait(job)
+    runner.submit("third", lambda db, ctx: None)
+
+
+def test_shutdown_cancels_queued_jobs_and_a_later_submit_still_runs(session_factory):
+    runner = JobRunner(max_workers=1, max_pending=3, chunk_size=10, session_factory=session_factory)
+    release = threading.Event()
+    running = runner.submit("blocker", lambda db, ctx: release.wait(5))
+    queued = runner.submit("queued", lambda db, ctx: None)
+    while running.status is JobStatus.QUEUED:
+        time.sleep(0.01)
+
+    runner.shutdown(wait=False)
+    assert queued.status is JobStatus.CANCELLED and queued.finished
+    assert "shut down" in queued.to_dict()["error"]
+
+    release.set()
+    _wait(running)
+    assert running.status is JobStatus.SUCCEEDED
+    _wait(runner.submit("after restart", lambda db, ctx: None))
+
+
+def test_rollup_job_commits_summaries_in_chunks_on_sqlite(session_factory):
+    month = date(2026, 3, 1)
+    with session_factory() as db:
+        for n in range(1, 6):
+            code = f"YTPL{n:03d}IT"
+            create_test_employee(db, code)
+            db.add(
+                AttendanceDay(
+                    employee_id=code,
+                    work_date_local=date(2026, 3, 2),
+                    seconds_worked=8 * 3600,
+                    expected_seconds=8 * 3600,
+                    status="Present",
+                )
+            )
+        db.add(
+            LeaveRequest(
+                employee_id="YTPL002IT",
+                leave_type_id=1,
+                start_datetime=datetime(2026, 3, 10, 9),
+                end_datetime=datetime(2026, 3, 10, 18),
+                requested_unit="DAY",
+                requested_hours=8,
+                status="APPROVED",
+            )
+        )
+        db.commit()
+
+    runner = JobRunner(max_workers=1, max_pending=1, chunk_size=2, session_factory=session_factory)
+    job = runner.submit("monthly_summary_rollup", rollup_month_job, month_start=month)
+    _wait(job)
+
+    assert job.status is JobStatus.SUCCEEDED, job.error
+    assert (job.total, job.succeeded, job.failed) == (5, 5, 0)
+    with session_factory() as db:
+        rows = {r.employee_id: r for r in db.query(MonthlyEmployeeSummary)}
+    assert len(rows) == 5
+    assert rows["YTPL001IT"].present_days == 1
+    assert float(rows["YTPL002IT"].paid_leave_hours) == 8.0
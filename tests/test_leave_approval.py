@@ -0,0 +1,158 @@
+"""
+Tests for approving a leave request as one transaction with one bulk attendance write.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.controllers.leave_admin_controller import LeaveAdminController
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import AttendanceDay, DayStatus
+from app.data.models.leave import (
+    LeaveBalance,
+    LeaveReqUnit,
+    LeaveRequest,
+    LeaveStatus,
+    LeaveType,
+    LeaveUnit,
+)
+from app.data.repositories import leave_repository
+from tests.conftest import create_sqlite_session, create_test_employee
+
+START = date(2026, 3, 2)
+DAYS = 14
+HOURS = 8 * 3600
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(Employee, LeaveType, LeaveBalance, LeaveRequest, AttendanceDay)
+    create_test_employee(session, "E001")
+    lt = LeaveType(code="EL", name="Earned", unit=LeaveUnit.DAY, is_paid=True)
+    session.add(lt)
+    session.flush()
+    session.add(
+        LeaveBalance(employee_id="E001", leave_type_id=lt.id, year=2026, opening=200, closing=200)
+    )
+    # A day the employee already worked an hour on
+    session.add(
+        AttendanceDay(
+            employee_id="E001",
+            work_date_local=START + timedelta(days=1),
+            seconds_worked=3600,
+            expected_seconds=HOURS,
+            status=DayStatus.PRESENT,
+        )
+    )
+    session.add(
+        LeaveRequest(
+            id=1,
+            employee_id="E001",
+            leave_type_id=lt.id,
+            start_datetime=datetime(2026, 3, 2, 9),
+            end_datetime=datetime(2026, 3, 15, 18),
+            requested_unit=LeaveReqUnit.DAY,
+            status=LeaveStatus.PENDING,
+        )
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture(params=["upsert", "read-modify-write"])
+def write_path(request, monkeypatch):
+    if request.param == "read-modify-write":
+        monkeypatch.setattr(leave_repository, "dialect_insert", lambda db, model: None)
+    return request.param
+
+
+def _balance(db):
+    return db.query(LeaveBalance).one()
+
+
+def test_approval_writes_all_days_in_one_statement_without_committing(db, write_path):
+    statements, commits = [], []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+
+    result = LeaveAdminController().decide_request(db, 1, "APPROVED", "E001")
+
+    assert result == {"ok": True, "status": "APPROVED", "hours_applied": DAYS * 8.0}
+    assert commits == []
+    day_writes = [s for s in statements if s.startswith("INSERT INTO attendance_days")]
+    day_reads = [s for s in statements if s.startswith("SELECT") and "attendance_days" in s]
+    if write_path == "upsert":
+        assert len(day_writes) == 1 and "ON CONFLICT" in day_writes[0] and day_reads == []
+    else:
+        assert len(day_reads) == 1
+
+    db.commit()
+    days = {d.work_date_local: d for d in db.query(AttendanceDay)}
+    assert len(days) == DAYS
+    assert all(d.status == DayStatus.LEAVE and d.paid_leave_seconds == HOURS for d in days.values())
+    assert (days[START].underwork_seconds, days[START].overtime_seconds) == (0, 0)
+
+    worked = days[START + timedelta(days=1)]
+    assert (worked.seconds_worked, worked.overtime_seconds, worked.underwork_seconds) == (
+        3600,
+        3600,
+        0,
+    )
+    assert float(_balance(db).used) == DAYS * 8.0
+    assert db.get(LeaveRequest, 1).status == LeaveStatus.APPROVED
+
+
+def test_insufficient_balance_is_unpaid_and_leaves_balance_alone(db, write_path):
+    _balance(db).closing = 8
+    db.commit()
+
+    LeaveAdminController().decide_request(db, 1, "APPROVED", "E001")
+    db.commit()
+
+    days = db.query(AttendanceDay).all()
+    assert all(d.paid_leave_seconds == 0 and d.unpaid_seconds == HOURS for d in days)
+    assert all(d.underwork_seconds == HOURS - d.seconds_worked for d in days)
+    assert float(_balance(db).used) == 0
+
+
+def test_failure_before_status_change_rolls_everything_back(db, write_path):
+    controller = LeaveAdminController()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("status update failed")
+
+    controller.repo.set_request_status = fail  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError):
+        controller.decide_request(db, 1, "APPROVED", "E001")
+    db.rollback()
+
+    assert db.query(AttendanceDay).count() == 1
+    assert float(_balance(db).used) == 0
+    assert db.get(LeaveRequest, 1).status == LeaveStatus.PENDING
+
+
+def test_postgres_statement_is_a_single_multi_row_upsert():
+    db = Session(bind=create_engine("postgresql+psycopg://user@localhost/db"))
+    captured = []
+
+    def capture(stmt, **kwargs):
+        captured.append(stmt)
+        raise RuntimeError("stop before touching the database")
+
+    db.scalars = capture  # type: ignore[method-assign]
+    segments = [(START + timedelta(days=i), 8.0) for i in range(3)]
+    with pytest.raises(RuntimeError):
+        leave_repository.LeaveRepository().upsert_attendance_leave_days(
+            db, "E001", segments, True
+        )
+
+    sql = str(captured[0].compile(dialect=postgresql.dialect()))
+    assert sql.count("work_date_local_m") == 3  # three VALUES rows
+    assert "ON CONFLICT ON CONSTRAINT uq_attendance_day_emp_date DO UPDATE" in sql
+    assert "paid_leave_seconds = (coalesce(attendance_days.paid_leave_seconds" in sql
+    assert "greatest(" in sql and "RETURNING" in sql
@@ -0,0 +1,120 @@
+"""
+Tests for the month-wide grouped monthly summary aggregation and bulk upsert.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.controllers.montly_summary_ctrl import rollup_month_summaries
+from app.data.calendar_index import calendar_index
+from app.data.models.add_employee import Employee
+from app.data.models.attendance import AttendanceDay
+from app.data.models.leave import LeaveRequest
+from app.data.models.monthly_summary import MonthlyEmployeeSummary
+from app.data.models.policy import HolidayCalendar, WorkweekPolicy
+from app.services.monthly_summary_service import aggregate_employee_month, aggregate_month
+from tests.conftest import create_sqlite_session, create_test_employee
+
+MONTH = date(2026, 3, 1)
+CODES = ["YTPL001IT", "YTPL002IT", "YTPL003IT", "YTPL004IT"]
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(
+        Employee,
+        AttendanceDay,
+        LeaveRequest,
+        HolidayCalendar,
+        WorkweekPolicy,
+        MonthlyEmployeeSummary,
+    )
+    regions = {"YTPL001IT": "TN", "YTPL002IT": "KA", "YTPL003IT": None, "YTPL004IT": "TN"}
+    for n, code in enumerate(CODES, start=1):
+        create_test_employee(session, code, region=regions[code])
+        for day in range(2, 2 + n):
+            session.add(
+                AttendanceDay(
+                    employee_id=code,
+                    work_date_local=date(2026, 3, day),
+                    seconds_worked=9 * 3600,
+                    expected_seconds=8 * 3600,
+                    overtime_seconds=3600,
+                    status="Present",
+                )
+            )
+    # Outside the month: must be ignored
+    session.add(
+        AttendanceDay(employee_id="YTPL001IT", work_date_local=date(2026, 4, 1), status="Present")
+    )
+    for status, hours, leave_type in [("APPROVED", 8, 1), ("APPROVED", 4, 2), ("PENDING", 8, 1)]:
+        session.add(
+            LeaveRequest(
+                employee_id="YTPL002IT",
+                leave_type_id=leave_type,
+                start_datetime=datetime(2026, 3, 20, 9),
+                end_datetime=datetime(2026, 3, 20, 18),
+                requested_unit="DAY",
+                requested_hours=hours,
+                status=status,
+            )
+        )
+    session.add_all(
+        [
+            HolidayCalendar(holiday_date=date(2026, 3, 5), name="Global", region=None),
+            HolidayCalendar(holiday_date=date(2026, 3, 14), name="Tamil", region="TN"),
+            HolidayCalendar(holiday_date=date(2026, 3, 5), name="Dup", region="TN"),
+            HolidayCalendar(holiday_date=date(2026, 3, 19), name="Karnataka", region="KA"),
+            HolidayCalendar(holiday_date=date(2026, 4, 1), name="Next month", region=None),
+        ]
+    )
+    session.add(WorkweekPolicy(region="KA", policy_json={"sat": "2nd,4th", "sun": False}))
+    session.commit()
+    calendar_index.invalidate()
+    yield session
+    calendar_index.invalidate()
+    session.close()
+
+
+def test_grouped_aggregation_matches_per_employee_path(db):
+    grouped = {row["employee_id"]: row for row in aggregate_month(db, MONTH)}
+
+    assert set(grouped) == set(CODES)
+    for code in CODES:
+        assert grouped[code] == aggregate_employee_month(db, code, MONTH)
+
+
+def test_holiday_count_is_region_aware(db):
+    grouped = {row["employee_id"]: row for row in aggregate_month(db, MONTH)}
+
+    assert grouped["YTPL001IT"]["holiday_days"] == 2  # global + TN (duplicate date counted once)
+    assert grouped["YTPL002IT"]["holiday_days"] == 2  # global + KA
+    assert grouped["YTPL003IT"]["holiday_days"] == 1  # global only
+    assert grouped["YTPL001IT"]["weekend_days"] == 8  # 14 March is a TN holiday
+    assert grouped["YTPL002IT"]["weekend_days"] == 7  # 2nd/4th Saturdays worked, 1st/3rd off
+    assert grouped["YTPL003IT"]["weekend_days"] == 9
+    assert grouped["YTPL002IT"]["leave_type_breakdown"] == {1: 8.0, 2: 4.0}
+    assert grouped["YTPL002IT"]["pending_leave_hours"] == 8.0
+
+
+def test_rollup_uses_constant_queries_and_upserts_idempotently(db):
+    statements = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt),
+    )
+
+    rollup_month_summaries(db, MONTH, CODES)
+    first_run = len(statements)
+    calendar_index.invalidate()  # count the calendar build on both runs
+    rollup_month_summaries(db, MONTH, CODES)
+
+    assert first_run <= 8
+    assert len(statements) == 2 * first_run
+    rows = db.query(MonthlyEmployeeSummary).order_by(MonthlyEmployeeSummary.employee_id).all()
+    assert [r.employee_id for r in rows] == CODES
+    assert rows[3].present_days == 4
+    assert float(rows[0].overtime_hours) == 1.0
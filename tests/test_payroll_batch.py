@@ -0,0 +1,157 @@
+"""
+Tests for the set-based payroll batch engine.
+
+The batch path must produce exactly what the per-employee path produces, while
+issuing a constant number of queries regardless of headcount.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.data.models.add_employee import Employee
+from app.data.models.employee_salary import EmployeeSalary
+from app.data.models.monthly_summary import MonthlyEmployeeSummary
+from app.data.models.payroll_policy import PayrollPolicy
+from app.data.models.payroll_policy_rule import PayrollPolicyRule, Ruletypes
+from app.data.models.salary_breakdown import SalaryBreakdown
+from app.services.payroll_calculator_service import (
+    calculate_payroll_batch,
+    generate_salary_breakdown,
+    generate_salary_breakdowns_batch,
+    get_payroll_for_employee,
+)
+from tests.conftest import create_sqlite_session, create_test_employee
+
+MONTH = date(2026, 3, 1)
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(
+        Employee,
+        PayrollPolicy,
+        PayrollPolicyRule,
+        EmployeeSalary,
+        SalaryBreakdown,
+        MonthlyEmployeeSummary,
+    )
+    policy = PayrollPolicy(name="Standard", effective_from=date(2026, 1, 1))
+    policy.rules = [
+        PayrollPolicyRule(
+            rule_name="HRA",
+            rule_type=Ruletypes.ALLOWANCE,
+            is_percentage=True,
+            value=10,
+            applies_to="basic",
+        ),
+        PayrollPolicyRule(
+            rule_name="Overtime",
+            rule_type=Ruletypes.ALLOWANCE,
+            is_percentage=False,
+            value=200,
+            applies_to="overtime",
+        ),
+        PayrollPolicyRule(
+            rule_name="Unpaid leave",
+            rule_type=Ruletypes.DEDUCTION,
+            is_percentage=False,
+            value=150,
+            applies_to="unpaid_leave",
+        ),
+    ]
+    session.add(policy)
+    session.flush()
+
+    for n in range(1, 6):
+        code = f"YTPL{n:03d}IT"
+        create_test_employee(session, code)
+        # An older salary row that must be ignored in favour of the latest one
+        session.add(EmployeeSalary(employee_id=code, base_salary=1000.0, gross_salary=1000.0))
+        session.add(
+            EmployeeSalary(
+                employee_id=code,
+                base_salary=20000.0 + n * 1000,
+                gross_salary=0.0,
+                payroll_policy_id=policy.id if n % 2 else None,
+            )
+        )
+        session.add(
+            MonthlyEmployeeSummary(
+                employee_id=code,
+                month_start=MONTH,
+                present_days=20,
+                total_work_days=22,
+                overtime_hours=n,
+                unpaid_leave_hours=8 if n == 3 else 0,
+                leave_type_breakdown={},
+            )
+        )
+    # Employee without any salary record is reported, not silently dropped
+    create_test_employee(session, "YTPL099IT")
+    session.commit()
+    yield session
+    session.close()
+
+
+def _count_queries(session):
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt),
+    )
+    return statements
+
+
+def test_batch_matches_per_employee_calculation(db):
+    batch = calculate_payroll_batch(db, MONTH)
+
+    assert len(batch.calculations) == 5
+    assert [e["employee_code"] for e in batch.errors] == ["YTPL099IT"]
+    for calc in batch.calculations:
+        single = get_payroll_for_employee(db, calc.employee_code, MONTH)
+        assert single is not None
+        assert calc.to_dict() == single.to_dict()
+
+
+def test_batch_query_count_is_independent_of_headcount(db):
+    statements = _count_queries(db)
+
+    calculate_payroll_batch(db, MONTH)
+
+    # employees, salaries, summaries, policies, rules (selectinload) + schema probe
+    assert len(statements) <= 8
+
+
+def test_generate_batch_writes_same_breakdowns_as_single_path(db):
+    batch = generate_salary_breakdowns_batch(db, MONTH)
+    assert set(batch.timings) >= {"load_salaries", "compute", "write", "commit"}
+
+    def snapshot():
+        rows = db.query(SalaryBreakdown).order_by(SalaryBreakdown.id).all()
+        return sorted(
+            (r.employee_salary_id, r.rule_name, r.rule_type, r.applies_to, r.amount) for r in rows
+        )
+
+    batch_rows = snapshot()
+    assert batch_rows
+
+    for calc in batch.calculations:
+        generate_salary_breakdown(db, calc.employee_code, MONTH)
+    assert snapshot() == batch_rows
+
+    # Re-running replaces rather than duplicates breakdowns
+    generate_salary_breakdowns_batch(db, MONTH)
+    assert snapshot() == batch_rows
+
+    salary = db.get(EmployeeSalary, batch.salary_ids["YTPL001IT"])
+    assert salary.gross_salary == batch.calculations[0].gross_salary
+
+
+def test_batch_can_be_restricted_to_a_subset(db):
+    batch = calculate_payroll_batch(db, MONTH, employee_codes=["YTPL002IT", "YTPL004IT"])
+
+    assert [c.employee_code for c in batch.calculations] == ["YTPL002IT", "YTPL004IT"]
+    assert batch.errors == []
@@ -0,0 +1,106 @@
+"""
+Tests for the process-wide compiled payroll policy cache.
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, inspect
+
+from app.data.models.payroll_policy import PayrollPolicy
+from app.data.models.payroll_policy_rule import PayrollPolicyRule, Ruletypes
+from app.schemas.payroll_policy import PayrollPolicyUpdate
+from app.services import payroll_policy_service
+from app.services.payroll_policy_cache import PayrollPolicyCache, compile_policy, policy_cache
+from tests.conftest import create_sqlite_session
+
+
+@pytest.fixture
+def db():
+    session = create_sqlite_session(PayrollPolicy, PayrollPolicyRule)
+    policy = PayrollPolicy(name="Standard", effective_from=date(2026, 1, 1))
+    policy.rules = [
+        PayrollPolicyRule(
+            rule_name="HRA",
+            rule_type=Ruletypes.ALLOWANCE,
+            is_percentage=True,
+            value=10,
+            applies_to=" Basic ",
+        ),
+        PayrollPolicyRule(
+            rule_name="Old bonus",
+            rule_type=Ruletypes.ALLOWANCE,
+            is_enabled=False,
+            is_percentage=False,
+            value=500,
+            applies_to="basic",
+        ),
+        PayrollPolicyRule(
+            rule_name="PF",
+            rule_type=Ruletypes.DEDUCTION,
+            is_percentage=False,
+            value=1800,
+            applies_to="basic",
+        ),
+    ]
+    session.add(policy)
+    session.commit()
+    policy_cache.invalidate()
+    yield session
+    policy_cache.invalidate()
+    session.close()
+
+
+def test_compile_policy_keeps_enabled_rules_with_parsed_fields(db):
+    compiled = compile_policy(db.query(PayrollPolicy).one())
+
+    assert [r.rule_name for r in compiled.rules] == ["HRA", "PF"]
+    hra, pf = compiled.rules
+    assert hra.rule_type is Ruletypes.ALLOWANCE
+    assert hra.target == "basic"
+    assert hra.applies_to == " Basic "
+    assert hra.amount_for(20000) == 2000
+    assert pf.rule_type is Ruletypes.DEDUCTION
+    assert pf.amount_for(20000) == 1800
+
+
+def test_schema_is_probed_once(db):
+    cache = PayrollPolicyCache(ttl_seconds=60)
+    with patch("app.services.payroll_policy_cache.inspect", wraps=inspect) as spy:
+        assert cache.tables_exist(db) is True
+        assert cache.tables_exist(db) is True
+    assert spy.call_count == 1
+
+
+def test_cached_policy_is_served_without_queries_until_invalidated(db):
+    cache = PayrollPolicyCache(ttl_seconds=60)
+    statements = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt),
+    )
+
+    first = cache.get(db, 1)
+    loaded = len(statements)
+    assert first is not None and loaded > 0
+
+    assert cache.get(db, 1) is first
+    assert cache.get(db, 999) is None
+    cache.get(db, 999)
+    assert len(statements) == loaded + 1  # only the unknown id was looked up, once
+
+    cache.invalidate(1)
+    assert cache.get(db, 1) == first
+    assert cache.get(db, 1) is not first
+
+
+def test_policy_update_invalidates_shared_cache(db):
+    before = policy_cache.get(db, 1)
+    assert before is not None and before.name == "Standard"
+
+    payroll_policy_service.update_policy(db, 1, PayrollPolicyUpdate(name="Revised"))
+
+    after = policy_cache.get(db, 1)
+    assert after is not None and after.name == "Revised"
@@ -0,0 +1,122 @@
+"""
+Tests for the per-route latency / SQL cost middleware and its debug surfaces.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.deps import require_admin
+from app.core.perf import (
+    PerfMiddleware,
+    PerfRecorder,
+    _RequestCost,
+    instrument_engine,
+    perf_recorder,
+)
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    instrument_engine(engine)
+
+    app = FastAPI()
+    app.add_middleware(PerfMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("select :id"), {"id": item_id}).scalar()
+        return {"id": item_id}
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    perf_recorder.reset()
+    yield TestClient(app, raise_server_exceptions=False)
+    perf_recorder.reset()
+    engine.dispose()
+
+
+def _route(snapshot, route):
+    return next(r for r in snapshot["routes"] if r["route"] == route)
+
+
+def test_records_per_route_template_statements_and_errors(client):
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/ping")
+    client.get("/nope")
+    client.get("/boom")
+
+    snapshot = perf_recorder.snapshot()
+    items = _route(snapshot, "/items/{item_id}")
+    assert items["count"] == 2
+    assert items["statements_avg"] == 3 and items["statements_max"] == 3
+    assert items["db_ms_total"] > 0
+    assert items["latency_ms_p99"] >= items["latency_ms_p50"] > 0
+
+    assert _route(snapshot, "/ping")["statements_max"] == 0
+    assert _route(snapshot, "<unmatched>")["count"] == 1
+    assert _route(snapshot, "/boom")["errors"] == 1
+
+    assert 0 < len(snapshot["slowest_statements"]) <= 20
+    assert snapshot["slowest_statements"][0]["route"] == "/items/{item_id}"
+    assert snapshot["slowest_statements"][0]["sql"] == "select ?"
+
+
+def test_prometheus_text(client):
+    client.get("/items/1")
+    body = perf_recorder.prometheus()
+
+    labels = 'method="GET",route="/items/{item_id}"'
+    assert "# TYPE app_request_duration_seconds summary" in body
+    assert f'app_request_duration_seconds{{{labels},quantile="0.95"}}' in body
+    assert f"app_request_duration_seconds_count{{{labels}}} 1" in body
+    assert f"app_db_statements_total{{{labels}}} 3" in body
+    assert "select" not in body
+
+
+def test_window_and_slow_statements_are_bounded():
+    recorder = PerfRecorder(window=3, slow_statements=2)
+    cost = _RequestCost()
+    for seconds in (0.01, 0.05, 0.02, 0.04):
+        recorder.record_statement(cost, f"q{seconds}", seconds)
+    for _ in range(5):
+        recorder.record_request("GET", cost, 0.1, 200)
+
+    snapshot = recorder.snapshot()
+    assert snapshot["routes"][0]["count"] == 5
+    assert [s["sql"] for s in snapshot["slowest_statements"]] == ["q0.05", "q0.04"]
+    assert len(recorder._routes[("GET", "<unmatched>")].samples) == 3
+
+
+def test_debug_perf_is_admin_only_and_metrics_is_text():
+    from app.api.main import app
+
+    client = TestClient(app)
+    assert client.get("/debug/perf").status_code == 401
+
+    app.dependency_overrides[require_admin] = lambda: object()
+    try:
+        response = client.get("/debug/perf")
+    finally:
+        app.dependency_overrides.pop(require_admin)
+    assert response.status_code == 200
+    assert {"window", "routes", "slowest_statements"} <= set(response.json())
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/debug/perf"' in metrics.text
+
@@ -0,0 +1,103 @@
+"""
+Cold-start budget: importing the app stays cheap and leaves the heavy subsystems unloaded.
+
+IMPORT_TIME_BUDGET_MS overrides the budget for slower CI machines.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.controllers.attandence_controller import AttendanceController
+from app.core.config import settings
+from app.core.deps import require_admin
+from app.core.perf import StartupTimer
+
+ROOT = Path(__file__).resolve().parents[1]
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+# Loaded on first use only: face verification, profile storage, monitoring, XLSX export
+LAZY_MODULES = ("cv2", "numpy", "PIL", "supabase", "psutil", "openpyxl")
+
+
+def _import_app():
+    code = (
+        "import json, sys; import app.api.main; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def test_import_time_budget_and_no_heavy_modules():
+    loaded, importtime = _import_app()
+    assert loaded == []
+
+    # "import time: <self us> | <cumulative us> | app.api.main"
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| app\.api\.main$", importtime, re.M)
+    assert match, importtime[-2000:]
+    cumulative_ms = int(match.group(1)) / 1000
+    assert cumulative_ms < IMPORT_TIME_BUDGET_MS, (
+        f"import app.api.main took {cumulative_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)"
+    )
+
+
+def test_face_subsystem_is_built_on_first_use():
+    controller = AttendanceController()
+    assert controller._face_service is None and controller._face_pool is None
+    controller.shutdown_face_pool()  # nothing started, nothing to stop
+    assert controller._face_pool is None
+
+
+def test_lifespan_reports_startup_phases(monkeypatch):
+    from app.api.main import app
+
+    monkeypatch.setattr(settings, "FACE_MODELS_WARMUP", "off")
+    app.dependency_overrides[require_admin] = lambda: object()
+    try:
+        for _ in range(2):  # a second startup reports its own phases only
+            with TestClient(app) as client:
+                phases = client.get("/debug/perf").json()["startup"]
+    finally:
+        app.dependency_overrides.pop(require_admin)
+
+    names = [p["phase"] for p in phases]
+    assert names == ["import app.api.main", "payroll policy cache"]
+
+
+def test_shutdown_does_not_wait_for_a_hung_background_warmup(monkeypatch):
+    from app.api import main
+
+    release = threading.Event()
+    monkeypatch.setattr(settings, "FACE_MODELS_WARMUP", "background")
+    monkeypatch.setattr(main, "_warm_face_models", lambda: release.wait(30))
+    monkeypatch.setattr(main, "FACE_WARMUP_SHUTDOWN_TIMEOUT_SECONDS", 0.05)
+    try:
+        started = time.perf_counter()
+        with TestClient(main.app):
+            pass
+        assert time.perf_counter() - started < 10
+    finally:
+        release.set()
+
+
+def test_startup_timer_report():
+    timer = StartupTimer()
+    timer.record("import", 0.25)
+    with timer.phase("warm"):
+        pass
+    assert [p["phase"] for p in timer.snapshot()] == ["import", "warm"]
+    assert timer.report().startswith("import 250 ms, warm 0 ms (total 250 ms)")